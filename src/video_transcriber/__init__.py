@@ -1,33 +1,180 @@
 """Video Transcriber - Download and transcribe TikTok videos."""
 
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 __version__ = "1.0.0"
 
-from .audio import AudioExtractor
-from .config import TranscriberConfig
-from .downloader import VideoDownloader
-from .exceptions import (
-    AudioExtractionError,
-    DownloadError,
-    MetadataError,
-    TranscriptionError,
-    TranscriberError,
-)
-from .processor import VideoProcessor
-from .transcriber import AudioTranscriber
-from .utils import read_urls_from_file, sanitize_filename, setup_logging
+if TYPE_CHECKING:
+    from .artifacts import ArtifactCache
+    from .async_downloader import AsyncVideoDownloader
+    from .audio import AudioExtractor
+    from .cache import TranscriptCache
+    from .checkpoint import SegmentCheckpointer
+    from .config import TranscriberConfig
+    from .downloader import LibraryDownloader, VideoDownloader
+    from .engines import (
+        BackgroundEngine,
+        InferenceEngine,
+        QuantizedWhisperEngine,
+        TranscriptionResult,
+        WhisperEngine,
+        load_engine,
+    )
+    from .exceptions import (
+        AudioExtractionError,
+        DownloadError,
+        MetadataError,
+        ModelLoadError,
+        ServerError,
+        TranscriptionError,
+        TranscriberError,
+        UnseekableStreamError,
+    )
+    from .ingest import UrlIngest
+    from .longform import LongAudioTranscriber
+    from .manifest import JobManifest
+    from .metrics import JobMetrics, MetricsRecorder
+    from .prefetch import MetadataStore, prefetch_metadata
+    from .processor import VideoJob, VideoProcessor
+    from .retranscribe import DecodedAudioStore
+    from .scheduler import CostModel, JobScheduler
+    from .search import SearchIndex
+    from .server import TranscriptionClient, TranscriptionServer
+    from .sinks import MultiSink, SQLiteSink, TextSink, TranscriptSink
+    from .transcriber import AudioTranscriber, CascadeThresholds
+    from .utils import (
+        extract_video_id,
+        read_urls_from_file,
+        sanitize_filename,
+        setup_logging,
+        video_key,
+    )
+    from .vad import EnergyVAD, TimestampMap
+    from .workers import TranscriptionPool
+
+# Public names and the submodules they live in. They are imported on first
+# use, so that importing one submodule (or running the CLI's cheap
+# commands) does not import every other one, and with them numpy.
+_EXPORTS = {
+    "ArtifactCache": "artifacts",
+    "AsyncVideoDownloader": "async_downloader",
+    "AudioExtractor": "audio",
+    "TranscriptCache": "cache",
+    "SegmentCheckpointer": "checkpoint",
+    "TranscriberConfig": "config",
+    "LibraryDownloader": "downloader",
+    "VideoDownloader": "downloader",
+    "BackgroundEngine": "engines",
+    "InferenceEngine": "engines",
+    "QuantizedWhisperEngine": "engines",
+    "TranscriptionResult": "engines",
+    "WhisperEngine": "engines",
+    "load_engine": "engines",
+    "AudioExtractionError": "exceptions",
+    "DownloadError": "exceptions",
+    "MetadataError": "exceptions",
+    "ModelLoadError": "exceptions",
+    "ServerError": "exceptions",
+    "TranscriptionError": "exceptions",
+    "TranscriberError": "exceptions",
+    "UnseekableStreamError": "exceptions",
+    "UrlIngest": "ingest",
+    "LongAudioTranscriber": "longform",
+    "JobManifest": "manifest",
+    "JobMetrics": "metrics",
+    "MetricsRecorder": "metrics",
+    "MetadataStore": "prefetch",
+    "prefetch_metadata": "prefetch",
+    "VideoJob": "processor",
+    "VideoProcessor": "processor",
+    "DecodedAudioStore": "retranscribe",
+    "CostModel": "scheduler",
+    "JobScheduler": "scheduler",
+    "SearchIndex": "search",
+    "TranscriptionClient": "server",
+    "TranscriptionServer": "server",
+    "MultiSink": "sinks",
+    "SQLiteSink": "sinks",
+    "TextSink": "sinks",
+    "TranscriptSink": "sinks",
+    "AudioTranscriber": "transcriber",
+    "CascadeThresholds": "transcriber",
+    "extract_video_id": "utils",
+    "read_urls_from_file": "utils",
+    "sanitize_filename": "utils",
+    "setup_logging": "utils",
+    "video_key": "utils",
+    "EnergyVAD": "vad",
+    "TimestampMap": "vad",
+    "TranscriptionPool": "workers",
+}
 
 __all__ = [
+    "AsyncVideoDownloader",
+    "BackgroundEngine",
     "AudioExtractor",
     "AudioExtractionError",
     "DownloadError",
+    "EnergyVAD",
+    "InferenceEngine",
+    "JobManifest",
+    "JobMetrics",
+    "JobScheduler",
+    "LibraryDownloader",
+    "LongAudioTranscriber",
+    "MetadataStore",
     "MetadataError",
+    "ModelLoadError",
+    "MetricsRecorder",
+    "MultiSink",
+    "QuantizedWhisperEngine",
+    "SQLiteSink",
+    "SearchIndex",
+    "ServerError",
+    "TextSink",
     "TranscriptionError",
     "TranscriberConfig",
     "TranscriberError",
+    "TimestampMap",
+    "TranscriptCache",
+    "TranscriptSink",
+    "TranscriptionClient",
+    "TranscriptionPool",
+    "TranscriptionResult",
+    "TranscriptionServer",
+    "UnseekableStreamError",
+    "UrlIngest",
     "VideoDownloader",
+    "VideoJob",
     "VideoProcessor",
+    "WhisperEngine",
     "AudioTranscriber",
+    "CascadeThresholds",
+    "CostModel",
+    "ArtifactCache",
+    "DecodedAudioStore",
+    "SegmentCheckpointer",
+    "extract_video_id",
+    "load_engine",
+    "prefetch_metadata",
     "read_urls_from_file",
     "sanitize_filename",
     "setup_logging",
+    "video_key",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the public names along with the module's own attributes."""
+    return sorted(set(globals()) | set(__all__))
@@ -1,23 +1,104 @@
 """Command-line interface for video transcriber."""
 
 import argparse
+import importlib.util
+import itertools
+import json
 import logging
+import os
+import signal
+import sqlite3
 import sys
-from pathlib import Path
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
 
-from .audio import AudioExtractor
-from .config import TranscriberConfig
-from .downloader import VideoDownloader
+from .artifacts import ArtifactCache
+from .async_downloader import AsyncVideoDownloader
+from .audio import AUDIO_FORMATS, AudioExtractor
+from .cache import TranscriptCache
+from .checkpoint import SegmentCheckpointer
+from .config import (
+    ARTIFACT_INDEX_FILENAME,
+    CHECKPOINT_DIRNAME,
+    DECODED_AUDIO_DIRNAME,
+    DEFAULT_ARTIFACT_CACHE_MAX_MB,
+    DEFAULT_AUDIO_FORMAT,
+    DEFAULT_BATCH_MAX_WAIT,
+    DEFAULT_AUDIO_TIMEOUT_PER_MINUTE,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHECKPOINT_SECONDS,
+    DEFAULT_DEDUPE_MEMORY_KEYS,
+    DEFAULT_CASCADE_COMPRESSION_RATIO_THRESHOLD,
+    DEFAULT_CASCADE_LOGPROB_THRESHOLD,
+    DEFAULT_CASCADE_NO_SPEECH_THRESHOLD,
+    DEFAULT_DOWNLOAD_RETRIES,
+    DEFAULT_DOWNLOAD_TIMEOUT_PER_MINUTE,
+    DEFAULT_DOWNLOAD_WORKERS,
+    DEFAULT_DOWNLOADER_BACKEND,
+    DEFAULT_EXTRACT_WORKERS,
+    DEFAULT_HOST_BURST,
+    DEFAULT_HOST_RATE,
+    DEFAULT_INFERENCE_ENGINE,
+    DEFAULT_LONG_AUDIO_CHUNK_SECONDS,
+    DEFAULT_METRICS_INTERVAL,
+    DEFAULT_NETWORK_CONCURRENCY,
+    DEFAULT_PIPELINE_QUEUE_SIZE,
+    DEFAULT_PREFETCH_CHUNK_SIZE,
+    DEFAULT_PREFETCH_WORKERS,
+    DEFAULT_SCHEDULE,
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+    DEFAULT_SINK,
+    DEFAULT_THREADS_PER_PROCESS,
+    DEFAULT_TRANSCRIPT_CACHE_MAX_MB,
+    DEFAULT_TRANSCRIBE_WORKERS,
+    DEFAULT_URLS_FILE,
+    DOWNLOADER_BACKENDS,
+    INFERENCE_ENGINES,
+    MANIFEST_FILENAME,
+    SCHEDULE_MAX_LIST_URLS,
+    SCHEDULES,
+    SEARCH_INDEX_FILENAME,
+    SINKS,
+    TRANSCRIPT_STORE_FILENAME,
+    TranscriberConfig,
+)
+from .downloader import LibraryDownloader, VideoDownloader
+from .engines import BackgroundEngine, load_engine
+from .exceptions import ModelLoadError, ServerError
+from .ingest import STDIN_SOURCE, UrlIngest
+from .longform import SEARCH_SECONDS, LongAudioTranscriber
+from .manifest import STATE_DONE, STATE_FAILED, JobManifest
+from .metrics import MetricsRecorder, instrument_model
+from .prefetch import MetadataStore
 from .processor import VideoProcessor
-from .transcriber import AudioTranscriber
-from .utils import read_urls_from_file, setup_logging
+from .retranscribe import DecodedAudioStore, output_label, retranscribe
+from .scheduler import CostModel, JobScheduler
+from .search import SearchIndex, backfill, format_timestamp
+from .server import TranscriptionClient, TranscriptionServer
+from .sinks import MultiSink, SQLiteSink, TextSink, TranscriptSink
+from .transcriber import AudioTranscriber, CascadeThresholds
+from .utils import setup_logging, video_key
+from .vad import EnergyVAD
+from .workers import TranscriptionPool
 
 logger = logging.getLogger(__name__)
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+    
+    A leading ``serve`` argument selects daemon mode, which takes the same
+    processing options plus ``--host`` and ``--port``.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    serve = bool(argv) and argv[0] == "serve"
+    if serve:
+        argv = argv[1:]
+    
     parser = argparse.ArgumentParser(
+        prog="video_transcriber serve" if serve else None,
         description="Download TikTok videos and generate transcripts using Whisper",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -28,19 +109,60 @@ Examples:
   # Use a different Whisper model
   python -m video_transcriber --model medium
   
+  # Transcribe with tiny, redoing low-confidence clips with medium
+  python -m video_transcriber --model tiny --cascade-model medium
+  
   # Use a custom URLs file
   python -m video_transcriber --urls my_urls.txt
   
+  # Read several lists, a glob of lists, or stdin; duplicate videos run once
+  python -m video_transcriber --urls 'lists/*.txt' extra.txt
+  cat huge_list.txt | python -m video_transcriber --urls -
+  
   # Enable debug logging
   python -m video_transcriber --debug
+  
+  # Overlap downloads, extraction and transcription
+  python -m video_transcriber --pipeline --download-workers 4
+  
+  # Keep the model loaded in a daemon and hand it URLs
+  python -m video_transcriber serve --model medium
+  python -m video_transcriber --server http://127.0.0.1:8765
+  
+  # Keep transcripts in one SQLite store and stream them out as JSON lines
+  python -m video_transcriber --sink sqlite
+  python -m video_transcriber export --since 2024-06-01 --segments
+  
+  # Index transcripts as they are saved, then search them
+  python -m video_transcriber --index
+  python -m video_transcriber search '"machine learning"' --creator alice
+  python -m video_transcriber backfill
         """
     )
     
     parser.add_argument(
         "--urls",
         type=str,
-        default="urls.txt",
-        help="Path to file containing URLs (default: urls.txt)"
+        nargs="+",
+        default=[DEFAULT_URLS_FILE],
+        metavar="SOURCE",
+        help="Files containing URLs, glob patterns of files, or - for stdin "
+             f"(default: {DEFAULT_URLS_FILE})"
+    )
+    
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Process every URL, even several pointing at the same video"
+    )
+    
+    parser.add_argument(
+        "--dedupe-memory",
+        type=int,
+        default=DEFAULT_DEDUPE_MEMORY_KEYS,
+        metavar="N",
+        help="Distinct videos remembered in memory while deduplicating before "
+             f"spilling to disk (default: {DEFAULT_DEDUPE_MEMORY_KEYS})"
     )
     
     parser.add_argument(
@@ -51,6 +173,48 @@ Examples:
         help="Whisper model size (default: base)"
     )
     
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=DEFAULT_INFERENCE_ENGINE,
+        choices=INFERENCE_ENGINES,
+        help="Inference engine; whisper-int8 quantizes the model's linear "
+             f"layers to int8 for faster CPU inference (default: {DEFAULT_INFERENCE_ENGINE})"
+    )
+    
+    parser.add_argument(
+        "--cascade-model",
+        type=str,
+        default=None,
+        choices=["tiny", "base", "small", "medium", "large"],
+        help="Larger Whisper model that low-confidence clips are transcribed "
+             "again with; loaded when first needed (default: none)"
+    )
+    
+    parser.add_argument(
+        "--cascade-logprob",
+        type=float,
+        default=DEFAULT_CASCADE_LOGPROB_THRESHOLD,
+        help="Escalate clips with a segment whose average token log-probability "
+             f"is below this (default: {DEFAULT_CASCADE_LOGPROB_THRESHOLD})"
+    )
+    
+    parser.add_argument(
+        "--cascade-compression-ratio",
+        type=float,
+        default=DEFAULT_CASCADE_COMPRESSION_RATIO_THRESHOLD,
+        help="Escalate clips with a segment whose compression ratio is above "
+             f"this (default: {DEFAULT_CASCADE_COMPRESSION_RATIO_THRESHOLD})"
+    )
+    
+    parser.add_argument(
+        "--cascade-no-speech",
+        type=float,
+        default=DEFAULT_CASCADE_NO_SPEECH_THRESHOLD,
+        help="Escalate clips with a segment whose no-speech probability is "
+             f"above this (default: {DEFAULT_CASCADE_NO_SPEECH_THRESHOLD})"
+    )
+    
     parser.add_argument(
         "--video-dir",
         type=str,
@@ -72,17 +236,1209 @@ Examples:
         help="Directory for transcripts (default: transcripts)"
     )
     
+    parser.add_argument(
+        "--audio-format",
+        type=str,
+        default=DEFAULT_AUDIO_FORMAT,
+        choices=AUDIO_FORMATS,
+        help="Extracted audio format; wav and npy are 16 kHz mono PCM that "
+             f"Whisper can use without decoding again (default: {DEFAULT_AUDIO_FORMAT})"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Pipe downloads through ffmpeg into memory without writing "
+             "videos or audio to disk"
+    )
+    
+    parser.add_argument(
+        "--sink",
+        type=str,
+        default=DEFAULT_SINK,
+        choices=SINKS,
+        help="Write transcripts as text files, into a SQLite store, or both "
+             f"(default: {DEFAULT_SINK})"
+    )
+    
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="Path to the SQLite transcript store (default: "
+             f"<transcript-dir>/{TRANSCRIPT_STORE_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Add every saved transcript to a full-text search index"
+    )
+    
+    parser.add_argument(
+        "--index-file",
+        type=str,
+        default=None,
+        help="Path to the search index (default: "
+             f"<transcript-dir>/{SEARCH_INDEX_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Path to the job manifest (default: <transcript-dir>/.manifest.sqlite)"
+    )
+    
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Do not record or consult the job manifest"
+    )
+    
+    parser.add_argument(
+        "--transcript-cache",
+        action="store_true",
+        help="Reuse transcripts of identical audio (reposts, re-uploads)"
+    )
+    
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        default=None,
+        help="Path to the transcript cache (default: "
+             "<transcript-dir>/.transcript_cache.sqlite)"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_TRANSCRIPT_CACHE_MAX_MB,
+        help="Size limit of the transcript cache in MB (default: "
+             f"{DEFAULT_TRANSCRIPT_CACHE_MAX_MB})"
+    )
+    
+    parser.add_argument(
+        "--artifact-cache",
+        action="store_true",
+        help="Keep downloaded videos and extracted audio within a size budget and "
+             "reuse them on later runs instead of downloading again"
+    )
+    
+    parser.add_argument(
+        "--artifact-cache-mb",
+        type=int,
+        default=DEFAULT_ARTIFACT_CACHE_MAX_MB,
+        help="Disk budget for cached videos and audio in MB; least recently used "
+             f"files are deleted beyond it (default: {DEFAULT_ARTIFACT_CACHE_MAX_MB})"
+    )
+    
+    parser.add_argument(
+        "--artifact-index",
+        type=str,
+        default=None,
+        help="Path to the artifact cache index (default: "
+             f"<transcript-dir>/{ARTIFACT_INDEX_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--downloader",
+        type=str,
+        default=DEFAULT_DOWNLOADER_BACKEND,
+        choices=DOWNLOADER_BACKENDS,
+        help="Run yt-dlp as a subprocess per call or in-process as a library "
+             f"(default: {DEFAULT_DOWNLOADER_BACKEND})"
+    )
+    
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_DOWNLOAD_RETRIES,
+        help="Retry failed downloads this many times, with backoff (default: "
+             f"{DEFAULT_DOWNLOAD_RETRIES})"
+    )
+    
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Fetch all metadata up front with a few bulk yt-dlp calls"
+    )
+    
+    parser.add_argument(
+        "--prefetch-chunk",
+        type=int,
+        default=DEFAULT_PREFETCH_CHUNK_SIZE,
+        help=f"URLs per bulk yt-dlp call (default: {DEFAULT_PREFETCH_CHUNK_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--prefetch-workers",
+        type=int,
+        default=DEFAULT_PREFETCH_WORKERS,
+        help=f"Bulk yt-dlp calls run at once (default: {DEFAULT_PREFETCH_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--metadata-file",
+        type=str,
+        default=None,
+        help="Keep prefetched metadata in this SQLite file, so reruns reuse it "
+             "(default: in memory)"
+    )
+    
+    parser.add_argument(
+        "--min-duration",
+        type=float,
+        default=None,
+        help="Skip videos shorter than this many seconds; implies --prefetch"
+    )
+    
+    parser.add_argument(
+        "--max-duration",
+        type=float,
+        default=None,
+        help="Skip videos longer than this many seconds; implies --prefetch"
+    )
+    
+    parser.add_argument(
+        "--schedule",
+        type=str,
+        default=DEFAULT_SCHEDULE,
+        choices=SCHEDULES,
+        help="Run URLs in input order, or the longest videos first so no long "
+             "video is left running alone at the end; longest-first implies "
+             "--prefetch and only helps with --pipeline or --async. Lists of up "
+             f"to {SCHEDULE_MAX_LIST_URLS:,} URLs are ordered as a whole, longer "
+             "ones and stdin per prefetch window "
+             f"(default: {DEFAULT_SCHEDULE})"
+    )
+    
+    parser.add_argument(
+        "--download-timeout-per-min",
+        type=float,
+        default=DEFAULT_DOWNLOAD_TIMEOUT_PER_MINUTE,
+        metavar="SECONDS",
+        help="Seconds added to the download timeout per minute of video "
+             f"(default: {DEFAULT_DOWNLOAD_TIMEOUT_PER_MINUTE:g})"
+    )
+    
+    parser.add_argument(
+        "--audio-timeout-per-min",
+        type=float,
+        default=DEFAULT_AUDIO_TIMEOUT_PER_MINUTE,
+        metavar="SECONDS",
+        help="Seconds added to the audio extraction timeout per minute of video "
+             f"(default: {DEFAULT_AUDIO_TIMEOUT_PER_MINUTE:g})"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="async_network",
+        action="store_true",
+        help="Fetch metadata and download many URLs at once with asyncio; implies --pipeline"
+    )
+    
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_NETWORK_CONCURRENCY,
+        help="yt-dlp calls in flight at once with --async (default: "
+             f"{DEFAULT_NETWORK_CONCURRENCY})"
+    )
+    
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        default=DEFAULT_HOST_RATE,
+        help="yt-dlp calls started per second per host with --async; 0 for no limit "
+             f"(default: {DEFAULT_HOST_RATE})"
+    )
+    
+    parser.add_argument(
+        "--host-burst",
+        type=int,
+        default=DEFAULT_HOST_BURST,
+        help=f"Calls a host may get at once after being idle (default: {DEFAULT_HOST_BURST})"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run download, extraction and transcription as overlapping stages"
+    )
+    
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DEFAULT_DOWNLOAD_WORKERS,
+        help=f"Download threads in pipeline mode (default: {DEFAULT_DOWNLOAD_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=DEFAULT_EXTRACT_WORKERS,
+        help=f"Audio extraction threads in pipeline mode (default: {DEFAULT_EXTRACT_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--transcribe-workers",
+        type=int,
+        default=DEFAULT_TRANSCRIBE_WORKERS,
+        help=f"Transcription threads in pipeline mode (default: {DEFAULT_TRANSCRIBE_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_PIPELINE_QUEUE_SIZE,
+        help=f"Max jobs waiting between pipeline stages (default: {DEFAULT_PIPELINE_QUEUE_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Cut audio down to its speech regions before transcription"
+    )
+    
+    parser.add_argument(
+        "--vad-music-threshold",
+        type=float,
+        default=0.0,
+        help="With --vad, also drop loud regions whose energy varies by less "
+             "than this many dB, i.e. steady music (default: 0, keep music)"
+    )
+    
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Transcribe in this many worker processes, each with its own "
+             "model (default: 0, transcribe in the main process)"
+    )
+    
+    parser.add_argument(
+        "--threads-per-process",
+        type=int,
+        default=DEFAULT_THREADS_PER_PROCESS,
+        help="torch threads per transcription worker process (default: "
+             f"{DEFAULT_THREADS_PER_PROCESS})"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Clips per batched Whisper call in pipeline mode (default: "
+             f"{DEFAULT_BATCH_SIZE}, no batching)"
+    )
+    
+    parser.add_argument(
+        "--batch-wait",
+        type=float,
+        default=DEFAULT_BATCH_MAX_WAIT,
+        help="Max seconds to wait for a batch to fill (default: "
+             f"{DEFAULT_BATCH_MAX_WAIT})"
+    )
+    
+    parser.add_argument(
+        "--long-audio",
+        action="store_true",
+        help="Split long clips at pauses and transcribe the pieces in parallel"
+    )
+    
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=DEFAULT_LONG_AUDIO_CHUNK_SECONDS,
+        help="Target chunk length for --long-audio, more than "
+             f"{SEARCH_SECONDS:.0f} (default: {DEFAULT_LONG_AUDIO_CHUNK_SECONDS:.0f})"
+    )
+    
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=0,
+        help="Chunks of one clip transcribed at once with --long-audio "
+             "(default: 0, one per worker process)"
+    )
+    
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Save the segments of long clips to disk as they are transcribed, so "
+             "a crashed or preempted run resumes them instead of starting over"
+    )
+    
+    parser.add_argument(
+        "--checkpoint-seconds",
+        type=float,
+        default=DEFAULT_CHECKPOINT_SECONDS,
+        help="Audio transcribed between checkpoints; longer clips are checkpointed "
+             f"(default: {DEFAULT_CHECKPOINT_SECONDS:.0f})"
+    )
+    
+    parser.add_argument(
+        "--checkpoint-dir",
+        type=str,
+        default=None,
+        help="Directory for checkpoint files (default: "
+             f"<transcript-dir>/{CHECKPOINT_DIRNAME})"
+    )
+    
+    parser.add_argument(
+        "--metrics-jsonl",
+        type=str,
+        default=None,
+        help="Append one JSON event per finished job to this file"
+    )
+    
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        default=None,
+        help="Write stage timing histograms to this Prometheus textfile"
+    )
+    
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_METRICS_INTERVAL,
+        help="Seconds between metrics exports during a run (default: "
+             f"{DEFAULT_METRICS_INTERVAL:.0f})"
+    )
+    
+    if serve:
+        parser.add_argument(
+            "--host",
+            type=str,
+            default=DEFAULT_SERVER_HOST,
+            help=f"Interface the daemon listens on (default: {DEFAULT_SERVER_HOST})"
+        )
+        
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=DEFAULT_SERVER_PORT,
+            help=f"Port the daemon listens on (default: {DEFAULT_SERVER_PORT})"
+        )
+    else:
+        parser.add_argument(
+            "--server",
+            type=str,
+            default=None,
+            help="Submit the URLs to a running daemon (e.g. "
+                 f"http://{DEFAULT_SERVER_HOST}:{DEFAULT_SERVER_PORT}) instead "
+                 "of processing them here"
+        )
+        
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the URLs that would be processed, leaving out those the "
+                 "manifest has as done, without loading the model or downloading"
+        )
+    
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Enable debug logging"
     )
     
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.chunk_seconds <= SEARCH_SECONDS:
+        # Cuts are searched for within SEARCH_SECONDS of the target length
+        parser.error(f"--chunk-seconds must be more than {SEARCH_SECONDS:.0f}")
+    args.serve = serve
+    return args
+
+
+def load_urls(config: TranscriberConfig) -> Optional[Iterator[str]]:
+    """
+    Open the URLs to process as a stream, logging why if there are none.
+    
+    Only the first URL is read here; the rest are read as the processor
+    gets to them.
+    
+    Args:
+        config: Configuration naming the URL sources
+        
+    Returns:
+        Iterator over the URLs, or None if a source is missing, unreadable
+        or they are all empty
+    """
+    try:
+        ingest = UrlIngest(
+            config.sources,
+            dedupe=config.dedupe_urls,
+            max_memory_keys=config.dedupe_memory_keys,
+        )
+    except FileNotFoundError as e:
+        logger.error(f"Error: {e}.")
+        logger.error("Create a URLs file with one TikTok URL per line.")
+        return None
+    
+    logger.info(f"Reading URLs from {', '.join(ingest.paths)}")
+    urls = iter(ingest)
+    try:
+        first = next(urls, None)
+    except Exception as e:
+        logger.error(f"Error reading URLs file: {e}")
+        return None
+    
+    if first is None:
+        logger.error("No URLs found in file")
+        return None
+    
+    return itertools.chain([first], urls)
+
+
+def buffer_urls(config: TranscriberConfig, urls: Iterator[str]) -> Iterable[str]:
+    """
+    Read the URLs into a list, if there are few enough, so they can be scheduled as a whole.
+    
+    A processor orders a list all at once but a stream one prefetch window
+    at a time. Stdin is left as a stream, since it may never end.
+    
+    Args:
+        config: Configuration naming the URL sources
+        urls: Iterator from load_urls
+        
+    Returns:
+        A list of at most SCHEDULE_MAX_LIST_URLS URLs, or else the stream
+    """
+    if STDIN_SOURCE in config.sources:
+        logger.info("URLs from stdin are ordered one prefetch window at a time")
+        return urls
+    head = list(itertools.islice(urls, SCHEDULE_MAX_LIST_URLS + 1))
+    if len(head) <= SCHEDULE_MAX_LIST_URLS:
+        return head
+    logger.info(
+        f"More than {SCHEDULE_MAX_LIST_URLS:,} URLs; ordering them one prefetch "
+        "window at a time"
+    )
+    return itertools.chain(head, urls)
+
+
+def create_processor(config: TranscriberConfig) -> Optional[VideoProcessor]:
+    """
+    Load the model and set up every component the processor needs.
+    
+    Args:
+        config: Configuration; pipeline settings may be adjusted for
+            multi-process transcription
+            
+    Returns:
+        Ready processor, or None if the model could not be loaded
+    """
+    vad = EnergyVAD(music_modulation_db=config.vad_music_threshold) if config.vad else None
+    cascade_thresholds = CascadeThresholds(
+        logprob=config.cascade_logprob_threshold,
+        compression_ratio=config.cascade_compression_ratio_threshold,
+        no_speech=config.cascade_no_speech_threshold,
+    )
+    checkpointer = None
+    if config.checkpoint:
+        checkpointer = SegmentCheckpointer(config.checkpoint_path, config.checkpoint_seconds)
+    
+    # Load Whisper model
+    if config.transcribe_processes > 0:
+        if importlib.util.find_spec("whisper") is None:
+            logger.error("Error: openai-whisper not installed. Run: pip install openai-whisper")
+            return None
+        # Each worker process loads its own copy of the model
+        transcriber: AudioTranscriber = TranscriptionPool(
+            config.whisper_model,
+            config.transcribe_processes,
+            config.threads_per_process,
+            vad=vad,
+            cascade_model=config.cascade_model,
+            cascade_thresholds=cascade_thresholds,
+            engine=config.inference_engine,
+            checkpointer=checkpointer,
+            instrument=config.metrics_enabled,
+        )
+        if not config.pipeline:
+            logger.info("Enabling pipeline mode to keep the transcription workers busy")
+            config.pipeline = True
+        config.transcribe_workers = max(config.transcribe_workers, config.transcribe_processes)
+    else:
+        loaded = create_transcriber(config, vad, cascade_thresholds, checkpointer=checkpointer)
+        if loaded is None:
+            return None
+        transcriber = loaded
+    
+    # Initialize components
+    if config.async_network:
+        downloader: VideoDownloader = AsyncVideoDownloader(
+            download_timeout=config.download_timeout,
+            metadata_timeout=config.metadata_timeout,
+            max_concurrency=config.network_concurrency,
+            host_rate=config.host_rate,
+            host_burst=config.host_burst,
+            in_process=config.downloader_backend == "library",
+        )
+    else:
+        downloader_class: Type[VideoDownloader]
+        if config.downloader_backend == "library":
+            downloader_class = LibraryDownloader
+        else:
+            downloader_class = VideoDownloader
+        downloader = downloader_class(
+            download_timeout=config.download_timeout,
+            metadata_timeout=config.metadata_timeout
+        )
+    audio_extractor = AudioExtractor(
+        timeout=config.audio_timeout,
+        audio_format=config.audio_format
+    )
+    manifest = JobManifest(config.manifest_path) if config.use_manifest else None
+    transcript_cache = None
+    if config.use_transcript_cache:
+        transcript_cache = TranscriptCache(
+            config.transcript_cache_path,
+            config.transcript_cache_max_mb * 1024 * 1024
+        )
+    artifacts = None
+    if config.artifact_cache:
+        artifacts = ArtifactCache(
+            config.artifact_index_path,
+            config.artifact_cache_max_mb * 1024 * 1024
+        )
+    metrics = None
+    if config.metrics_enabled:
+        metrics = MetricsRecorder(
+            config.metrics_jsonl_file,
+            config.metrics_prometheus_file,
+            config.metrics_interval,
+        )
+        metrics.start()
+    long_audio = None
+    if config.long_audio:
+        long_audio = LongAudioTranscriber(
+            transcriber,
+            config.long_audio_chunk_seconds,
+            config.long_audio_workers or config.transcribe_processes,
+        )
+    metadata = MetadataStore(config.metadata_file) if config.prefetch_enabled else None
+    scheduler = None
+    # Any schedule but fifo turns on prefetching, so the store is there
+    if metadata is not None and config.schedule == "longest-first":
+        cost_model = CostModel(long_audio=long_audio)
+        if config.metrics_jsonl_file:
+            cost_model.load_history(config.metrics_jsonl_file)
+        scheduler = JobScheduler(metadata, cost_model)
+        if not config.pipeline and not config.async_network:
+            logger.warning(
+                "--schedule longest-first cannot shorten a run that processes "
+                "one video at a time; use it with --pipeline or --async"
+            )
+    return VideoProcessor(
+        config,
+        downloader,
+        audio_extractor,
+        transcriber,
+        manifest,
+        transcript_cache,
+        metrics,
+        long_audio,
+        metadata,
+        create_sink(config),
+        scheduler,
+        artifacts,
+    )
+
+
+def create_transcriber(
+    config: TranscriberConfig,
+    vad: Optional[EnergyVAD] = None,
+    cascade_thresholds: Optional[CascadeThresholds] = None,
+    decode_options: Optional[Dict[str, Any]] = None,
+    checkpointer: Optional[SegmentCheckpointer] = None,
+) -> Optional[AudioTranscriber]:
+    """
+    Start loading the model and wrap it in an in-process transcriber.
+    
+    The model loads on a background thread, so the caller can go on to
+    fetch metadata and download while it does; the first transcription
+    waits for it.
+    
+    Args:
+        config: Configuration naming the model, engine and cascade model
+        vad: Optional voice activity detector
+        cascade_thresholds: When a clip is handed on to the cascade model
+        decode_options: Extra keyword arguments for the model's ``transcribe``
+        checkpointer: Optional checkpointer for long clips
+        
+    Returns:
+        Transcriber, or None if openai-whisper is not installed
+    """
+    # Checked up front, without importing it, so a missing install fails
+    # before any download rather than at the first transcription
+    if importlib.util.find_spec("whisper") is None:
+        logger.error("Error: openai-whisper not installed. Run: pip install openai-whisper")
+        return None
+    logger.info(
+        f"Loading Whisper model ({config.whisper_model}, {config.inference_engine}) "
+        "in the background..."
+    )
+    model = BackgroundEngine(
+        config.whisper_model,
+        config.inference_engine,
+        prepare=instrument_model if config.metrics_enabled else None,
+    )
+    
+    def load_cascade_model(name: str) -> Any:
+        cascade = load_engine(name, config.inference_engine)
+        if config.metrics_enabled:
+            instrument_model(cascade)
+        return cascade
+    
+    return AudioTranscriber(
+        model,
+        decode_options,
+        vad=vad,
+        cascade_model=config.cascade_model,
+        cascade_thresholds=cascade_thresholds,
+        load_model=load_cascade_model,
+        checkpointer=checkpointer,
+    )
+
+
+def create_sink(config: TranscriberConfig) -> TranscriptSink:
+    """Build the transcript sink the configuration asks for."""
+    sinks: List[TranscriptSink] = []
+    if config.sink in ("text", "both"):
+        sinks.append(TextSink())
+    if config.sink in ("sqlite", "both"):
+        sinks.append(SQLiteSink(config.store_path))
+    if config.search_index:
+        sinks.append(SearchIndex(config.search_index_path))
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+
+def close_processor(processor: VideoProcessor) -> None:
+    """Release the processor's databases and worker processes, and log cache stats."""
+    if processor.manifest is not None:
+        processor.manifest.close()
+    processor.sink.close()
+    if processor.metadata is not None:
+        processor.metadata.close()
+    if processor.transcript_cache is not None:
+        processor.transcript_cache.close()
+        logger.info(
+            f"Transcript cache: {processor.transcript_cache.hits} hits, "
+            f"{processor.transcript_cache.misses} misses"
+        )
+    if processor.artifacts is not None:
+        processor.artifacts.close()
+        logger.info(
+            f"Artifact cache: {processor.artifacts.hits} hits, "
+            f"{processor.artifacts.misses} misses, "
+            f"{processor.artifacts.total_bytes / 1024 / 1024:.0f} MB on disk"
+        )
+    transcriber = processor.transcriber
+    if transcriber.escalation_rate is not None:
+        logger.info(
+            f"Cascade: {transcriber.escalations} of {transcriber.cascade_clips} clips "
+            f"({transcriber.escalation_rate:.1%}) escalated to {transcriber.cascade_model}"
+        )
+    if isinstance(transcriber, TranscriptionPool):
+        transcriber.close()
+    if isinstance(processor.downloader, AsyncVideoDownloader):
+        processor.downloader.close()
+    if processor.metrics is not None:
+        stage_means, rtf = processor.metrics.summary()
+        processor.metrics.close()
+        if stage_means:
+            logger.info("Mean seconds per job: " + ", ".join(
+                f"{name} {seconds:.2f}" for name, seconds in sorted(stage_means.items())
+            ))
+        if rtf is not None:
+            logger.info(f"Mean real-time factor: {rtf:.3f}")
+
+
+def serve(config: TranscriberConfig, host: str, port: int) -> int:
+    """
+    Run the resident daemon until interrupted.
+    
+    Args:
+        config: Configuration used for every submission
+        host: Interface to listen on
+        port: Port to listen on
+        
+    Returns:
+        Process exit code
+    """
+    config.create_directories()
+    processor = create_processor(config)
+    if processor is None:
+        return 1
+    
+    # A resident daemon is no use without its model, so wait for it up front
+    try:
+        processor.transcriber.check_model(wait=True)
+    except ModelLoadError as e:
+        logger.error(f"Error: {e}")
+        close_processor(processor)
+        return 1
+    
+    try:
+        server = TranscriptionServer(processor, host, port)
+    except OSError as e:
+        logger.error(f"Could not listen on {host}:{port}: {e}")
+        close_processor(processor)
+        return 1
+    
+    # Let SIGTERM (e.g. from systemd) shut down as cleanly as Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        server.shutdown()
+        close_processor(processor)
+    return 0
+
+
+def parse_export_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``export`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="video_transcriber export",
+        description="Stream transcripts out of the SQLite transcript store as JSON lines",
+    )
+    
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=os.path.join("transcripts", TRANSCRIPT_STORE_FILENAME),
+        help=f"Path to the transcript store (default: transcripts/{TRANSCRIPT_STORE_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only transcripts written at or after this ISO date/time"
+    )
+    
+    parser.add_argument(
+        "--uploader",
+        type=str,
+        default=None,
+        help="Only transcripts by this uploader"
+    )
+    
+    parser.add_argument(
+        "--segments",
+        action="store_true",
+        help="Include each transcript's timed segments"
+    )
+    
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write to this file instead of standard output"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def export(args: argparse.Namespace) -> int:
+    """
+    Write stored transcripts as JSON lines.
+    
+    Args:
+        args: Parsed ``export`` arguments
+        
+    Returns:
+        Process exit code
+    """
+    if not os.path.exists(args.store):
+        logger.error(f"Error: transcript store {args.store} not found")
+        return 1
+    sink = SQLiteSink(args.store)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        for record in sink.iter_transcripts(args.since, args.uploader, args.segments):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        sink.close()
+    logger.info(f"Exported {count} transcripts")
+    return 0
+
+
+def parse_search_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``search`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="video_transcriber search",
+        description="Search transcripts in the full-text search index",
+        epilog='Words must all occur in the same segment; put a phrase in double quotes, '
+               'e.g. \'"machine learning"\'. OR, NOT and prefix* are also supported.',
+    )
+    
+    parser.add_argument(
+        "query",
+        type=str,
+        help="Search query"
+    )
+    
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=os.path.join("transcripts", SEARCH_INDEX_FILENAME),
+        help=f"Path to the search index (default: transcripts/{SEARCH_INDEX_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--phrase",
+        action="store_true",
+        help="Match the whole query as one phrase"
+    )
+    
+    parser.add_argument(
+        "--creator",
+        type=str,
+        default=None,
+        help="Only videos by this creator"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only videos published (or, if unknown, transcribed) on or after this YYYY-MM-DD date"
+    )
+    
+    parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="Only videos published (or, if unknown, transcribed) on or before this date"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of hits (default: 20)"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def search(args: argparse.Namespace) -> int:
+    """
+    Print the passages that match a query, best first.
+    
+    Args:
+        args: Parsed ``search`` arguments
+        
+    Returns:
+        Process exit code
+    """
+    if not os.path.exists(args.index):
+        logger.error(f"Error: search index {args.index} not found")
+        return 1
+    query = args.query
+    if args.phrase:
+        query = '"' + query.replace('"', '""') + '"'
+    index = SearchIndex(args.index)
+    try:
+        hits = index.search(query, args.creator, args.since, args.until, args.limit)
+    except sqlite3.OperationalError as e:
+        logger.error(f"Error: invalid query: {e}")
+        return 1
+    finally:
+        index.close()
+    
+    for hit in hits:
+        print(f"{hit['creator'] or 'Unknown'} - {hit['title'] or 'Unknown'} ({hit['date'] or '?'})")
+        print(f"  {hit['url']}")
+        timestamp = format_timestamp(hit["start"])
+        print(f"  {timestamp + ' ' if timestamp else ''}{hit['snippet']}")
+        print()
+    logger.info(f"{len(hits)} hits")
+    return 0
+
+
+def parse_backfill_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``backfill`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="video_transcriber backfill",
+        description="Add existing .txt transcripts to the full-text search index",
+    )
+    
+    parser.add_argument(
+        "--transcript-dir",
+        type=str,
+        default="transcripts",
+        help="Directory of .txt transcripts (default: transcripts)"
+    )
+    
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=None,
+        help=f"Path to the search index (default: <transcript-dir>/{SEARCH_INDEX_FILENAME})"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def run_backfill(args: argparse.Namespace) -> int:
+    """
+    Index the text transcripts that are not in the search index yet.
+    
+    Args:
+        args: Parsed ``backfill`` arguments
+        
+    Returns:
+        Process exit code
+    """
+    if not os.path.isdir(args.transcript_dir):
+        logger.error(f"Error: transcript directory {args.transcript_dir} not found")
+        return 1
+    index = SearchIndex(args.index or os.path.join(args.transcript_dir, SEARCH_INDEX_FILENAME))
+    try:
+        indexed, skipped = backfill(index, args.transcript_dir)
+    finally:
+        index.close()
+    logger.info(f"Indexed {indexed} transcripts ({skipped} files without a transcript header)")
+    return 0
+
+
+def parse_retranscribe_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the arguments of the ``retranscribe`` subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="video_transcriber retranscribe",
+        description="Transcribe finished jobs again from their extracted audio, with "
+                    "another model or decode options, without downloading anything",
+    )
+    
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="base",
+        choices=["tiny", "base", "small", "medium", "large"],
+        help="Whisper model size (default: base)"
+    )
+    
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=DEFAULT_INFERENCE_ENGINE,
+        choices=INFERENCE_ENGINES,
+        help=f"Inference engine (default: {DEFAULT_INFERENCE_ENGINE})"
+    )
+    
+    parser.add_argument(
+        "--option",
+        type=str,
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Decode option passed to the model, e.g. beam_size=5 or language=en; "
+             "values are read as JSON where possible. Can be repeated."
+    )
+    
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Cut audio down to its speech regions before transcription"
+    )
+    
+    parser.add_argument(
+        "--label",
+        type=str,
+        default=None,
+        help="Name of the output directory inside the transcript directory "
+             "(default: the model name, plus the engine and a hash of the options)"
+    )
+    
+    parser.add_argument(
+        "--transcript-dir",
+        type=str,
+        default="transcripts",
+        help="Directory of the original transcripts (default: transcripts)"
+    )
+    
+    parser.add_argument(
+        "--audio-dir",
+        type=str,
+        default="audio",
+        help="Directory of the extracted audio (default: audio)"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Job manifest listing the finished jobs (default: "
+             f"<transcript-dir>/{MANIFEST_FILENAME})"
+    )
+    
+    parser.add_argument(
+        "--decoded-dir",
+        type=str,
+        default=None,
+        help="Where decoded audio is kept between runs (default: "
+             f"<audio-dir>/{DECODED_AUDIO_DIRNAME})"
+    )
+    
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Transcribe clips again even if this label already has their transcript"
+    )
+    
+    return parser.parse_args(argv)
+
+
+def run_retranscribe(args: argparse.Namespace) -> int:
+    """
+    Write a second set of transcripts for the finished jobs, side by side with the first.
+    
+    Args:
+        args: Parsed ``retranscribe`` arguments
+        
+    Returns:
+        Process exit code
+    """
+    manifest_path = args.manifest or os.path.join(args.transcript_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        logger.error(f"Error: job manifest {manifest_path} not found")
+        return 1
+    options: Dict[str, Any] = {}
+    for option in args.option:
+        key, separator, value = option.partition("=")
+        if not separator or not key:
+            logger.error(f"Error: --option {option} is not KEY=VALUE")
+            return 1
+        try:
+            options[key] = json.loads(value)
+        except json.JSONDecodeError:
+            options[key] = value
+    
+    config = TranscriberConfig(whisper_model=args.model, inference_engine=args.engine)
+    vad = EnergyVAD() if args.vad else None
+    transcriber = create_transcriber(config, vad, decode_options=options)
+    if transcriber is None:
+        return 1
+    
+    label = args.label or output_label(
+        args.model, args.engine, DEFAULT_INFERENCE_ENGINE, transcriber.fingerprint_options
+    )
+    output_dir = os.path.join(args.transcript_dir, label)
+    store = DecodedAudioStore(
+        args.decoded_dir or os.path.join(args.audio_dir, DECODED_AUDIO_DIRNAME),
+        transcriber.decode_audio,
+    )
+    manifest = JobManifest(manifest_path)
+    try:
+        records = manifest.done_jobs()
+    finally:
+        manifest.close()
+    logger.info(f"Re-transcribing {len(records)} finished jobs into {output_dir}")
+    counts = retranscribe(
+        transcriber, records, store, output_dir, args.audio_dir, args.model, args.force
+    )
+    logger.info(
+        f"{counts['transcribed']} transcribed, {counts['skipped']} already done, "
+        f"{counts['missing']} without audio, {counts['failed']} failed; "
+        f"{store.decoded} clips decoded, {store.reused} read from decoded audio"
+    )
+    return 0 if counts["failed"] == 0 else 1
+
+
+# Subcommands that do not process URLs: name -> (argument parser, handler)
+SUBCOMMANDS = {
+    "export": (parse_export_args, export),
+    "search": (parse_search_args, search),
+    "backfill": (parse_backfill_args, run_backfill),
+    "retranscribe": (parse_retranscribe_args, run_retranscribe),
+}
+
+
+def dry_run(config: TranscriberConfig, urls: Iterator[str]) -> int:
+    """
+    Print the URLs a run would process, one per line, and nothing else.
+    
+    Only the URL sources and the manifest are read: no model is loaded,
+    nothing is fetched and nothing is written.
+    
+    Args:
+        config: Configuration naming the manifest
+        urls: URLs to check
+        
+    Returns:
+        Process exit code
+    """
+    manifest = None
+    if config.use_manifest and os.path.exists(config.manifest_path):
+        manifest = JobManifest(config.manifest_path)
+    counts: Counter = Counter()
+    try:
+        for url in urls:
+            key = video_key(url)
+            record = manifest.get(key) if manifest is not None else None
+            if record is not None and record["state"] == STATE_DONE:
+                counts["done"] += 1
+                continue
+            if record is not None and record["state"] == STATE_FAILED:
+                counts["failed"] += 1
+            if key.startswith("url:"):
+                logger.warning(f"Not a recognized video URL, will be tracked as is: {url}")
+            counts["todo"] += 1
+            print(url)
+    finally:
+        if manifest is not None:
+            manifest.close()
+    logger.info(
+        f"Dry run: {counts['todo']} URLs to process ({counts['failed']} failed "
+        f"before), {counts['done']} already done according to the manifest"
+    )
+    return 0
+
+
+def submit_to_server(server_url: str, urls: List[str]) -> int:
+    """
+    Hand URLs to a running daemon and wait for them to finish.
+    
+    Args:
+        server_url: Base URL of the daemon
+        urls: URLs to process
+        
+    Returns:
+        Process exit code
+    """
+    client = TranscriptionClient(server_url)
+    try:
+        submission_id = client.submit(urls)
+        logger.info(f"Submitted {len(urls)} URLs to {server_url} as job {submission_id}")
+        record = client.wait(submission_id)
+    except ServerError as e:
+        logger.error(f"Error: {e}")
+        return 1
+    
+    logger.info("=" * 50)
+    logger.info(f"Complete! {record['successful']} succeeded, {record['failed']} failed.")
+    return 0 if record["failed"] == 0 else 1
 
 
 def main() -> int:
     """Main entry point for the CLI."""
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        parse, run = SUBCOMMANDS[sys.argv[1]]
+        setup_logging(logging.INFO)
+        return run(parse(sys.argv[2:]))
+    
     args = parse_args()
     
     # Setup logging
@@ -93,60 +1449,102 @@ def main() -> int:
     
     # Create configuration
     config = TranscriberConfig(
-        urls_file=args.urls,
+        urls_file=args.urls[0],
+        url_sources=args.urls,
+        dedupe_urls=not args.no_dedupe,
+        dedupe_memory_keys=args.dedupe_memory,
         whisper_model=args.model,
+        inference_engine=args.engine,
         video_dir=args.video_dir,
         audio_dir=args.audio_dir,
         transcript_dir=args.transcript_dir,
+        audio_format=args.audio_format,
+        streaming=args.stream,
+        downloader_backend=args.downloader,
+        use_manifest=not args.no_manifest,
+        manifest_file=args.manifest,
+        use_transcript_cache=args.transcript_cache,
+        transcript_cache_file=args.cache_file,
+        transcript_cache_max_mb=args.cache_max_mb,
+        artifact_cache=args.artifact_cache,
+        artifact_cache_max_mb=args.artifact_cache_mb,
+        artifact_index_file=args.artifact_index,
+        pipeline=args.pipeline,
+        download_workers=args.download_workers,
+        extract_workers=args.extract_workers,
+        transcribe_workers=args.transcribe_workers,
+        pipeline_queue_size=args.queue_size,
+        vad=args.vad,
+        vad_music_threshold=args.vad_music_threshold,
+        transcribe_processes=args.processes,
+        threads_per_process=args.threads_per_process,
+        batch_size=args.batch_size,
+        batch_max_wait=args.batch_wait,
+        long_audio=args.long_audio,
+        long_audio_chunk_seconds=args.chunk_seconds,
+        long_audio_workers=args.chunk_workers,
+        checkpoint=args.checkpoint,
+        checkpoint_seconds=args.checkpoint_seconds,
+        checkpoint_dir=args.checkpoint_dir,
+        download_retries=args.retries,
+        async_network=args.async_network,
+        network_concurrency=args.concurrency,
+        host_rate=args.host_rate,
+        host_burst=args.host_burst,
+        prefetch=args.prefetch,
+        prefetch_chunk_size=args.prefetch_chunk,
+        prefetch_workers=args.prefetch_workers,
+        metadata_file=args.metadata_file,
+        min_duration=args.min_duration,
+        max_duration=args.max_duration,
+        schedule=args.schedule,
+        download_timeout_per_minute=args.download_timeout_per_min,
+        audio_timeout_per_minute=args.audio_timeout_per_min,
+        sink=args.sink,
+        store_file=args.store,
+        search_index=args.index,
+        search_index_file=args.index_file,
+        metrics_jsonl_file=args.metrics_jsonl,
+        metrics_prometheus_file=args.metrics_prom,
+        metrics_interval=args.metrics_interval,
+        cascade_model=args.cascade_model,
+        cascade_logprob_threshold=args.cascade_logprob,
+        cascade_compression_ratio_threshold=args.cascade_compression_ratio,
+        cascade_no_speech_threshold=args.cascade_no_speech,
     )
     
-    # Check if URLs file exists
-    if not Path(config.urls_file).exists():
-        logger.error(f"Error: {config.urls_file} not found.")
-        logger.error("Create a URLs file with one TikTok URL per line.")
-        return 1
+    if args.serve:
+        return serve(config, args.host, args.port)
     
-    # Read URLs
-    try:
-        urls = read_urls_from_file(config.urls_file)
-    except Exception as e:
-        logger.error(f"Error reading URLs file: {e}")
+    urls = load_urls(config)
+    if urls is None:
         return 1
     
-    if not urls:
-        logger.error("No URLs found in file")
-        return 1
+    if args.dry_run:
+        return dry_run(config, urls)
     
-    logger.info(f"Found {len(urls)} URLs to process")
+    if args.server:
+        return submit_to_server(args.server, list(urls))
     
     # Create output directories
     config.create_directories()
     
-    # Load Whisper model
-    logger.info(f"Loading Whisper model ({config.whisper_model})...")
-    try:
-        import whisper
-        model = whisper.load_model(config.whisper_model)
-        logger.info("Model loaded successfully")
-    except ImportError:
-        logger.error("Error: openai-whisper not installed. Run: pip install openai-whisper")
+    processor = create_processor(config)
+    if processor is None:
         return 1
-    except Exception as e:
-        logger.error(f"Failed to load Whisper model: {e}")
-        return 1
-    
-    # Initialize components
-    downloader = VideoDownloader(
-        download_timeout=config.download_timeout,
-        metadata_timeout=config.metadata_timeout
-    )
-    audio_extractor = AudioExtractor(timeout=config.audio_timeout)
-    transcriber = AudioTranscriber(model)
-    processor = VideoProcessor(config, downloader, audio_extractor, transcriber)
     
     # Process URLs
     logger.info("Starting processing...")
-    successful, failed = processor.process_urls(urls)
+    try:
+        queued: Iterable[str] = urls
+        if processor.scheduler is not None:
+            queued = buffer_urls(config, urls)
+        successful, failed = processor.process_urls(queued)
+    except ModelLoadError as e:
+        logger.error(f"Error: {e}")
+        return 1
+    finally:
+        close_processor(processor)
     
     # Print summary
     logger.info("=" * 50)
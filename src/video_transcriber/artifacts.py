@@ -0,0 +1,207 @@
+"""Disk-budgeted cache of downloaded videos and extracted audio, keyed by video."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from .prefetch import PREFETCH_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Artifact kinds; audio is cached per format, e.g. "audio.wav"
+KIND_VIDEO = "video"
+AUDIO_KIND_PREFIX = "audio."
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    video_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (video_key, kind)
+);
+CREATE INDEX IF NOT EXISTS artifacts_last_used ON artifacts (last_used);
+CREATE TABLE IF NOT EXISTS metadata (
+    video_key TEXT PRIMARY KEY,
+    info TEXT NOT NULL
+);
+"""
+
+
+def audio_kind(audio_format: str) -> str:
+    """Return the artifact kind for extracted audio in a format."""
+    return f"{AUDIO_KIND_PREFIX}{audio_format}"
+
+
+class ArtifactCache:
+    """
+    SQLite index of the videos and audio files on disk, with a byte budget.
+    
+    Every downloaded video and extracted audio file is recorded under its
+    job's video key, along with the video's metadata. A rerun (with another
+    model, say) can then start from the audio, or at least the video,
+    instead of the network. The files are kept under ``max_bytes`` in
+    total by deleting the least recently used ones. Files of jobs still in
+    progress are pinned and never evicted. Safe to share between pipeline
+    worker threads.
+    """
+    
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Open (or create) an artifact index.
+        
+        Args:
+            path: Path to the SQLite database file
+            max_bytes: Upper bound on the total size of the indexed files
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pinned: Counter = Counter()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        self._total_bytes: int = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM artifacts"
+        ).fetchone()[0]
+        logger.debug(f"Opened artifact cache at {path} ({self._total_bytes} bytes)")
+    
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the indexed files."""
+        return self._total_bytes
+    
+    def get(self, video_key: str, kind: str) -> Optional[str]:
+        """
+        Look up a cached file, marking it as recently used.
+        
+        An entry whose file has gone missing is dropped.
+        
+        Args:
+            video_key: Canonical video key
+            kind: KIND_VIDEO, or ``audio_kind(format)``
+            
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT path, size FROM artifacts WHERE video_key = ? AND kind = ?",
+                (video_key, kind),
+            ).fetchone()
+            if row is not None and not os.path.exists(row[0]):
+                self._conn.execute(
+                    "DELETE FROM artifacts WHERE video_key = ? AND kind = ?", (video_key, kind)
+                )
+                self._total_bytes -= row[1]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE artifacts SET last_used = ?, hits = hits + 1 "
+                "WHERE video_key = ? AND kind = ?",
+                (time.time(), video_key, kind),
+            )
+            self.hits += 1
+        path: str = row[0]
+        return path
+    
+    def put(self, video_key: str, kind: str, path: str) -> None:
+        """
+        Record a file, evicting least recently used ones if over budget.
+        
+        Args:
+            video_key: Canonical video key
+            kind: KIND_VIDEO, or ``audio_kind(format)``
+            path: The file, which must exist
+        """
+        size = os.path.getsize(path)
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT path, size FROM artifacts WHERE video_key = ? AND kind = ?",
+                (video_key, kind),
+            ).fetchone()
+            if old is not None and old[0] != path:
+                _remove(old[0])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (video_key, kind, path, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_key, kind, path, size, time.time()),
+            )
+            self._total_bytes += size - (old[1] if old else 0)
+            self._evict()
+    
+    def get_info(self, video_key: str) -> Optional[Dict]:
+        """Return the metadata recorded for a video, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM metadata WHERE video_key = ?", (video_key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put_info(self, video_key: str, info: Dict) -> None:
+        """Record a video's metadata, keeping only the fields a job needs later."""
+        info = {key: info[key] for key in PREFETCH_FIELDS if info.get(key) is not None}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (video_key, info) VALUES (?, ?)",
+                (video_key, json.dumps(info)),
+            )
+    
+    def pin(self, video_key: str) -> None:
+        """Keep a video's files from being evicted until ``unpin``."""
+        with self._lock:
+            self._pinned[video_key] += 1
+    
+    def unpin(self, video_key: str) -> None:
+        """Release a pin, evicting files if the cache is over budget."""
+        with self._lock, self._conn:
+            self._pinned[video_key] -= 1
+            if self._pinned[video_key] <= 0:
+                del self._pinned[video_key]
+            self._evict()
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _evict(self) -> None:
+        """Delete least recently used files until the cache fits its budget."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT video_key, kind, path, size FROM artifacts ORDER BY last_used"
+        )
+        for video_key, kind, path, size in rows.fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            if video_key in self._pinned:
+                continue
+            _remove(path)
+            self._conn.execute(
+                "DELETE FROM artifacts WHERE video_key = ? AND kind = ?", (video_key, kind)
+            )
+            self._total_bytes -= size
+            logger.debug(f"Evicted cached {kind} of {video_key} ({size} bytes)")
+
+
+def _remove(path: str) -> None:
+    """Delete a file, tolerating one that is already gone."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove {path}: {e}")
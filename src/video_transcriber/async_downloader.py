@@ -0,0 +1,279 @@
+"""asyncio network layer: concurrent yt-dlp calls under a global and per-host limit."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from .downloader import LibraryDownloader, MediaStream, VideoDownloader, VideoInfoResult
+from .exceptions import DownloadError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Rate limiter that allows ``rate`` calls per second with bursts of up to ``burst``.
+    
+    Waiters are served in arrival order. Must be used from a single event loop.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket full.
+        
+        Args:
+            rate: Tokens added per second; 0 or less disables limiting
+            burst: Maximum number of tokens the bucket holds
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncVideoDownloader(VideoDownloader):
+    """
+    Video downloader with asyncio versions of the metadata and download calls.
+    
+    ``get_video_info_async`` and ``download_video_async`` run yt-dlp
+    subprocesses without blocking the event loop, so many URLs can be in
+    flight at once. At most ``max_concurrency`` calls run at the same time,
+    and each host gets its own token bucket so a long list does not hammer
+    one site. Timeouts and cancellation kill the subprocess.
+    
+    With ``in_process``, the calls go to a LibraryDownloader on a thread
+    pool instead. Those threads cannot be interrupted, so a timeout only
+    stops waiting for them; yt-dlp's socket timeout bounds them in turn.
+    
+    The blocking methods of VideoDownloader keep working, e.g. for
+    streaming mode.
+    """
+    
+    def __init__(
+        self,
+        download_timeout: int = 120,
+        metadata_timeout: int = 60,
+        ytdlp_path: str = "yt-dlp",
+        max_concurrency: int = 16,
+        host_rate: float = 2.0,
+        host_burst: int = 4,
+        in_process: bool = False,
+    ):
+        """
+        Initialize the downloader.
+        
+        Args:
+            download_timeout: Timeout for video downloads in seconds
+            metadata_timeout: Timeout for metadata fetching in seconds
+            ytdlp_path: yt-dlp executable to run
+            max_concurrency: yt-dlp calls allowed to run at the same time
+            host_rate: Calls started per second per host; 0 disables the limit
+            host_burst: Calls a host may get at once after being idle
+            in_process: Use the yt-dlp library on threads instead of subprocesses
+        """
+        super().__init__(download_timeout, metadata_timeout, ytdlp_path)
+        self.max_concurrency = max(1, max_concurrency)
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.library: Optional[LibraryDownloader] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if in_process:
+            self.library = LibraryDownloader(download_timeout, metadata_timeout, ytdlp_path)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="ytdlp"
+            )
+        # asyncio primitives belong to one event loop; they are created for
+        # each loop the downloader is used from
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+    
+    def get_video_info(self, url: str) -> Dict:
+        """Fetch video metadata, blocking; see VideoDownloader.get_video_info."""
+        if self.library is not None:
+            return self.library.get_video_info(url)
+        return super().get_video_info(url)
+    
+    def iter_video_info(self, urls: Sequence[str]) -> Iterator[VideoInfoResult]:
+        """Fetch metadata in bulk, blocking; see VideoDownloader.iter_video_info."""
+        if self.library is not None:
+            return self.library.iter_video_info(urls)
+        return super().iter_video_info(urls)
+    
+    def download_video(
+        self, url: str, output_path: str, timeout: Optional[float] = None
+    ) -> None:
+        """Download a video, blocking; see VideoDownloader.download_video."""
+        if self.library is not None:
+            return self.library.download_video(url, output_path, timeout)
+        return super().download_video(url, output_path, timeout)
+    
+    def open_stream(self, url: str, timeout: Optional[float] = None) -> MediaStream:
+        """Start streaming a video; see VideoDownloader.open_stream."""
+        if self.library is not None:
+            return self.library.open_stream(url, timeout)
+        return super().open_stream(url, timeout)
+    
+    async def get_video_info_async(self, url: str) -> Dict:
+        """
+        Fetch video metadata without blocking the event loop.
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Dictionary containing video metadata, or an empty dict on failure
+        """
+        logger.info(f"Fetching metadata for {url}")
+        try:
+            if self.library is not None:
+                return await self._call(
+                    url, self.metadata_timeout, self.library.get_video_info, url
+                )
+            returncode, stdout, _ = await self._run(
+                url,
+                [self.ytdlp_path, "--dump-json", "--no-download", url],
+                self.metadata_timeout,
+            )
+            if returncode != 0:
+                logger.warning(f"yt-dlp returned non-zero exit code: {returncode}")
+                return {}
+            metadata = json.loads(stdout)
+            logger.debug(f"Successfully fetched metadata: {metadata.get('title', 'Unknown')}")
+            return metadata
+        except asyncio.TimeoutError:
+            logger.warning("Metadata fetch timed out")
+            return {}
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse metadata JSON: {e}")
+            return {}
+        except Exception as e:
+            logger.warning(f"Unexpected error fetching metadata: {e}")
+            return {}
+    
+    async def download_video_async(
+        self, url: str, output_path: str, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Download a video without blocking the event loop.
+        
+        Args:
+            url: Video URL
+            output_path: Path where video should be saved
+            timeout: Timeout in seconds for this download (default:
+                ``download_timeout``)
+                
+        Raises:
+            DownloadError: If download fails
+        """
+        logger.info(f"Downloading video to {output_path}")
+        timeout = timeout or self.download_timeout
+        try:
+            if self.library is not None:
+                await self._call(url, timeout, self.library.download_video, url, output_path)
+            else:
+                returncode, _, stderr = await self._run(
+                    url,
+                    [self.ytdlp_path, "-o", output_path, "-f", "mp4", url],
+                    timeout,
+                )
+                if returncode != 0:
+                    error_msg = stderr.decode("utf-8", errors="replace") or "Unknown error"
+                    raise DownloadError(f"Download failed: {error_msg}")
+        except asyncio.TimeoutError:
+            raise DownloadError(f"Download timed out after {timeout:.0f} seconds")
+        except DownloadError:
+            raise
+        except Exception as e:
+            raise DownloadError(f"Unexpected error during download: {e}")
+        
+        if not os.path.exists(output_path):
+            raise DownloadError(f"Downloaded file not found at {output_path}")
+        logger.info("Video downloaded successfully")
+    
+    def close(self) -> None:
+        """Shut down the in-process extraction threads, if any."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run(self, url: str, command: List[str], timeout: float) -> Tuple[int, bytes, bytes]:
+        """
+        Run a command once the URL's host and then a slot allow it.
+        
+        The host's token is taken before the slot, so tasks held back by one
+        host's rate limit do not occupy slots other hosts could use. The
+        process is killed if the timeout expires or the calling task is
+        cancelled, so no yt-dlp process outlives its call.
+        
+        Returns:
+            Tuple of (return code, stdout, stderr)
+            
+        Raises:
+            asyncio.TimeoutError: If the command took longer than ``timeout``
+        """
+        semaphore, bucket = self._limits(url)
+        await bucket.acquire()
+        async with semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+            # communicate() only returns once the process has exited
+            assert process.returncode is not None
+            return process.returncode, stdout, stderr
+    
+    async def _call(self, url: str, timeout: float, function: Callable, *args: Any) -> Any:
+        """Run a blocking library call on the thread pool under the same limits as ``_run``."""
+        semaphore, bucket = self._limits(url)
+        await bucket.acquire()
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, function, *args), timeout
+            )
+    
+    def _limits(self, url: str) -> Tuple[asyncio.Semaphore, TokenBucket]:
+        """Return the global semaphore and the token bucket for the URL's host."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore
+        if self._loop is not loop or semaphore is None:
+            self._loop = loop
+            semaphore = self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._buckets = {}
+        host = (urlparse(url).hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+        return semaphore, bucket
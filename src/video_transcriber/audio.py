@@ -3,46 +3,122 @@
 import logging
 import os
 import subprocess
+import threading
+import wave
+from typing import IO, TYPE_CHECKING, Any, List, Optional
 
-from .exceptions import AudioExtractionError
+from .exceptions import AudioExtractionError, UnseekableStreamError
+
+if TYPE_CHECKING:
+    from .downloader import MediaStream
 
 logger = logging.getLogger(__name__)
 
+# Whisper works on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+AUDIO_FORMATS = ("mp3", "wav", "npy")
+
+# Size of the chunks copied from a media stream into ffmpeg's stdin
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# ffmpeg's complaint about an MP4 whose index comes after the media data
+MOOV_NOT_FOUND = "moov atom not found"
+
+
+def load_pcm_audio(audio_path: str) -> Any:
+    """
+    Load 16 kHz mono PCM written by AudioExtractor without running ffmpeg.
+    
+    Args:
+        audio_path: Path to a ``.npy`` or 16-bit ``.wav`` file
+        
+    Returns:
+        float32 NumPy array of samples in [-1, 1]
+        
+    Raises:
+        ValueError: If the file is not 16 kHz mono PCM
+    """
+    import numpy as np
+    
+    if audio_path.endswith(".npy"):
+        return np.load(audio_path).astype(np.float32, copy=False)
+    
+    with wave.open(audio_path, "rb") as wav:
+        if (
+            wav.getframerate() != SAMPLE_RATE
+            or wav.getnchannels() != 1
+            or wav.getsampwidth() != 2
+        ):
+            raise ValueError(f"{audio_path} is not 16 kHz mono 16-bit PCM")
+        frames = wav.readframes(wav.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def is_pcm_audio(audio_path: str) -> bool:
+    """Return True if the path is a PCM format that load_pcm_audio can read."""
+    return audio_path.endswith((".wav", ".npy"))
+
 
 class AudioExtractor:
     """Handles audio extraction from video files."""
     
-    def __init__(self, timeout: int = 60):
+    def __init__(
+        self,
+        timeout: int = 60,
+        audio_format: str = "mp3",
+        ffmpeg_path: str = "ffmpeg",
+    ):
         """
         Initialize the audio extractor.
         
         Args:
             timeout: Timeout for audio extraction in seconds
+            audio_format: Output format; "mp3", or "wav"/"npy" for 16 kHz mono
+                PCM that can be transcribed without decoding it again
+            ffmpeg_path: ffmpeg executable to run
         """
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format}")
         self.timeout = timeout
+        self.audio_format = audio_format
+        self.ffmpeg_path = ffmpeg_path
     
-    def extract_audio(self, video_path: str, audio_path: str) -> None:
+    @property
+    def extension(self) -> str:
+        """File extension (with leading dot) for extracted audio."""
+        return f".{self.audio_format}"
+    
+    def extract_audio(
+        self, video_path: str, audio_path: str, timeout: Optional[float] = None
+    ) -> None:
         """
         Extract audio from video using ffmpeg.
         
         Args:
             video_path: Path to input video file
             audio_path: Path where audio should be saved
-            
+            timeout: Timeout in seconds for this extraction (default: the
+                extractor's timeout)
+                
         Raises:
             AudioExtractionError: If extraction fails
         """
         logger.info(f"Extracting audio from {video_path} to {audio_path}")
+        timeout = timeout or self.timeout
         try:
-            result = subprocess.run(
-                ["ffmpeg", "-i", video_path, "-vn", "-acodec", "libmp3lame", "-y", audio_path],
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
-            if result.returncode != 0:
-                error_msg = result.stderr or "Unknown error"
-                raise AudioExtractionError(f"Audio extraction failed: {error_msg}")
+            if self.audio_format == "npy":
+                self._extract_npy(video_path, audio_path, timeout)
+            else:
+                result = subprocess.run(
+                    self._build_command(video_path, audio_path),
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                if result.returncode != 0:
+                    error_msg = result.stderr or "Unknown error"
+                    raise AudioExtractionError(f"Audio extraction failed: {error_msg}")
             
             # Verify file exists
             if not os.path.exists(audio_path):
@@ -51,8 +127,155 @@ class AudioExtractor:
             logger.info("Audio extracted successfully")
             
         except subprocess.TimeoutExpired:
-            raise AudioExtractionError(f"Audio extraction timed out after {self.timeout} seconds")
+            raise AudioExtractionError(f"Audio extraction timed out after {timeout:.0f} seconds")
         except Exception as e:
             if isinstance(e, AudioExtractionError):
                 raise
             raise AudioExtractionError(f"Unexpected error during audio extraction: {e}")
+    
+    def _build_command(self, video_path: str, audio_path: str) -> List[str]:
+        """Build the ffmpeg command line for the configured output format."""
+        if self.audio_format == "wav":
+            return [
+                self.ffmpeg_path, "-nostdin", "-i", video_path, "-vn",
+                "-ac", "1", "-ar", str(SAMPLE_RATE), "-acodec", "pcm_s16le",
+                "-y", audio_path,
+            ]
+        return [
+            self.ffmpeg_path, "-i", video_path, "-vn", "-acodec", "libmp3lame", "-y", audio_path
+        ]
+    
+    def _extract_npy(self, video_path: str, audio_path: str, timeout: float) -> None:
+        """Decode straight to float32 PCM on ffmpeg's stdout and save it as .npy."""
+        import numpy as np
+        
+        result = subprocess.run(
+            [
+                self.ffmpeg_path, "-nostdin", "-i", video_path, "-vn",
+                "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "-",
+            ],
+            capture_output=True,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            error_msg = result.stderr.decode("utf-8", errors="replace") or "Unknown error"
+            raise AudioExtractionError(f"Audio extraction failed: {error_msg}")
+        
+        np.save(audio_path, np.frombuffer(result.stdout, dtype=np.float32))
+    
+    def decode_stream(self, stream: "MediaStream", timeout: Optional[float] = None) -> Any:
+        """
+        Decode a media stream straight to 16 kHz mono PCM in memory.
+        
+        The media bytes are piped into ffmpeg's stdin and the float32 PCM on
+        its stdout is read into an array, so nothing touches the disk. When
+        the stream is a yt-dlp pipe, ffmpeg reads from it directly.
+        
+        A pipe cannot be seeked, so MP4 files whose index (moov atom) sits at
+        the end of the file cannot be decoded this way; those raise
+        UnseekableStreamError so the caller can download to a file instead.
+        
+        Args:
+            stream: Media stream from VideoDownloader.open_stream
+            timeout: Overall deadline in seconds, covering the download as
+                well as decoding (default: the extractor's timeout)
+                
+        Returns:
+            float32 NumPy array of samples
+            
+        Raises:
+            UnseekableStreamError: If the media cannot be decoded from a pipe
+            AudioExtractionError: If decoding fails
+            DownloadError: If the download feeding the stream fails
+        """
+        import numpy as np
+        
+        logger.info("Extracting audio from stream")
+        command = [
+            self.ffmpeg_path, "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-vn",
+            "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "pipe:1",
+        ]
+        os_pipe = stream.os_pipe
+        try:
+            process = subprocess.Popen(
+                command,
+                stdin=os_pipe if os_pipe is not None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            stream.kill()
+            raise AudioExtractionError(f"Could not start ffmpeg: {e}")
+        stdout, stderr = process.stdout, process.stderr
+        assert stdout is not None and stderr is not None
+        
+        threads = []
+        stderr_chunks: List[bytes] = []
+        threads.append(threading.Thread(
+            target=lambda: stderr_chunks.append(stderr.read()), daemon=True
+        ))
+        if os_pipe is None:
+            threads.append(threading.Thread(
+                target=self._pump, args=(stream, process.stdin), daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+        
+        timed_out = threading.Event()
+        
+        def abort() -> None:
+            timed_out.set()
+            process.kill()
+            stream.kill()
+        
+        timeout = timeout or self.timeout
+        timer = threading.Timer(timeout, abort)
+        timer.start()
+        try:
+            pcm = stdout.read()
+            returncode = process.wait()
+            if returncode != 0:
+                # Unblock the pump thread before joining it
+                stream.kill()
+        except Exception:
+            process.kill()
+            stream.kill()
+            raise
+        finally:
+            timer.cancel()
+            for thread in threads:
+                thread.join()
+        
+        if timed_out.is_set():
+            raise AudioExtractionError(f"Audio extraction timed out after {timeout:.0f} seconds")
+        if returncode != 0:
+            error_msg = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+            if MOOV_NOT_FOUND in error_msg:
+                raise UnseekableStreamError("Media index is at the end of the stream")
+            raise AudioExtractionError(f"Audio extraction failed: {error_msg or 'Unknown error'}")
+        
+        # Surface download failures (e.g. a truncated stream) as such
+        stream.close()
+        
+        audio = np.frombuffer(pcm, dtype=np.float32)
+        if audio.size == 0:
+            raise AudioExtractionError("Audio stream decoded to no samples")
+        logger.info("Audio extracted successfully")
+        return audio
+    
+    @staticmethod
+    def _pump(stream: "MediaStream", sink: IO[bytes]) -> None:
+        """Copy a media stream into ffmpeg's stdin until it ends or ffmpeg exits."""
+        try:
+            while True:
+                chunk = stream.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                sink.write(chunk)
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+        finally:
+            try:
+                sink.close()
+            except OSError:
+                pass
@@ -0,0 +1,37 @@
+"""
+Offline benchmarks for the processing pipeline.
+
+Runs VideoProcessor against stand-in yt-dlp and ffmpeg executables and a
+stand-in model, so orchestration changes can be measured without network
+access or a GPU. Run ``python -m video_transcriber.benchmark --help``.
+
+``python -m video_transcriber.benchmark.engines`` compares the speed and
+word error rate of the inference engines on local audio fixtures.
+"""
+
+from .engines import compare_engines, load_fixtures, word_error_rate
+from .fakes import FakeToolSettings, FakeWhisperModel, install_fake_tools, make_video_fixture
+from .runner import (
+    DEFAULT_SCENARIOS,
+    SCENARIOS,
+    Scenario,
+    compare_to_baseline,
+    run_benchmark,
+    run_scenario,
+)
+
+__all__ = [
+    "DEFAULT_SCENARIOS",
+    "FakeToolSettings",
+    "FakeWhisperModel",
+    "SCENARIOS",
+    "Scenario",
+    "compare_engines",
+    "compare_to_baseline",
+    "install_fake_tools",
+    "load_fixtures",
+    "make_video_fixture",
+    "run_benchmark",
+    "run_scenario",
+    "word_error_rate",
+]
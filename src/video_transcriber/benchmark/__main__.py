@@ -0,0 +1,147 @@
+"""Command-line interface for the offline benchmarks."""
+
+import argparse
+import json
+import logging
+import sys
+
+from ..utils import setup_logging
+from .runner import DEFAULT_SCENARIOS, SCENARIOS, compare_to_baseline, run_benchmark
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure pipeline throughput offline with stand-in yt-dlp, ffmpeg and model",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Run the default (fully offline) scenarios and store a baseline
+  python -m video_transcriber.benchmark --output baseline.json
+  
+  # Compare a change against it, failing on a >10% throughput drop
+  python -m video_transcriber.benchmark --baseline baseline.json
+  
+  # Include the scenarios that use the real ffmpeg and Whisper
+  python -m video_transcriber.benchmark --scenario real-ffmpeg --scenario real-model
+        """
+    )
+    
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeat for several (default: "
+             f"{', '.join(DEFAULT_SCENARIOS)})"
+    )
+    
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Run every scenario, including real-ffmpeg and real-model"
+    )
+    
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the scenarios and exit"
+    )
+    
+    parser.add_argument(
+        "--urls",
+        type=int,
+        default=None,
+        help="URLs per scenario (default: per scenario)"
+    )
+    
+    parser.add_argument(
+        "--fixture",
+        type=str,
+        default=None,
+        help="Media file served by the fake yt-dlp in real-ffmpeg scenarios "
+             "(default: synthetic audio)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="benchmark.json",
+        help="Where to write the JSON results (default: benchmark.json)"
+    )
+    
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Earlier results to compare against"
+    )
+    
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="Exit with an error if URLs/sec drops by more than this many "
+             "percent against the baseline (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Show the pipeline's own logging"
+    )
+    
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point for the benchmark CLI."""
+    args = parse_args()
+    setup_logging(logging.DEBUG if args.debug else logging.INFO)
+    
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            logger.info(f"{name:14} {scenario.description}")
+        return 0
+    
+    if args.all:
+        names = list(SCENARIOS)
+    else:
+        names = args.scenario or DEFAULT_SCENARIOS
+    
+    # Read the baseline first: it may be the file about to be overwritten
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error reading baseline: {e}")
+            return 1
+    
+    report = run_benchmark(
+        names,
+        urls=args.urls,
+        fixture=args.fixture,
+        log_level=logging.DEBUG if args.debug else logging.CRITICAL,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+    
+    if baseline is None:
+        return 0
+    
+    lines, regressed = compare_to_baseline(report, baseline, args.max_regression)
+    logger.info(f"Compared to {args.baseline}:")
+    for line in lines:
+        logger.info(f"  {line}")
+    if regressed:
+        logger.error(f"Throughput dropped by more than {args.max_regression}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Compare inference engines' speed and word error rate on local fixtures.
+
+A fixture set is a directory of audio files, each with a reference
+transcript next to it under the same name with a ``.txt`` extension::
+
+    fixtures/clip1.wav
+    fixtures/clip1.txt
+    
+Run ``python -m video_transcriber.benchmark.engines --fixtures fixtures``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..audio import SAMPLE_RATE
+from ..engines import ENGINES, load_engine
+from ..transcriber import AudioTranscriber
+from ..utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_AUDIO_EXTENSIONS = (".wav", ".npy", ".mp3", ".m4a", ".flac", ".ogg")
+
+# Words are runs of letters, digits and apostrophes; case and punctuation are ignored
+_WORD = re.compile(r"[\w']+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Split text into lowercase words without punctuation."""
+    return _WORD.findall(text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """
+    Count the word-level edits between a reference and a hypothesis.
+    
+    Args:
+        reference: Correct transcript
+        hypothesis: Transcript to score
+        
+    Returns:
+        Tuple of (substitutions + deletions + insertions, reference word count)
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Return the word error rate of a hypothesis against a reference transcript."""
+    errors, words = word_errors(reference, hypothesis)
+    return errors / words if words else float(errors > 0)
+
+
+def load_fixtures(directory: str) -> List[Tuple[str, str]]:
+    """
+    Find the audio files in a directory that have a reference transcript.
+    
+    Args:
+        directory: Fixture directory
+        
+    Returns:
+        Sorted (audio path, reference text) pairs
+    """
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in FIXTURE_AUDIO_EXTENSIONS:
+            continue
+        reference_path = os.path.join(directory, stem + ".txt")
+        if not os.path.exists(reference_path):
+            logger.warning(f"Skipping {name}: no {stem}.txt reference transcript")
+            continue
+        with open(reference_path, encoding="utf-8") as f:
+            fixtures.append((os.path.join(directory, name), f.read().strip()))
+    return fixtures
+
+
+def compare_engines(
+    fixtures: Sequence[Tuple[str, str]],
+    engines: Sequence[str],
+    model_name: str,
+    load: Callable[[str, str], Any] = load_engine,
+) -> List[Dict[str, Any]]:
+    """
+    Transcribe every fixture with each engine and score speed and accuracy.
+    
+    Audio is decoded once up front, and each engine transcribes the first
+    clip once before timing starts, so the numbers cover inference only.
+    
+    Args:
+        fixtures: (audio path, reference text) pairs
+        engines: Engine names to compare
+        model_name: Whisper model size every engine loads
+        load: Loads an engine given (model name, engine name)
+        
+    Returns:
+        One result dictionary per engine
+    """
+    decoder = AudioTranscriber(None)
+    clips = [(decoder.decode_audio(path), reference) for path, reference in fixtures]
+    audio_seconds = sum(len(samples) for samples, _ in clips) / SAMPLE_RATE
+    
+    results = []
+    for name in engines:
+        logger.info(f"Loading {model_name} with the {name} engine")
+        start = time.perf_counter()
+        engine = load(model_name, name)
+        load_seconds = time.perf_counter() - start
+        transcriber = AudioTranscriber(engine)
+        if clips:
+            transcriber.transcribe_result(clips[0][0])
+        
+        errors = words = failures = 0
+        confidences = []
+        start = time.perf_counter()
+        for samples, reference in clips:
+            try:
+                result = transcriber.transcribe_result(samples)
+            except Exception as e:
+                logger.warning(f"{name}: transcription failed: {e}")
+                failures += 1
+                result = {"text": "", "segments": [], "language": None, "confidence": None}
+            clip_errors, clip_words = word_errors(reference, result["text"])
+            errors += clip_errors
+            words += clip_words
+            if result["confidence"] is not None:
+                confidences.append(result["confidence"])
+        seconds = time.perf_counter() - start
+        
+        results.append({
+            "engine": name,
+            "model": model_name,
+            "clips": len(clips),
+            "failures": failures,
+            "load_seconds": load_seconds,
+            "transcribe_seconds": seconds,
+            "audio_seconds": audio_seconds,
+            "real_time_factor": seconds / audio_seconds if audio_seconds else None,
+            "word_error_rate": errors / words if words else None,
+            "mean_confidence": sum(confidences) / len(confidences) if confidences else None,
+        })
+        del transcriber, engine
+    return results
+
+
+def format_comparison(results: Sequence[Dict[str, Any]]) -> List[str]:
+    """Render comparison results as table rows, with speedups relative to the first engine."""
+    lines = [f"{'engine':14} {'seconds':>9} {'RTF':>7} {'speedup':>8} {'WER':>7} {'conf':>6}"]
+    base: Optional[float] = results[0]["transcribe_seconds"] if results else None
+    for result in results:
+        seconds = result["transcribe_seconds"]
+        speedup = base / seconds if base and seconds else 0.0
+        rtf = result["real_time_factor"]
+        wer = result["word_error_rate"]
+        confidence = result["mean_confidence"]
+        lines.append(
+            f"{result['engine']:14} {seconds:9.2f} "
+            f"{rtf if rtf is not None else float('nan'):7.3f} {speedup:7.2f}x "
+            f"{wer if wer is not None else float('nan'):7.2%} "
+            f"{confidence if confidence is not None else float('nan'):6.3f}"
+        )
+    return lines
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Compare inference engines' speed and word error rate on local fixtures",
+    )
+    
+    parser.add_argument(
+        "--fixtures",
+        type=str,
+        required=True,
+        help="Directory of audio files with a .txt reference transcript each"
+    )
+    
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="base",
+        choices=["tiny", "base", "small", "medium", "large"],
+        help="Whisper model size (default: base)"
+    )
+    
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=sorted(ENGINES),
+        help="Engine to compare; repeat for several (default: all)"
+    )
+    
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Also write the results to this JSON file"
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug logging"
+    )
+    
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point for the engine comparison."""
+    args = parse_args()
+    setup_logging(logging.DEBUG if args.debug else logging.INFO)
+    
+    try:
+        fixtures = load_fixtures(args.fixtures)
+    except OSError as e:
+        logger.error(f"Error reading fixtures: {e}")
+        return 1
+    if not fixtures:
+        logger.error(f"No fixtures with reference transcripts in {args.fixtures}")
+        return 1
+    
+    try:
+        results = compare_engines(fixtures, args.engine or list(ENGINES), args.model)
+    except ImportError:
+        logger.error("Error: openai-whisper not installed. Run: pip install openai-whisper")
+        return 1
+    
+    for line in format_comparison(results):
+        logger.info(line)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Stand-in ``yt-dlp`` and ``ffmpeg`` executables for offline benchmarks.
+
+This file runs as a script, not as part of the package, so it only uses
+the standard library and starts quickly. The shims written by
+``fakes.install_fake_tools`` call it as::
+
+    python fake_tools.py (yt-dlp|ffmpeg) SETTINGS_JSON [tool arguments...]
+    
+Only the argument forms used by VideoDownloader and AudioExtractor are
+understood. Latency, failures and output sizes come from the settings file
+(see ``fakes.FakeToolSettings``). Whether a call fails is derived from the
+URL (or input) it was given, so repeated runs fail the same URLs. Decoded
+audio is copied from PCM fixtures generated once at install time.
+"""
+
+import array
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import time
+import wave
+from typing import Dict, List
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_pcm(seconds: float, sample_rate: int = SAMPLE_RATE) -> List[float]:
+    """
+    Generate speech-like test audio: tone bursts at a syllable rate, with pauses.
+    
+    Args:
+        seconds: Length of the audio
+        sample_rate: Sample rate of the audio
+        
+    Returns:
+        Samples in [-1, 1]
+    """
+    samples = []
+    for n in range(int(seconds * sample_rate)):
+        t = n / sample_rate
+        # ~4 syllables per second, and a pause every 3 seconds
+        envelope = max(0.0, math.sin(2 * math.pi * 2 * t)) if t % 3.0 < 2.4 else 0.0
+        pitch = 140 + 40 * math.sin(2 * math.pi * 0.5 * t)
+        tone = 0.6 * math.sin(2 * math.pi * pitch * t) + 0.3 * math.sin(4 * math.pi * pitch * t)
+        samples.append(0.5 * envelope * tone)
+    return samples
+
+
+def write_wav(path: str, samples: List[float], sample_rate: int = SAMPLE_RATE) -> None:
+    """Write samples as a 16-bit mono WAV file."""
+    pcm = array.array("h", (int(max(-1.0, min(1.0, s)) * 32767) for s in samples))
+    if sys.byteorder != "little":
+        pcm.byteswap()
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+def float32_bytes(samples: List[float]) -> bytes:
+    """Return samples as little-endian float32 bytes, like ffmpeg's f32le output."""
+    pcm = array.array("f", samples)
+    if sys.byteorder != "little":
+        pcm.byteswap()
+    return pcm.tobytes()
+
+
+def _rng(settings: Dict, key: str) -> random.Random:
+    """Random generator seeded by the settings' seed and a per-call key."""
+    return random.Random(f"{settings.get('seed', 0)}:{key}")
+
+
+def _sleep(settings: Dict, rng: random.Random) -> None:
+    """Sleep for the configured latency plus uniform jitter."""
+    latency = settings["latency"] + rng.uniform(0, settings.get("jitter", 0.0))
+    if latency > 0:
+        time.sleep(latency)
+
+
+def _maybe_fail(settings: Dict, rng: random.Random, what: str) -> None:
+    """Exit with an error for the configured fraction of calls."""
+    if rng.random() < settings.get("failure_rate", 0.0):
+        sys.stderr.write(f"ERROR: simulated {what} failure\n")
+        sys.exit(1)
+
+
+def _write_bytes(out, size: int, rng: random.Random) -> None:
+    """Write ``size`` pseudo-random bytes to a binary file object in chunks."""
+    remaining = size
+    while remaining > 0:
+        n = min(CHUNK_SIZE, remaining)
+        out.write(rng.randbytes(n))
+        remaining -= n
+
+
+def _fake_id(url: str) -> str:
+    """Stable numeric video ID for a URL."""
+    return str(int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:15], 16))
+
+
+def _fake_info(settings: Dict, url: str) -> str:
+    """Metadata JSON line for a URL."""
+    video_id = _fake_id(url)
+    return json.dumps({
+        "id": video_id,
+        "title": f"Benchmark clip {video_id[:6]}",
+        "uploader": "benchmark",
+        "duration": settings["audio_seconds"],
+        "view_count": 0,
+        "like_count": 0,
+        "webpage_url": url,
+        "original_url": url,
+    })
+
+
+def fake_ytdlp(settings: Dict, args: List[str]) -> int:
+    """Handle the ``--dump-json`` (also with ``--batch-file -``), ``-o PATH`` and ``-o -`` forms."""
+    if "--batch-file" in args:
+        # One metadata line per URL read from stdin; failures go to stderr
+        for line in sys.stdin:
+            url = line.strip()
+            if not url:
+                continue
+            rng = _rng(settings, f"metadata:{url}")
+            _sleep(settings, rng)
+            if rng.random() < settings.get("failure_rate", 0.0):
+                sys.stderr.write(
+                    f"ERROR: [Benchmark] {_fake_id(url)}: simulated metadata failure\n"
+                )
+                continue
+            print(_fake_info(settings, url), flush=True)
+        return 0
+    
+    url = args[-1]
+    if "--dump-json" in args:
+        rng = _rng(settings, f"metadata:{url}")
+        _sleep(settings, rng)
+        _maybe_fail(settings, rng, "metadata")
+        print(_fake_info(settings, url))
+        return 0
+    
+    rng = _rng(settings, f"download:{url}")
+    _sleep(settings, rng)
+    _maybe_fail(settings, rng, "download")
+    output = args[args.index("-o") + 1]
+    fixture = settings.get("video_fixture")
+    if output == "-":
+        out = sys.stdout.buffer
+        if fixture:
+            with open(fixture, "rb") as f:
+                shutil.copyfileobj(f, out, CHUNK_SIZE)
+        else:
+            _write_bytes(out, settings["output_bytes"], rng)
+        out.flush()
+    elif fixture:
+        shutil.copyfile(fixture, output)
+    else:
+        with open(output, "wb") as f:
+            _write_bytes(f, settings["output_bytes"], rng)
+    return 0
+
+
+def fake_ffmpeg(settings: Dict, args: List[str]) -> int:
+    """Handle the mp3, wav and f32le (file and pipe) forms of ffmpeg used by AudioExtractor."""
+    source = args[args.index("-i") + 1]
+    if source == "pipe:0":
+        # Drain the input like a real decoder would, keying failures on its content
+        first = sys.stdin.buffer.read(CHUNK_SIZE)
+        while sys.stdin.buffer.read(CHUNK_SIZE):
+            pass
+        rng = _rng(settings, f"ffmpeg:{hashlib.sha1(first).hexdigest()}")
+    elif not os.path.exists(source):
+        sys.stderr.write(f"{source}: No such file or directory\n")
+        return 1
+    else:
+        rng = _rng(settings, f"ffmpeg:{os.path.basename(source)}")
+    _sleep(settings, rng)
+    _maybe_fail(settings, rng, "ffmpeg")
+    
+    output = args[-1]
+    if "f32le" in args:
+        out = sys.stdout.buffer
+        with open(settings["pcm_fixture"], "rb") as f:
+            shutil.copyfileobj(f, out, CHUNK_SIZE)
+        out.flush()
+    elif "pcm_s16le" in args:
+        shutil.copyfile(settings["wav_fixture"], output)
+    else:
+        with open(output, "wb") as f:
+            _write_bytes(f, settings["output_bytes"], rng)
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    """Dispatch to the fake tool named by the first argument."""
+    tool, settings_path, args = argv[0], argv[1], argv[2:]
+    with open(settings_path, encoding="utf-8") as f:
+        settings = json.load(f)[tool]
+    if tool == "yt-dlp":
+        return fake_ytdlp(settings, args)
+    return fake_ffmpeg(settings, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,191 @@
+"""Injectable stand-ins for yt-dlp, ffmpeg and the Whisper model."""
+
+import json
+import logging
+import os
+import stat
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from . import fake_tools
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeToolSettings:
+    """Behaviour of one fake executable."""
+    
+    # Seconds each call sleeps, plus up to ``jitter`` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of calls (keyed by URL, so stable across runs) that fail
+    failure_rate: float = 0.0
+    # Size of downloaded videos, or of encoded mp3 files for ffmpeg
+    output_bytes: int = 1024 * 1024
+
+
+class FakeWhisperModel:
+    """
+    Object with the ``transcribe`` interface of a Whisper model, but no model.
+    
+    It sleeps for a fixed time plus a real-time factor times the audio
+    length, then returns a canned result. It has no ``dims`` attribute, so
+    ``AudioTranscriber.transcribe_many`` transcribes clips one at a time.
+    Calls hold a lock, like inference on a single real model would.
+    """
+    
+    def __init__(
+        self,
+        latency: float = 0.0,
+        real_time_factor: float = 0.0,
+        failure_rate: float = 0.0,
+        audio_seconds: float = 15.0,
+        text: str = "This is a benchmark transcript.",
+    ):
+        """
+        Initialize the fake model.
+        
+        Args:
+            latency: Fixed seconds per call
+            real_time_factor: Extra seconds per second of audio
+            failure_rate: Fraction of calls that raise
+            audio_seconds: Audio length assumed when given a file path
+            text: Transcript returned for every clip
+        """
+        self.latency = latency
+        self.real_time_factor = real_time_factor
+        self.failure_rate = failure_rate
+        self.audio_seconds = audio_seconds
+        self.text = text
+        self.calls = 0
+        self._lock = threading.Lock()
+    
+    def transcribe(self, audio: Any, **decode_options: Any) -> Dict[str, Any]:
+        """Pretend to transcribe a clip."""
+        if isinstance(audio, str):
+            seconds = self.audio_seconds
+        else:
+            seconds = len(audio) / fake_tools.SAMPLE_RATE
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            time.sleep(self.latency + self.real_time_factor * seconds)
+        # Deterministic failures: every 1/failure_rate-th call
+        if self.failure_rate > 0 and call % max(1, round(1 / self.failure_rate)) == 0:
+            raise RuntimeError("simulated model failure")
+        return {
+            "text": self.text,
+            "segments": [{"start": 0.0, "end": seconds, "text": self.text}],
+            "language": "en",
+        }
+
+
+def install_fake_tools(
+    directory: str,
+    ytdlp: FakeToolSettings,
+    ffmpeg: FakeToolSettings,
+    audio_seconds: float = 15.0,
+    video_fixture: Optional[str] = None,
+    seed: int = 0,
+) -> Tuple[str, str]:
+    """
+    Write fake ``yt-dlp`` and ``ffmpeg`` executables into a directory.
+    
+    Args:
+        directory: Directory for the executables, their settings and fixtures
+        ytdlp: Behaviour of the fake yt-dlp
+        ffmpeg: Behaviour of the fake ffmpeg
+        audio_seconds: Length of the audio every clip decodes to
+        video_fixture: Real media file the fake yt-dlp serves instead of
+            random bytes, e.g. for use with a real ffmpeg
+        seed: Seed for the tools' latency jitter and failures
+        
+    Returns:
+        Tuple of (yt-dlp path, ffmpeg path), for ``VideoDownloader(ytdlp_path=...)``
+        and ``AudioExtractor(ffmpeg_path=...)``
+    """
+    os.makedirs(directory, exist_ok=True)
+    samples = fake_tools.synthetic_pcm(audio_seconds)
+    pcm_fixture = os.path.join(directory, "fixture.f32le")
+    with open(pcm_fixture, "wb") as f:
+        f.write(fake_tools.float32_bytes(samples))
+    wav_fixture = os.path.join(directory, "fixture.wav")
+    fake_tools.write_wav(wav_fixture, samples)
+    
+    settings_path = os.path.join(directory, "settings.json")
+    with open(settings_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "yt-dlp": {
+                **asdict(ytdlp),
+                "seed": seed,
+                "audio_seconds": audio_seconds,
+                "video_fixture": video_fixture,
+            },
+            "ffmpeg": {
+                **asdict(ffmpeg),
+                "seed": seed,
+                "pcm_fixture": pcm_fixture,
+                "wav_fixture": wav_fixture,
+            },
+        }, f)
+    
+    paths = []
+    for tool in ("yt-dlp", "ffmpeg"):
+        path = os.path.join(directory, tool)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                "#!/bin/sh\n"
+                f'exec "{sys.executable}" "{fake_tools.__file__}" {tool} '
+                f'"{settings_path}" "$@"\n'
+            )
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        paths.append(path)
+    logger.debug(f"Installed fake yt-dlp and ffmpeg in {directory}")
+    return paths[0], paths[1]
+
+
+def make_video_fixture(
+    directory: str,
+    audio_seconds: float = 15.0,
+    ffmpeg_path: str = "ffmpeg",
+) -> str:
+    """
+    Encode synthetic audio into a small MP4 with a real ffmpeg.
+    
+    The index is moved to the front of the file so the fixture also
+    decodes when streamed through a pipe.
+    
+    Args:
+        directory: Directory to write the fixture into
+        audio_seconds: Length of the audio
+        ffmpeg_path: ffmpeg executable to encode with
+        
+    Returns:
+        Path to the MP4 file
+        
+    Raises:
+        RuntimeError: If ffmpeg is missing or fails
+    """
+    os.makedirs(directory, exist_ok=True)
+    wav_path = os.path.join(directory, "source.wav")
+    video_path = os.path.join(directory, "fixture.mp4")
+    fake_tools.write_wav(wav_path, fake_tools.synthetic_pcm(audio_seconds))
+    try:
+        result = subprocess.run(
+            [
+                ffmpeg_path, "-nostdin", "-loglevel", "error", "-i", wav_path,
+                "-c:a", "aac", "-movflags", "+faststart", "-y", video_path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+    except OSError as e:
+        raise RuntimeError(f"Could not run {ffmpeg_path}: {e}")
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not encode video fixture: {result.stderr}")
+    return video_path
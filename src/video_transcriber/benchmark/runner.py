@@ -0,0 +1,410 @@
+"""Benchmark scenarios and the code that runs and compares them."""
+
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .. import __version__
+from ..audio import AudioExtractor
+from ..config import TranscriberConfig
+from ..downloader import VideoDownloader
+from ..engines import load_engine
+from ..manifest import JobManifest
+from ..processor import VideoJob, VideoProcessor
+from ..transcriber import AudioTranscriber
+from .fakes import FakeToolSettings, FakeWhisperModel, install_fake_tools, make_video_fixture
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PERCENTILES = (50, 90, 99)
+
+# URLs whose video ID utils.extract_video_id recognizes, like real input
+BENCHMARK_URL = "https://www.tiktok.com/@benchmark/video/{}"
+
+
+@dataclass
+class Scenario:
+    """One benchmark configuration."""
+    
+    name: str
+    description: str
+    urls: int = 40
+    audio_seconds: float = 15.0
+    ytdlp: FakeToolSettings = field(
+        default_factory=lambda: FakeToolSettings(latency=0.05, jitter=0.05)
+    )
+    ffmpeg: FakeToolSettings = field(
+        default_factory=lambda: FakeToolSettings(latency=0.02, output_bytes=256 * 1024)
+    )
+    # "fake" for FakeWhisperModel, otherwise a Whisper model name
+    model: str = "fake"
+    model_latency: float = 0.05
+    model_real_time_factor: float = 0.005
+    model_failure_rate: float = 0.0
+    # Decode with the real ffmpeg instead of the fake one
+    real_ffmpeg: bool = False
+    # TranscriberConfig fields to override
+    config: Dict[str, Any] = field(default_factory=dict)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("sequential", "Fake tools and model, one URL at a time"),
+        Scenario(
+            "pipeline",
+            "Fake tools and model, staged pipeline",
+            config={"pipeline": True, "download_workers": 4},
+        ),
+        Scenario(
+            "pipeline-npy",
+            "Staged pipeline with PCM (.npy) audio loaded without ffmpeg",
+            config={"pipeline": True, "download_workers": 4, "audio_format": "npy"},
+        ),
+        Scenario(
+            "streaming",
+            "Staged pipeline decoding downloads in memory",
+            config={"pipeline": True, "download_workers": 4, "streaming": True},
+        ),
+        Scenario(
+            "flaky",
+            "Staged pipeline with 10% of downloads and extractions failing",
+            ytdlp=FakeToolSettings(latency=0.05, jitter=0.05, failure_rate=0.1),
+            ffmpeg=FakeToolSettings(latency=0.02, output_bytes=256 * 1024, failure_rate=0.1),
+            config={"pipeline": True, "download_workers": 4},
+        ),
+        Scenario(
+            "real-ffmpeg",
+            "Fake yt-dlp serving a synthetic MP4, decoded by the real ffmpeg",
+            urls=20,
+            real_ffmpeg=True,
+            config={"pipeline": True, "download_workers": 4, "audio_format": "wav"},
+        ),
+        Scenario(
+            "real-model",
+            "Real ffmpeg and Whisper tiny on synthetic audio",
+            urls=10,
+            model="tiny",
+            real_ffmpeg=True,
+            config={"pipeline": True, "audio_format": "wav"},
+        ),
+    ]
+}
+
+# Scenarios that need nothing beyond the Python standard library and NumPy
+DEFAULT_SCENARIOS = ["sequential", "pipeline", "pipeline-npy", "streaming", "flaky"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of values, interpolating between ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class StageTimer:
+    """Thread-safe collection of per-stage latencies."""
+    
+    def __init__(self):
+        """Initialize an empty timer."""
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+    
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one latency sample for a stage."""
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, mean, max and percentiles (in seconds) for each stage."""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+        summary = {}
+        for stage, values in samples.items():
+            stats = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "max": max(values),
+            }
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = percentile(values, pct)
+            summary[stage] = stats
+        return summary
+
+
+class TimedProcessor(VideoProcessor):
+    """VideoProcessor that records how long each stage method takes."""
+    
+    def __init__(self, timer: StageTimer, *args: Any, **kwargs: Any):
+        """
+        Initialize the processor.
+        
+        Args:
+            timer: Where stage latencies are recorded
+            *args: Positional arguments for VideoProcessor
+            **kwargs: Keyword arguments for VideoProcessor
+        """
+        super().__init__(*args, **kwargs)
+        self.timer = timer
+    
+    def start_job(self, url: str, index: int) -> Tuple[Optional[VideoJob], str]:
+        """Time VideoProcessor.start_job as the "metadata" stage."""
+        return self._timed("metadata", super().start_job, url, index)
+    
+    def download(self, job: VideoJob) -> None:
+        """Time VideoProcessor.download as the "download" stage."""
+        return self._timed("download", super().download, job)
+    
+    def extract(self, job: VideoJob) -> None:
+        """Time VideoProcessor.extract as the "extract" stage."""
+        return self._timed("extract", super().extract, job)
+    
+    def transcribe(self, job: VideoJob) -> str:
+        """Time VideoProcessor.transcribe as the "transcribe" stage."""
+        return self._timed("transcribe", super().transcribe, job)
+    
+    def transcribe_batch(self, jobs: List[VideoJob]) -> List[Tuple[bool, str]]:
+        """Time VideoProcessor.transcribe_batch as the "transcribe_batch" stage."""
+        return self._timed("transcribe_batch", super().transcribe_batch, jobs)
+    
+    def _timed(self, stage: str, function: Callable[..., T], *args: Any) -> T:
+        """Call a stage method and record its latency, whether or not it fails."""
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.timer.record(stage, time.perf_counter() - start)
+
+
+def _peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB.
+    
+    Subprocesses are not included: on Linux a child inherits its parent's
+    high-water mark across fork, so their figures would be meaningless.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _load_model(scenario: Scenario) -> Any:
+    """Create the scenario's model; raises ImportError if Whisper is needed but missing."""
+    if scenario.model == "fake":
+        return FakeWhisperModel(
+            latency=scenario.model_latency,
+            real_time_factor=scenario.model_real_time_factor,
+            failure_rate=scenario.model_failure_rate,
+            audio_seconds=scenario.audio_seconds,
+        )
+    return load_engine(scenario.model)
+
+
+def run_scenario(
+    scenario: Scenario,
+    urls: Optional[int] = None,
+    fixture: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run one scenario in a scratch directory and measure it.
+    
+    Args:
+        scenario: Scenario to run
+        urls: Number of URLs, overriding the scenario's default
+        fixture: Media file to serve instead of synthetic audio
+            (real-ffmpeg scenarios only)
+            
+    Returns:
+        Result dictionary; ``skipped`` is set if the scenario's requirements
+        (ffmpeg, Whisper) are not available
+    """
+    count = urls or scenario.urls
+    result: Dict[str, Any] = {"description": scenario.description, "urls": count}
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario.name}-") as work_dir:
+        ffmpeg_path = None
+        video_fixture = None
+        if scenario.real_ffmpeg:
+            ffmpeg_path = shutil.which("ffmpeg")
+            if ffmpeg_path is None:
+                return {**result, "skipped": "ffmpeg not found"}
+            try:
+                video_fixture = fixture or make_video_fixture(
+                    os.path.join(work_dir, "fixture"), scenario.audio_seconds, ffmpeg_path
+                )
+            except RuntimeError as e:
+                return {**result, "skipped": str(e)}
+        
+        ytdlp_path, fake_ffmpeg_path = install_fake_tools(
+            os.path.join(work_dir, "bin"),
+            scenario.ytdlp,
+            scenario.ffmpeg,
+            audio_seconds=scenario.audio_seconds,
+            video_fixture=video_fixture,
+        )
+        
+        setup_start = time.perf_counter()
+        try:
+            model = _load_model(scenario)
+        except ImportError:
+            return {**result, "skipped": "openai-whisper not installed"}
+        except Exception as e:
+            return {**result, "skipped": f"could not load model: {e}"}
+        result["setup_seconds"] = time.perf_counter() - setup_start
+        
+        config = TranscriberConfig(
+            video_dir=os.path.join(work_dir, "videos"),
+            audio_dir=os.path.join(work_dir, "audio"),
+            transcript_dir=os.path.join(work_dir, "transcripts"),
+            **scenario.config,
+        )
+        config.create_directories()
+        manifest = JobManifest(config.manifest_path) if config.use_manifest else None
+        timer = StageTimer()
+        processor = TimedProcessor(
+            timer,
+            config,
+            VideoDownloader(
+                download_timeout=config.download_timeout,
+                metadata_timeout=config.metadata_timeout,
+                ytdlp_path=ytdlp_path,
+            ),
+            AudioExtractor(
+                timeout=config.audio_timeout,
+                audio_format=config.audio_format,
+                ffmpeg_path=ffmpeg_path or fake_ffmpeg_path,
+            ),
+            AudioTranscriber(model),
+            manifest,
+        )
+        
+        url_list = [BENCHMARK_URL.format(7_000_000_000_000_000_000 + i) for i in range(count)]
+        start = time.perf_counter()
+        try:
+            successful, failed = processor.process_urls(url_list)
+        finally:
+            if manifest is not None:
+                manifest.close()
+        wall = time.perf_counter() - start
+    
+    result.update({
+        "successful": successful,
+        "failed": failed,
+        "wall_seconds": wall,
+        "urls_per_sec": count / wall if wall > 0 else 0.0,
+        "stages": timer.summary(),
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+    return result
+
+
+def _run_named_scenario(
+    name: str,
+    urls: Optional[int],
+    fixture: Optional[str],
+    log_level: int,
+) -> Dict[str, Any]:
+    """Entry point for running a scenario in a fresh process."""
+    logging.basicConfig(level=log_level)
+    logging.getLogger().setLevel(log_level)
+    return run_scenario(SCENARIOS[name], urls, fixture)
+
+
+def run_benchmark(
+    names: List[str],
+    urls: Optional[int] = None,
+    fixture: Optional[str] = None,
+    log_level: int = logging.CRITICAL,
+) -> Dict[str, Any]:
+    """
+    Run scenarios, each in its own process so peak RSS is measured separately.
+    
+    Args:
+        names: Names of scenarios in SCENARIOS
+        urls: Number of URLs per scenario, overriding their defaults
+        fixture: Media file to serve in real-ffmpeg scenarios
+        log_level: Log level inside the scenario processes
+        
+    Returns:
+        Report dictionary with environment details and one entry per scenario
+    """
+    report: Dict[str, Any] = {
+        "version": __version__,
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "scenarios": {},
+    }
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        logger.info(f"Running scenario {name}: {SCENARIOS[name].description}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_run_named_scenario, name, urls, fixture, log_level).result()
+        report["scenarios"][name] = result
+        if "skipped" in result:
+            logger.info(f"  skipped: {result['skipped']}")
+        else:
+            logger.info(
+                f"  {result['urls_per_sec']:.2f} URLs/sec, {result['successful']} succeeded, "
+                f"{result['failed']} failed, peak RSS {result['peak_rss_mb']:.0f} MB"
+            )
+    return report
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_regression: float,
+) -> Tuple[List[str], bool]:
+    """
+    Compare a report against a stored baseline report.
+    
+    Args:
+        report: Report from run_benchmark
+        baseline: Earlier report to compare against
+        max_regression: Largest acceptable drop in URLs/sec, in percent
+        
+    Returns:
+        Tuple of (human-readable comparison lines, whether any scenario's
+        throughput dropped by more than ``max_regression``)
+    """
+    lines = []
+    regressed = False
+    for name, result in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if "skipped" in result or not base or "skipped" in base:
+            continue
+        change = 100 * (result["urls_per_sec"] / base["urls_per_sec"] - 1)
+        marker = ""
+        if change < -max_regression:
+            regressed = True
+            marker = "  <-- regression"
+        lines.append(
+            f"{name}: {base['urls_per_sec']:.2f} -> {result['urls_per_sec']:.2f} URLs/sec "
+            f"({change:+.1f}%){marker}"
+        )
+        for stage, stats in result["stages"].items():
+            base_stats = base.get("stages", {}).get(stage)
+            if base_stats:
+                lines.append(
+                    f"  {stage} p50: {base_stats['p50'] * 1000:.0f} -> "
+                    f"{stats['p50'] * 1000:.0f} ms"
+                )
+    return lines, regressed
@@ -0,0 +1,169 @@
+"""Content-addressed transcript cache for deduplicating identical audio."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .engines import TranscriptionResult, to_result
+
+logger = logging.getLogger(__name__)
+
+# Result keys kept in the cache; the transcript column holds them as JSON
+CACHED_KEYS = ("text", "segments", "language", "confidence")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    fingerprint TEXT PRIMARY KEY,
+    transcript TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def audio_fingerprint(samples: Any, model_name: str, options: Optional[Dict] = None) -> str:
+    """
+    Compute the cache key for a clip's decoded audio.
+    
+    The samples are quantized to 16-bit before hashing, so the same audio
+    track decoded from two re-uploads hashes the same even if float rounding
+    differs. The model name and decode options are part of the key because
+    they change the transcript.
+    
+    Args:
+        samples: float32 NumPy array of 16 kHz mono samples
+        model_name: Name of the Whisper model that will transcribe the clip
+        options: Decode options passed to the model
+        
+    Returns:
+        Hex digest identifying the (audio, model, options) combination
+    """
+    import numpy as np
+    
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(pcm.tobytes())
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    SQLite-backed transcript cache keyed by audio fingerprint.
+    
+    Whole transcription results are cached, segments and language included,
+    so a cache hit can be stored and indexed like a fresh transcript. The
+    total size of the stored transcripts is kept under ``max_bytes`` by
+    evicting the least recently used entries. Safe to share between
+    pipeline worker threads.
+    """
+    
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Open (or create) a transcript cache.
+        
+        Args:
+            path: Path to the SQLite database file
+            max_bytes: Upper bound on the total size of cached transcripts
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used)"
+            )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM transcripts"
+        ).fetchone()[0]
+        logger.debug(f"Opened transcript cache at {path} ({self._total_bytes} bytes)")
+    
+    def get(self, fingerprint: str) -> Optional[TranscriptionResult]:
+        """
+        Look up a cached transcript, marking it as recently used.
+        
+        Args:
+            fingerprint: Key from audio_fingerprint
+            
+        Returns:
+            Cached transcription result, or None on a miss
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT transcript FROM transcripts WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET last_used = ?, hits = hits + 1 WHERE fingerprint = ?",
+                (time.time(), fingerprint),
+            )
+            self.hits += 1
+        try:
+            cached = json.loads(row[0])
+        except ValueError:
+            cached = None
+        if not isinstance(cached, dict):
+            # Entry written by an older version that cached only the text
+            cached = {"text": row[0]}
+        return to_result(cached)
+    
+    def put(self, fingerprint: str, result: TranscriptionResult) -> None:
+        """
+        Store a transcript, evicting least recently used entries if over budget.
+        
+        Args:
+            fingerprint: Key from audio_fingerprint
+            result: Transcription result; only the CACHED_KEYS are kept
+        """
+        cached = {key: result.get(key) for key in CACHED_KEYS}
+        transcript = json.dumps(cached, ensure_ascii=False)
+        size = len(transcript.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT size FROM transcripts WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (fingerprint, transcript, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (fingerprint, transcript, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its budget."""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT fingerprint, size FROM transcripts ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for fingerprint, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE fingerprint = ?", (fingerprint,)
+                )
+                self._total_bytes -= size
+                logger.debug(f"Evicted cached transcript {fingerprint[:12]}")
@@ -0,0 +1,207 @@
+"""Resumable transcription of long clips, checkpointed span by span to a sidecar file."""
+
+import json
+import logging
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Whisper decodes audio in windows of this many seconds
+WINDOW_SECONDS = 30
+# Characters of the transcript so far passed on as the next span's prompt;
+# Whisper keeps at most the last 224 prompt tokens
+PROMPT_CHARS = 800
+# A span's last segment is only dropped (and redone by the next span) if it
+# starts at least this far into the span, so every span makes progress
+MIN_PROGRESS_SECONDS = 1.0
+
+# Transcribes samples, given the prompt to condition on, returning a raw result
+SpanTranscriber = Callable[[Any, Optional[str]], Dict[str, Any]]
+
+
+class SegmentCheckpointer:
+    """
+    Transcribes long clips in spans, saving each finished span to disk.
+    
+    A clip longer than ``span_seconds`` is sent to the model one span at a
+    time instead of in one call. After each span its segments, and the
+    text the next span is prompted with, are appended to a sidecar file
+    named after the clip's fingerprint and flushed to disk. If the process
+    dies, the next attempt at the same clip reads the sidecar back and
+    continues after the last finished span instead of starting over.
+    
+    Each span but the last ends mid-window, so its final segment may be
+    cut off. That segment is dropped and the next span starts where it
+    started, prompted with the transcript so far, much as Whisper itself
+    carries on from one 30-second window to the next. The sidecar is
+    removed once the clip is done. Safe to share between threads, as long
+    as no two of them transcribe the same clip at once.
+    """
+    
+    def __init__(self, directory: str, span_seconds: float):
+        """
+        Initialize the checkpointer.
+        
+        Args:
+            directory: Directory for the sidecar files
+            span_seconds: Audio transcribed between checkpoints; rounded up
+                to whole Whisper windows
+        """
+        self.directory = directory
+        self.span_seconds = max(1, math.ceil(span_seconds / WINDOW_SECONDS)) * WINDOW_SECONDS
+        self.resumed = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def applies(self, samples: Any) -> bool:
+        """Return True if a clip is long enough to be transcribed in spans."""
+        return len(samples) > self.span_seconds * SAMPLE_RATE
+    
+    def path(self, key: str) -> str:
+        """Return the sidecar file for a clip."""
+        return os.path.join(self.directory, f"{key}.jsonl")
+    
+    def transcribe(self, samples: Any, key: str, run: SpanTranscriber) -> Dict[str, Any]:
+        """
+        Transcribe a clip span by span, resuming from its sidecar if there is one.
+        
+        Args:
+            samples: 16 kHz mono float32 samples
+            key: Identifies the clip together with the model and its options,
+                e.g. its ``audio_fingerprint``
+            run: Transcribes one span's samples with the given prompt
+            
+        Returns:
+            The combined raw result, with times on the whole clip
+        """
+        path = self.path(key)
+        header = {"samples": len(samples), "span_seconds": self.span_seconds}
+        spans = self._load(path, header)
+        if spans:
+            self.resumed += 1
+            logger.info(
+                f"Resuming transcription at {spans[-1]['next']:.0f}s of "
+                f"{len(samples) / SAMPLE_RATE:.0f}s from checkpoint {path}"
+            )
+        
+        with open(path, "a" if spans else "w", encoding="utf-8") as f:
+            if not spans:
+                _append(f, header)
+            position = spans[-1]["next"] if spans else 0.0
+            prompt = spans[-1]["prompt"] if spans else None
+            total = len(samples) / SAMPLE_RATE
+            while position < total:
+                span = self._transcribe_span(samples, position, prompt, run)
+                _append(f, span)
+                spans.append(span)
+                position, prompt = span["next"], span["prompt"]
+        
+        result = _combine(spans)
+        os.remove(path)
+        return result
+    
+    def _transcribe_span(
+        self, samples: Any, start: float, prompt: Optional[str], run: SpanTranscriber
+    ) -> Dict[str, Any]:
+        """Transcribe the span starting at ``start`` seconds and describe where to go next."""
+        end = start + self.span_seconds
+        total = len(samples) / SAMPLE_RATE
+        raw = run(samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)], prompt)
+        segments = [_shift(segment, start) for segment in raw.get("segments") or []]
+        next_start = min(end, total)
+        if end < total and len(segments) > 1:
+            last_start = segments[-1].get("start")
+            if last_start is not None and start + MIN_PROGRESS_SECONDS <= last_start < end:
+                # Cut off at the span's end; the next span transcribes it whole
+                segments.pop()
+                next_start = last_start
+        if segments:
+            text = "".join(segment.get("text", "") for segment in segments)
+        elif next_start >= total:
+            text = raw.get("text") or ""
+        else:
+            text = ""
+        context = f"{prompt or ''}{text}"[-PROMPT_CHARS:].strip()
+        logger.debug(f"Checkpointed {start:.0f}s to {next_start:.0f}s of {total:.0f}s")
+        return {
+            "start": start,
+            "next": next_start,
+            "text": text,
+            "segments": segments,
+            "language": raw.get("language"),
+            "prompt": context or None,
+        }
+    
+    @staticmethod
+    def _load(path: str, header: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Read a clip's finished spans from its sidecar.
+        
+        A sidecar written with another span length is ignored, as is a
+        last line cut short by the crash.
+        """
+        if not os.path.exists(path):
+            return []
+        spans: List[Dict[str, Any]] = []
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        for i, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if i == 0:
+                if record != header:
+                    logger.info(f"Checkpoint {path} is for other settings, starting over")
+                    return []
+                continue
+            spans.append(record)
+        if spans and len(spans) < len(lines) - 1:
+            # Rewrite without the partial line, so appended spans start on a fresh one
+            with open(path, "w", encoding="utf-8") as f:
+                for record in [header, *spans]:
+                    _append(f, record)
+        return spans
+
+
+def _append(f: Any, record: Dict[str, Any]) -> None:
+    """Append a JSON line to a sidecar and make sure it reached the disk."""
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _shift(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    """Return a span's segment with its times moved onto the whole clip."""
+    segment = {key: value for key, value in segment.items() if _is_json(value)}
+    for key in ("start", "end"):
+        if key in segment:
+            segment[key] = float(segment[key]) + offset
+    if "words" in segment:
+        segment["words"] = [
+            {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+            for word in segment["words"]
+        ]
+    return segment
+
+
+def _is_json(value: Any) -> bool:
+    """Return True if a segment field can go into the sidecar (tensors cannot)."""
+    return isinstance(value, (str, int, float, bool, list, dict, type(None)))
+
+
+def _combine(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Join the spans of a clip into one raw result."""
+    segments: List[Dict[str, Any]] = []
+    for span in spans:
+        for segment in span["segments"]:
+            segments.append({**segment, "id": len(segments)})
+    language = next((span["language"] for span in spans if span["language"]), None)
+    return {
+        "text": "".join(span["text"] for span in spans),
+        "segments": segments,
+        "language": language,
+    }
@@ -1,20 +1,72 @@
 """Configuration management for video transcriber."""
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 
 # Constants
 DEFAULT_WHISPER_MODEL = "base"
 DEFAULT_URLS_FILE = "urls.txt"
+# Distinct videos remembered in memory while deduplicating URLs, before
+# spilling to disk; about 90 bytes each
+DEFAULT_DEDUPE_MEMORY_KEYS = 1_000_000
 DEFAULT_VIDEO_DIR = "videos"
 DEFAULT_AUDIO_DIR = "audio"
 DEFAULT_TRANSCRIPT_DIR = "transcripts"
 DEFAULT_DOWNLOAD_TIMEOUT = 120
 DEFAULT_AUDIO_TIMEOUT = 60
 DEFAULT_METADATA_TIMEOUT = 60
+# Seconds added to the download and audio timeouts per minute of video
+DEFAULT_DOWNLOAD_TIMEOUT_PER_MINUTE = 30.0
+DEFAULT_AUDIO_TIMEOUT_PER_MINUTE = 10.0
 MAX_FILENAME_LENGTH = 50
+DEFAULT_AUDIO_FORMAT = "mp3"
+DEFAULT_DOWNLOAD_WORKERS = 2
+DEFAULT_EXTRACT_WORKERS = 1
+DEFAULT_TRANSCRIBE_WORKERS = 1
+DEFAULT_PIPELINE_QUEUE_SIZE = 4
+DEFAULT_THREADS_PER_PROCESS = 1
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_BATCH_MAX_WAIT = 0.5
+MANIFEST_FILENAME = ".manifest.sqlite"
+TRANSCRIPT_CACHE_FILENAME = ".transcript_cache.sqlite"
+DEFAULT_TRANSCRIPT_CACHE_MAX_MB = 256
+ARTIFACT_INDEX_FILENAME = ".artifacts.sqlite"
+DEFAULT_ARTIFACT_CACHE_MAX_MB = 10240
+DECODED_AUDIO_DIRNAME = ".decoded"
+DEFAULT_DOWNLOADER_BACKEND = "subprocess"
+DOWNLOADER_BACKENDS = ("subprocess", "library")
+DEFAULT_INFERENCE_ENGINE = "whisper"
+INFERENCE_ENGINES = ("whisper", "whisper-int8")
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8765
+DEFAULT_DOWNLOAD_RETRIES = 0
+DEFAULT_NETWORK_CONCURRENCY = 16
+DEFAULT_HOST_RATE = 2.0
+DEFAULT_HOST_BURST = 4
+DEFAULT_PREFETCH_CHUNK_SIZE = 200
+DEFAULT_PREFETCH_WORKERS = 4
+DEFAULT_SINK = "text"
+SINKS = ("text", "sqlite", "both")
+TRANSCRIPT_STORE_FILENAME = "transcripts.sqlite"
+DEFAULT_SCHEDULE = "fifo"
+SCHEDULES = ("fifo", "longest-first")
+# Longest URL list read into memory to be ordered as a whole; longer lists
+# are ordered one prefetch window at a time
+SCHEDULE_MAX_LIST_URLS = 100_000
+# Seconds of work per second of audio assumed until jobs have been measured
+DEFAULT_JOB_SECONDS_PER_AUDIO_SECOND = 0.5
+SEARCH_INDEX_FILENAME = "search.sqlite"
+DEFAULT_METRICS_INTERVAL = 30.0
+# Whisper's own retry thresholds double as the cascade's escalation thresholds
+DEFAULT_CASCADE_LOGPROB_THRESHOLD = -1.0
+DEFAULT_CASCADE_COMPRESSION_RATIO_THRESHOLD = 2.4
+DEFAULT_CASCADE_NO_SPEECH_THRESHOLD = 0.6
+DEFAULT_LONG_AUDIO_CHUNK_SECONDS = 120.0
+CHECKPOINT_DIRNAME = ".checkpoints"
+# Audio transcribed between checkpoints, in whole 30-second Whisper windows
+DEFAULT_CHECKPOINT_SECONDS = 300.0
 
 
 @dataclass
@@ -22,14 +74,71 @@ class TranscriberConfig:
     """Configuration for the transcriber."""
     
     urls_file: str = DEFAULT_URLS_FILE
+    url_sources: List[str] = field(default_factory=list)
+    dedupe_urls: bool = True
+    dedupe_memory_keys: int = DEFAULT_DEDUPE_MEMORY_KEYS
     whisper_model: str = DEFAULT_WHISPER_MODEL
+    inference_engine: str = DEFAULT_INFERENCE_ENGINE
     video_dir: str = DEFAULT_VIDEO_DIR
     audio_dir: str = DEFAULT_AUDIO_DIR
     transcript_dir: str = DEFAULT_TRANSCRIPT_DIR
     download_timeout: int = DEFAULT_DOWNLOAD_TIMEOUT
     audio_timeout: int = DEFAULT_AUDIO_TIMEOUT
     metadata_timeout: int = DEFAULT_METADATA_TIMEOUT
+    download_timeout_per_minute: float = DEFAULT_DOWNLOAD_TIMEOUT_PER_MINUTE
+    audio_timeout_per_minute: float = DEFAULT_AUDIO_TIMEOUT_PER_MINUTE
     max_filename_length: int = MAX_FILENAME_LENGTH
+    audio_format: str = DEFAULT_AUDIO_FORMAT
+    streaming: bool = False
+    pipeline: bool = False
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS
+    extract_workers: int = DEFAULT_EXTRACT_WORKERS
+    transcribe_workers: int = DEFAULT_TRANSCRIBE_WORKERS
+    pipeline_queue_size: int = DEFAULT_PIPELINE_QUEUE_SIZE
+    transcribe_processes: int = 0
+    threads_per_process: int = DEFAULT_THREADS_PER_PROCESS
+    batch_size: int = DEFAULT_BATCH_SIZE
+    batch_max_wait: float = DEFAULT_BATCH_MAX_WAIT
+    vad: bool = False
+    vad_music_threshold: float = 0.0
+    downloader_backend: str = DEFAULT_DOWNLOADER_BACKEND
+    use_manifest: bool = True
+    manifest_file: Optional[str] = None
+    use_transcript_cache: bool = False
+    transcript_cache_file: Optional[str] = None
+    transcript_cache_max_mb: int = DEFAULT_TRANSCRIPT_CACHE_MAX_MB
+    artifact_cache: bool = False
+    artifact_index_file: Optional[str] = None
+    artifact_cache_max_mb: int = DEFAULT_ARTIFACT_CACHE_MAX_MB
+    download_retries: int = DEFAULT_DOWNLOAD_RETRIES
+    async_network: bool = False
+    network_concurrency: int = DEFAULT_NETWORK_CONCURRENCY
+    host_rate: float = DEFAULT_HOST_RATE
+    host_burst: int = DEFAULT_HOST_BURST
+    prefetch: bool = False
+    prefetch_chunk_size: int = DEFAULT_PREFETCH_CHUNK_SIZE
+    prefetch_workers: int = DEFAULT_PREFETCH_WORKERS
+    metadata_file: Optional[str] = None
+    min_duration: Optional[float] = None
+    max_duration: Optional[float] = None
+    schedule: str = DEFAULT_SCHEDULE
+    sink: str = DEFAULT_SINK
+    store_file: Optional[str] = None
+    search_index: bool = False
+    search_index_file: Optional[str] = None
+    metrics_jsonl_file: Optional[str] = None
+    metrics_prometheus_file: Optional[str] = None
+    metrics_interval: float = DEFAULT_METRICS_INTERVAL
+    cascade_model: Optional[str] = None
+    cascade_logprob_threshold: float = DEFAULT_CASCADE_LOGPROB_THRESHOLD
+    cascade_compression_ratio_threshold: float = DEFAULT_CASCADE_COMPRESSION_RATIO_THRESHOLD
+    cascade_no_speech_threshold: float = DEFAULT_CASCADE_NO_SPEECH_THRESHOLD
+    long_audio: bool = False
+    long_audio_chunk_seconds: float = DEFAULT_LONG_AUDIO_CHUNK_SECONDS
+    long_audio_workers: int = 0
+    checkpoint: bool = False
+    checkpoint_seconds: float = DEFAULT_CHECKPOINT_SECONDS
+    checkpoint_dir: Optional[str] = None
     
     @classmethod
     def from_env(cls) -> "TranscriberConfig":
@@ -37,12 +146,81 @@ class TranscriberConfig:
         return cls(
             urls_file=os.environ.get("URLS_FILE", DEFAULT_URLS_FILE),
             whisper_model=os.environ.get("WHISPER_MODEL", DEFAULT_WHISPER_MODEL),
+            inference_engine=os.environ.get("INFERENCE_ENGINE", DEFAULT_INFERENCE_ENGINE),
             video_dir=os.environ.get("VIDEO_DIR", DEFAULT_VIDEO_DIR),
             audio_dir=os.environ.get("AUDIO_DIR", DEFAULT_AUDIO_DIR),
             transcript_dir=os.environ.get("TRANSCRIPT_DIR", DEFAULT_TRANSCRIPT_DIR),
+            audio_format=os.environ.get("AUDIO_FORMAT", DEFAULT_AUDIO_FORMAT),
+            downloader_backend=os.environ.get("DOWNLOADER_BACKEND", DEFAULT_DOWNLOADER_BACKEND),
         )
     
+    @property
+    def sources(self) -> List[str]:
+        """URL files, globs and "-" for stdin to read, defaulting to urls_file."""
+        return self.url_sources or [self.urls_file]
+    
+    @property
+    def manifest_path(self) -> str:
+        """Path of the job manifest, defaulting to a file inside transcript_dir."""
+        if self.manifest_file:
+            return self.manifest_file
+        return os.path.join(self.transcript_dir, MANIFEST_FILENAME)
+    
+    @property
+    def transcript_cache_path(self) -> str:
+        """Path of the transcript cache, defaulting to a file inside transcript_dir."""
+        if self.transcript_cache_file:
+            return self.transcript_cache_file
+        return os.path.join(self.transcript_dir, TRANSCRIPT_CACHE_FILENAME)
+    
+    @property
+    def artifact_index_path(self) -> str:
+        """Path of the artifact cache index, defaulting to a file inside transcript_dir."""
+        if self.artifact_index_file:
+            return self.artifact_index_file
+        return os.path.join(self.transcript_dir, ARTIFACT_INDEX_FILENAME)
+    
+    @property
+    def checkpoint_path(self) -> str:
+        """Directory of transcription checkpoints, defaulting to one inside transcript_dir."""
+        if self.checkpoint_dir:
+            return self.checkpoint_dir
+        return os.path.join(self.transcript_dir, CHECKPOINT_DIRNAME)
+    
+    @property
+    def store_path(self) -> str:
+        """Path of the SQLite transcript store, defaulting to a file inside transcript_dir."""
+        if self.store_file:
+            return self.store_file
+        return os.path.join(self.transcript_dir, TRANSCRIPT_STORE_FILENAME)
+    
+    @property
+    def search_index_path(self) -> str:
+        """Path of the full-text search index, defaulting to a file inside transcript_dir."""
+        if self.search_index_file:
+            return self.search_index_file
+        return os.path.join(self.transcript_dir, SEARCH_INDEX_FILENAME)
+    
+    @property
+    def prefetch_enabled(self) -> bool:
+        """True if metadata is prefetched; duration limits and scheduling need it."""
+        return (
+            self.prefetch
+            or self.min_duration is not None
+            or self.max_duration is not None
+            or self.schedule != "fifo"
+        )
+    
+    @property
+    def metrics_enabled(self) -> bool:
+        """True if any metrics export is configured."""
+        return bool(self.metrics_jsonl_file or self.metrics_prometheus_file)
+    
     def create_directories(self) -> None:
         """Create necessary output directories."""
-        for directory in [self.video_dir, self.audio_dir, self.transcript_dir]:
+        directories = [self.transcript_dir]
+        if not self.streaming:
+            # Streaming mode never writes videos or audio to disk
+            directories += [self.video_dir, self.audio_dir]
+        for directory in directories:
             os.makedirs(directory, exist_ok=True)
@@ -2,27 +2,128 @@
 
 import json
 import logging
+import os
 import subprocess
-from typing import Dict, Optional
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from .exceptions import DownloadError, MetadataError
+from .utils import extract_video_id
 
 logger = logging.getLogger(__name__)
 
+# Extractions kept for a later download_video call; URLs that are skipped
+# never come back for their info, so the oldest entries are dropped.
+MAX_PENDING_EXTRACTIONS = 64
+
+# Info dict key a download call puts its output path under, for
+# _youtube_dl_class's prepare_filename to return
+OUTPUT_PATH_KEY = "video_transcriber_output_path"
+
+# yt-dlp's per-video error lines: "ERROR: [TikTok] 7234567890: Unable to ..."
+_VIDEO_ERROR = re.compile(r"^ERROR: \[[^\]]+\] ([^:\s]+): (.*)$")
+
+# (url, metadata or None, error message or None) for one URL of a bulk fetch
+VideoInfoResult = Tuple[str, Optional[Dict], Optional[str]]
+
+
+class MediaStream:
+    """
+    Readable stream of downloaded media bytes.
+    
+    Wraps either the stdout pipe of a ``yt-dlp -o -`` process or an HTTP
+    response. ``close()`` reports whether the download as a whole succeeded.
+    """
+    
+    def __init__(
+        self,
+        source: IO[bytes],
+        process: Optional[subprocess.Popen] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the stream.
+        
+        Args:
+            source: File object the media bytes are read from
+            process: yt-dlp process writing to ``source``, if any
+            timeout: Seconds to wait for the process to exit on close
+        """
+        self.source = source
+        self.process = process
+        self.timeout = timeout
+        # Bytes handed out by read(); reads straight from os_pipe are not counted
+        self.bytes_read = 0
+    
+    @property
+    def os_pipe(self) -> Optional[IO[bytes]]:
+        """The underlying OS pipe, if the bytes come straight from a process."""
+        return self.source if self.process is not None else None
+    
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes of media."""
+        chunk = self.source.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+    
+    def close(self) -> None:
+        """
+        Close the stream and check that the download completed.
+        
+        Raises:
+            DownloadError: If the download process failed or timed out
+        """
+        self.source.close()
+        if self.process is None:
+            return
+        try:
+            returncode = self.process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            raise DownloadError(f"Download timed out after {self.timeout:.0f} seconds")
+        stderr = self.process.stderr.read() if self.process.stderr else b""
+        if self.process.stderr:
+            self.process.stderr.close()
+        if returncode != 0:
+            error_msg = stderr.decode("utf-8", errors="replace") or "Unknown error"
+            raise DownloadError(f"Download failed: {error_msg}")
+    
+    def kill(self) -> None:
+        """Abort the download without checking its result."""
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            # Reap the process so it does not linger as a zombie
+            self.process.wait()
+            if self.process.stderr:
+                self.process.stderr.close()
+        self.source.close()
+
 
 class VideoDownloader:
     """Handles video downloading and metadata fetching."""
     
-    def __init__(self, download_timeout: int = 120, metadata_timeout: int = 60):
+    def __init__(
+        self,
+        download_timeout: int = 120,
+        metadata_timeout: int = 60,
+        ytdlp_path: str = "yt-dlp",
+    ):
         """
         Initialize the video downloader.
         
         Args:
             download_timeout: Timeout for video downloads in seconds
             metadata_timeout: Timeout for metadata fetching in seconds
+            ytdlp_path: yt-dlp executable to run
         """
         self.download_timeout = download_timeout
         self.metadata_timeout = metadata_timeout
+        self.ytdlp_path = ytdlp_path
     
     def get_video_info(self, url: str) -> Dict:
         """
@@ -40,7 +141,7 @@ class VideoDownloader:
         logger.info(f"Fetching metadata for {url}")
         try:
             result = subprocess.run(
-                ["yt-dlp", "--dump-json", "--no-download", url],
+                [self.ytdlp_path, "--dump-json", "--no-download", url],
                 capture_output=True,
                 text=True,
                 timeout=self.metadata_timeout
@@ -62,39 +163,394 @@ class VideoDownloader:
             logger.warning(f"Unexpected error fetching metadata: {e}")
             return {}
     
-    def download_video(self, url: str, output_path: str) -> None:
+    def iter_video_info(self, urls: Sequence[str]) -> Iterator[VideoInfoResult]:
+        """
+        Fetch metadata for many URLs with a single yt-dlp process.
+        
+        The URLs are passed on ``--batch-file -`` and the JSON lines yt-dlp
+        prints are parsed as they arrive. Each result is matched to its URL
+        through ``original_url``, or failing that the video ID, so results
+        come out right even though failed URLs print nothing on stdout.
+        The process is killed if it prints nothing for ``metadata_timeout``
+        seconds; URLs it had not reached by then are left out.
+        
+        Args:
+            urls: Video URLs
+            
+        Yields:
+            Tuples of (url, metadata, None) for URLs that resolved and
+            (url, None, error message) for URLs yt-dlp failed on
+        """
+        if not urls:
+            return
+        logger.info(f"Fetching metadata for {len(urls)} URLs in one yt-dlp call")
+        try:
+            process = subprocess.Popen(
+                [
+                    self.ytdlp_path, "--dump-json", "--no-download", "--ignore-errors",
+                    "--batch-file", "-",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except OSError as e:
+            logger.warning(f"Could not start yt-dlp: {e}")
+            return
+        stdin, stdout, stderr = process.stdin, process.stdout, process.stderr
+        assert stdin is not None and stdout is not None and stderr is not None
+        
+        pending = dict.fromkeys(urls)
+        by_id: Dict[str, str] = {}
+        for url in urls:
+            video_key = extract_video_id(url)
+            if video_key:
+                by_id.setdefault(video_key.split(":", 1)[1], url)
+        error_lines: List[str] = []
+        last_output = [time.monotonic()]
+        timed_out = threading.Event()
+        
+        def feed() -> None:
+            try:
+                stdin.write("".join(f"{url}\n" for url in urls))
+                stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        
+        def collect_errors() -> None:
+            for line in stderr:
+                last_output[0] = time.monotonic()
+                if line.startswith("ERROR:"):
+                    error_lines.append(line.strip())
+        
+        def watchdog() -> None:
+            while process.poll() is None:
+                if time.monotonic() - last_output[0] > self.metadata_timeout:
+                    timed_out.set()
+                    process.kill()
+                    return
+                time.sleep(min(1.0, self.metadata_timeout / 4))
+        
+        helpers = [threading.Thread(target=target, daemon=True)
+                   for target in (feed, collect_errors, watchdog)]
+        for thread in helpers:
+            thread.start()
+        try:
+            for line in stdout:
+                last_output[0] = time.monotonic()
+                if not line.strip():
+                    continue
+                try:
+                    info = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Failed to parse metadata JSON: {e}")
+                    continue
+                matched = self._match_info(info, pending, by_id)
+                if matched is None:
+                    logger.debug(f"Metadata for {info.get('webpage_url')} matches no URL")
+                    continue
+                del pending[matched]
+                yield matched, info, None
+            process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            for thread in helpers:
+                thread.join(timeout=1)
+        
+        if timed_out.is_set():
+            logger.warning(
+                f"yt-dlp stalled for {self.metadata_timeout}s; "
+                f"{len(pending)} URLs left without metadata"
+            )
+            return
+        # Whatever is still pending was attempted and failed
+        unmatched = []
+        for line in error_lines:
+            match = _VIDEO_ERROR.match(line)
+            failed = by_id.get(match.group(1)) if match else None
+            if match and failed is not None and failed in pending:
+                del pending[failed]
+                yield failed, None, match.group(2)
+            else:
+                unmatched.append(line)
+        if len(unmatched) == len(pending):
+            # yt-dlp works through the URLs in order, so the errors line up
+            for url, line in zip(list(pending), unmatched):
+                yield url, None, line
+        else:
+            for url in pending:
+                yield url, None, "yt-dlp returned no metadata"
+    
+    @staticmethod
+    def _match_info(
+        info: Dict, pending: Dict[str, None], by_id: Dict[str, str]
+    ) -> Optional[str]:
+        """Find which requested URL a metadata result belongs to."""
+        for field in ("original_url", "webpage_url"):
+            if info.get(field) in pending:
+                return info[field]
+        video_key = extract_video_id(info.get("webpage_url") or "")
+        video_id = video_key.split(":", 1)[1] if video_key else str(info.get("id", ""))
+        url = by_id.get(video_id)
+        return url if url in pending else None
+    
+    def download_video(
+        self, url: str, output_path: str, timeout: Optional[float] = None
+    ) -> None:
         """
         Download video using yt-dlp.
         
         Args:
             url: Video URL
             output_path: Path where video should be saved
-            
+            timeout: Timeout in seconds for this download (default:
+                ``download_timeout``)
+                
         Raises:
             DownloadError: If download fails
         """
         logger.info(f"Downloading video to {output_path}")
+        timeout = timeout or self.download_timeout
         try:
             result = subprocess.run(
-                ["yt-dlp", "-o", output_path, "-f", "mp4", url],
+                [self.ytdlp_path, "-o", output_path, "-f", "mp4", url],
                 capture_output=True,
                 text=True,
-                timeout=self.download_timeout
+                timeout=timeout
             )
             if result.returncode != 0:
                 error_msg = result.stderr or "Unknown error"
                 raise DownloadError(f"Download failed: {error_msg}")
             
             # Verify file exists
-            import os
             if not os.path.exists(output_path):
                 raise DownloadError(f"Downloaded file not found at {output_path}")
             
             logger.info("Video downloaded successfully")
             
         except subprocess.TimeoutExpired:
-            raise DownloadError(f"Download timed out after {self.download_timeout} seconds")
+            raise DownloadError(f"Download timed out after {timeout:.0f} seconds")
         except Exception as e:
             if isinstance(e, DownloadError):
                 raise
             raise DownloadError(f"Unexpected error during download: {e}")
+    
+    def open_stream(self, url: str, timeout: Optional[float] = None) -> MediaStream:
+        """
+        Start downloading a video to a pipe instead of a file.
+        
+        Args:
+            url: Video URL
+            timeout: Seconds the download may take in all (default:
+                ``download_timeout``)
+                
+        Returns:
+            MediaStream yielding the video bytes
+            
+        Raises:
+            DownloadError: If yt-dlp cannot be started
+        """
+        logger.info(f"Streaming video from {url}")
+        try:
+            process = subprocess.Popen(
+                [self.ytdlp_path, "-o", "-", "-f", "mp4", "--quiet", "--no-warnings", url],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise DownloadError(f"Could not start yt-dlp: {e}")
+        assert process.stdout is not None
+        return MediaStream(process.stdout, process, timeout=timeout or self.download_timeout)
+
+
+@lru_cache(maxsize=None)
+def _youtube_dl_class() -> Any:
+    """
+    Return a YoutubeDL subclass that saves each download where its call asks.
+    
+    The output path travels in the info dict under OUTPUT_PATH_KEY, so one
+    long-lived instance can download to a different file per call without
+    its ``outtmpl`` option being changed.
+    """
+    import yt_dlp
+    
+    class YoutubeDL(yt_dlp.YoutubeDL):
+        def prepare_filename(self, info_dict: Dict, *args: Any, **kwargs: Any) -> str:
+            output_path = info_dict.get(OUTPUT_PATH_KEY)
+            if output_path is not None:
+                return str(output_path)
+            return str(super().prepare_filename(info_dict, *args, **kwargs))
+    
+    return YoutubeDL
+
+
+class LibraryDownloader(VideoDownloader):
+    """
+    Video downloader that drives the yt-dlp library in-process.
+    
+    Each worker thread keeps one long-lived ``YoutubeDL`` instance, so the
+    extractors and HTTP session are set up once instead of once per
+    subprocess. The info dict extracted by ``get_video_info`` is kept until
+    ``download_video`` is called for the same URL, which then downloads the
+    already-resolved format without fetching the page a second time.
+    
+    The library has no overall deadline for a call, so the timeouts are
+    applied as yt-dlp's socket timeout instead.
+    """
+    
+    def __init__(
+        self,
+        download_timeout: int = 120,
+        metadata_timeout: int = 60,
+        ytdlp_path: str = "yt-dlp",
+    ):
+        """
+        Initialize the library downloader.
+        
+        Args:
+            download_timeout: Socket timeout for video downloads in seconds
+            metadata_timeout: Socket timeout for metadata fetching in seconds
+            ytdlp_path: yt-dlp executable for the subprocess streaming fallback
+        """
+        super().__init__(download_timeout, metadata_timeout, ytdlp_path)
+        self._local = threading.local()
+        self._info_lock = threading.Lock()
+        self._pending_info: "OrderedDict[str, Dict]" = OrderedDict()
+    
+    def _get_ydl(self) -> Any:
+        """Return this thread's YoutubeDL instance, creating it on first use."""
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = _youtube_dl_class()({
+                "format": "mp4",
+                "quiet": True,
+                "no_warnings": True,
+                "noprogress": True,
+                "socket_timeout": max(self.metadata_timeout, self.download_timeout),
+            })
+            self._local.ydl = ydl
+        return ydl
+    
+    def get_video_info(self, url: str) -> Dict:
+        """
+        Fetch video metadata with an in-process extraction.
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Dictionary containing video metadata, or an empty dict on failure
+        """
+        logger.info(f"Fetching metadata for {url}")
+        try:
+            info = self._get_ydl().extract_info(url, download=False)
+        except Exception as e:
+            logger.warning(f"Unexpected error fetching metadata: {e}")
+            return {}
+        if not info:
+            return {}
+        
+        with self._info_lock:
+            self._pending_info[url] = info
+            while len(self._pending_info) > MAX_PENDING_EXTRACTIONS:
+                self._pending_info.popitem(last=False)
+        logger.debug(f"Successfully fetched metadata: {info.get('title', 'Unknown')}")
+        return info
+    
+    def iter_video_info(self, urls: Sequence[str]) -> Iterator[VideoInfoResult]:
+        """
+        Fetch metadata for many URLs in-process, one extraction after another.
+        
+        Unlike ``get_video_info`` the results are not kept for a later
+        download, since a bulk prefetch runs long before the downloads.
+        
+        Args:
+            urls: Video URLs
+            
+        Yields:
+            Tuples of (url, metadata, None) or (url, None, error message)
+        """
+        ydl = self._get_ydl()
+        for url in urls:
+            try:
+                info = ydl.extract_info(url, download=False)
+            except Exception as e:
+                yield url, None, str(e)
+                continue
+            if info:
+                yield url, ydl.sanitize_info(info), None
+            else:
+                yield url, None, "yt-dlp returned no metadata"
+    
+    def download_video(
+        self, url: str, output_path: str, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Download video, reusing the extraction from get_video_info if there was one.
+        
+        Args:
+            url: Video URL
+            output_path: Path where video should be saved
+            timeout: Ignored; the library only has a socket timeout, not a
+                deadline for the whole download
+                
+        Raises:
+            DownloadError: If download fails
+        """
+        logger.info(f"Downloading video to {output_path}")
+        with self._info_lock:
+            info = self._pending_info.pop(url, None)
+        
+        ydl = self._get_ydl()
+        try:
+            if info is not None:
+                ydl.process_info({**info, OUTPUT_PATH_KEY: output_path})
+            else:
+                ydl.extract_info(url, download=True, extra_info={OUTPUT_PATH_KEY: output_path})
+        except Exception as e:
+            raise DownloadError(f"Download failed: {e}")
+        
+        if not os.path.exists(output_path):
+            raise DownloadError(f"Downloaded file not found at {output_path}")
+        
+        logger.info("Video downloaded successfully")
+    
+    def open_stream(self, url: str, timeout: Optional[float] = None) -> MediaStream:
+        """
+        Stream a video over this thread's yt-dlp HTTP session.
+        
+        Uses the media URL from an earlier get_video_info extraction when it
+        is a plain HTTP download; anything else (fragmented formats, no prior
+        extraction) falls back to a ``yt-dlp -o -`` subprocess.
+        
+        Args:
+            url: Video URL
+            timeout: Seconds the subprocess fallback may take (default:
+                ``download_timeout``)
+                
+        Returns:
+            MediaStream yielding the video bytes
+            
+        Raises:
+            DownloadError: If the stream cannot be opened
+        """
+        with self._info_lock:
+            info = self._pending_info.pop(url, None)
+        if not info or info.get("protocol") not in ("http", "https") or not info.get("url"):
+            return super().open_stream(url, timeout)
+        
+        logger.info(f"Streaming video from {url}")
+        from yt_dlp.networking import Request
+        
+        try:
+            response = self._get_ydl().urlopen(
+                Request(info["url"], headers=info.get("http_headers") or {})
+            )
+        except Exception as e:
+            raise DownloadError(f"Download failed: {e}")
+        return MediaStream(response)
@@ -0,0 +1,320 @@
+"""Inference engines that run a Whisper model, with a common result schema."""
+
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Type, TypedDict, Union
+
+from .exceptions import ModelLoadError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENGINE = "whisper"
+
+
+class Segment(TypedDict, total=False):
+    """One timed stretch of a transcript, with Whisper's per-segment scores."""
+    
+    start: float
+    end: float
+    text: str
+    # Start of the 30-second window (in mel frames) the segment was decoded in
+    seek: int
+    temperature: float
+    avg_logprob: float
+    compression_ratio: float
+    no_speech_prob: float
+    # Word timings, when the model was asked for ``word_timestamps``
+    words: List[Dict[str, Any]]
+
+
+class TranscriptionResult(TypedDict):
+    """What every engine returns, in the shape of openai-whisper's result."""
+    
+    text: str
+    segments: List[Segment]
+    language: Optional[str]
+    # Duration-weighted mean token probability over the segments, 0 to 1
+    confidence: Optional[float]
+
+
+def result_confidence(segments: List[Segment]) -> Optional[float]:
+    """
+    Summarize how sure the model was of a transcript.
+    
+    Args:
+        segments: Segments with ``avg_logprob`` scores
+        
+    Returns:
+        Mean of ``exp(avg_logprob)`` weighted by segment duration, or None
+        if no segment has a score
+    """
+    total = 0.0
+    weight = 0.0
+    for segment in segments:
+        if "avg_logprob" not in segment:
+            continue
+        duration = max(segment.get("end", 0.0) - segment.get("start", 0.0), 1e-3)
+        total += math.exp(segment["avg_logprob"]) * duration
+        weight += duration
+    return total / weight if weight else None
+
+
+def to_result(raw: Dict[str, Any]) -> TranscriptionResult:
+    """
+    Normalize a raw ``model.transcribe`` result into a TranscriptionResult.
+    
+    Extra keys are kept, so callers that read Whisper-specific fields
+    still find them.
+    
+    Args:
+        raw: Result dictionary of an openai-whisper style ``transcribe``
+        
+    Returns:
+        The same dictionary with every schema key present
+    """
+    segments = raw.get("segments") or []
+    raw["text"] = raw.get("text") or ""
+    raw["segments"] = segments
+    raw.setdefault("language", None)
+    raw["confidence"] = result_confidence(segments)
+    return raw  # type: ignore[return-value]
+
+
+class InferenceEngine(ABC):
+    """
+    Loads a Whisper model with one backend and transcribes with it.
+    
+    Engines stand in for the model wherever one is expected: they have
+    the model's ``transcribe`` method, returning a TranscriptionResult.
+    Engines built on an openai-whisper model expose it as
+    ``whisper_model``, which batched decoding and metrics hooks use.
+    """
+    
+    name = ""
+    
+    def __init__(self, model_name: str):
+        """
+        Load the model.
+        
+        Args:
+            model_name: Whisper model size, e.g. "base"
+        """
+        self.model_name = model_name
+        self.model = self._load()
+    
+    @property
+    def whisper_model(self) -> Optional[Any]:
+        """The underlying openai-whisper model, if the engine has one."""
+        return None
+    
+    @abstractmethod
+    def transcribe(self, audio: Union[str, Any], **options: Any) -> TranscriptionResult:
+        """
+        Transcribe one clip.
+        
+        Args:
+            audio: Path to audio file, or an array of 16 kHz mono samples
+            **options: openai-whisper ``transcribe`` options
+            
+        Returns:
+            The transcription result
+        """
+    
+    @abstractmethod
+    def _load(self) -> Any:
+        """Load and return the backend's model."""
+
+
+class WhisperEngine(InferenceEngine):
+    """openai-whisper in PyTorch, fp32 on CPU or fp16 on GPU."""
+    
+    name = "whisper"
+    
+    @property
+    def whisper_model(self) -> Any:
+        """The loaded openai-whisper model."""
+        return self.model
+    
+    def transcribe(self, audio: Union[str, Any], **options: Any) -> TranscriptionResult:
+        """Transcribe one clip with ``model.transcribe``."""
+        return to_result(self.model.transcribe(audio, **options))
+    
+    def _load(self) -> Any:
+        """Load the model onto the default device."""
+        import whisper
+        
+        return whisper.load_model(self.model_name)
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """
+    openai-whisper on CPU with int8 weights for every linear layer.
+    
+    The attention and MLP projections, which hold most of the weights and
+    FLOPs, are converted with PyTorch dynamic quantization: weights are
+    stored as int8 and activations are quantized on the fly. The
+    convolutional front end and the embeddings stay fp32.
+    """
+    
+    name = "whisper-int8"
+    
+    def transcribe(self, audio: Union[str, Any], **options: Any) -> TranscriptionResult:
+        """Transcribe one clip; quantized kernels only run in fp32 on CPU."""
+        return super().transcribe(audio, **{**options, "fp16": False})
+    
+    def _load(self) -> Any:
+        """Load the model on CPU and quantize its linear layers."""
+        import torch
+        import whisper
+        
+        model = whisper.load_model(self.model_name, device="cpu")
+        # Whisper subclasses nn.Linear, which quantize_dynamic does not match
+        _to_plain_linear(model)
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info(f"Quantized the linear layers of {self.model_name} to int8")
+        return quantized
+
+
+def _to_plain_linear(module: Any) -> None:
+    """Replace subclasses of ``nn.Linear`` below ``module`` with plain ``nn.Linear`` layers."""
+    import torch
+    
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            plain = torch.nn.Linear(
+                child.in_features, child.out_features, bias=child.bias is not None
+            )
+            plain.load_state_dict(child.state_dict())
+            setattr(module, name, plain)
+        else:
+            _to_plain_linear(child)
+
+
+ENGINES: Dict[str, Type[InferenceEngine]] = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+}
+
+
+def load_engine(model_name: str, engine: str = DEFAULT_ENGINE) -> InferenceEngine:
+    """
+    Load a Whisper model with the given engine.
+    
+    Args:
+        model_name: Whisper model size, e.g. "base"
+        engine: Engine name, one of ``ENGINES``
+        
+    Returns:
+        The loaded engine
+        
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine: {engine}")
+    return ENGINES[engine](model_name)
+
+
+class BackgroundEngine(InferenceEngine):
+    """
+    An engine whose model is loaded on a background thread.
+    
+    Importing torch and loading the weights take seconds, during which
+    the first metadata fetches, downloads and extractions can already
+    run. The engine can be handed to an AudioTranscriber straight away;
+    the first call that needs the model waits for it to be ready.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        engine: str = DEFAULT_ENGINE,
+        prepare: Optional[Callable[[InferenceEngine], Any]] = None,
+    ):
+        """
+        Start loading the model.
+        
+        Args:
+            model_name: Whisper model size, e.g. "base"
+            engine: Engine name, one of ``ENGINES``
+            prepare: Called with the loaded engine on the loading thread,
+                e.g. to install metrics hooks
+                
+        Raises:
+            ValueError: If the engine name is unknown
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown inference engine: {engine}")
+        self.model_name = model_name
+        self.name = engine
+        self.prepare = prepare
+        self._engine: Optional[InferenceEngine] = None
+        self._error: Optional[Exception] = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._load_engine, name="model-loader", daemon=True)
+        self._thread.start()
+    
+    @property
+    def model(self) -> Any:
+        """The backend's model, once loaded."""
+        return self._load()
+    
+    @property
+    def whisper_model(self) -> Optional[Any]:
+        """The underlying openai-whisper model, once loaded."""
+        return self.wait().whisper_model
+    
+    def transcribe(self, audio: Union[str, Any], **options: Any) -> TranscriptionResult:
+        """Transcribe one clip, waiting for the model first if needed."""
+        return self.wait().transcribe(audio, **options)
+    
+    def check(self) -> None:
+        """
+        Raise if loading has already failed, without waiting for it to finish.
+        
+        Raises:
+            ModelLoadError: If the model could not be loaded
+        """
+        if self._error is not None:
+            raise ModelLoadError(f"Whisper model could not be loaded: {self._error}")
+    
+    def _load(self) -> Any:
+        """Return the backend's model, waiting for the loading thread to finish."""
+        return self.wait().model
+    
+    def wait(self) -> InferenceEngine:
+        """
+        Block until the model is loaded.
+        
+        Returns:
+            The loaded engine
+            
+        Raises:
+            ModelLoadError: If the model could not be loaded
+        """
+        if not self._ready.is_set():
+            logger.info("Waiting for the Whisper model to finish loading...")
+            self._ready.wait()
+        self.check()
+        return self._engine  # type: ignore[return-value]
+    
+    def _load_engine(self) -> None:
+        """Load the engine; runs on the loading thread."""
+        started = time.monotonic()
+        try:
+            engine = load_engine(self.model_name, self.name)
+            if self.prepare is not None:
+                self.prepare(engine)
+            self._engine = engine
+            logger.info(
+                f"Model loaded in {time.monotonic() - started:.1f}s "
+                f"({self.model_name}, {self.name})"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model: {e}")
+            self._error = e
+        finally:
+            self._ready.set()
@@ -16,11 +16,26 @@ class AudioExtractionError(TranscriberError):
     pass
 
 
+class UnseekableStreamError(AudioExtractionError):
+    """The media needs seeking, so it cannot be decoded from a pipe."""
+    pass
+
+
 class TranscriptionError(TranscriberError):
     """Error during audio transcription."""
     pass
 
 
+class ModelLoadError(TranscriptionError):
+    """The Whisper model could not be loaded, so no job can be transcribed."""
+    pass
+
+
 class MetadataError(TranscriberError):
     """Error fetching video metadata."""
     pass
+
+
+class ServerError(TranscriberError):
+    """Error talking to a transcription server."""
+    pass
@@ -0,0 +1,231 @@
+"""Streaming URL ingestion: read large URL lists lazily and drop duplicate videos."""
+
+import glob
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from typing import Iterator, List, Optional, Sequence, Set
+
+from .config import DEFAULT_DEDUPE_MEMORY_KEYS
+from .utils import video_key
+
+logger = logging.getLogger(__name__)
+
+# Source name that reads URLs from standard input
+STDIN_SOURCE = "-"
+
+# Keys flushed to the spill file per statement
+_SPILL_BATCH = 10_000
+
+
+class SeenKeys:
+    """
+    Set of strings that spills to a temporary SQLite file once it outgrows memory.
+    
+    Keys are kept as 16-byte BLAKE2 digests, so memory use does not depend
+    on URL length. Up to ``max_memory_keys`` of them are held in a Python
+    set; when it fills up they are moved to an indexed table on disk and
+    the set starts again, so memory stays bounded however long the input
+    is. Membership is exact up to digest collisions, which are negligible
+    at 128 bits.
+    """
+    
+    def __init__(
+        self,
+        max_memory_keys: int = DEFAULT_DEDUPE_MEMORY_KEYS,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initialize an empty set.
+        
+        Args:
+            max_memory_keys: Keys held in memory before spilling to disk
+            spill_dir: Directory for the spill file (default: the system temp dir)
+        """
+        self.max_memory_keys = max(1, max_memory_keys)
+        self.spill_dir = spill_dir
+        self._memory: Set[bytes] = set()
+        self._spilled = 0
+        self._spill_path: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def __len__(self) -> int:
+        """Return the number of distinct keys added."""
+        return len(self._memory) + self._spilled
+    
+    def add(self, key: str) -> bool:
+        """
+        Add a key.
+        
+        Args:
+            key: Key to add
+            
+        Returns:
+            True if the key was new, False if it had been added before
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        if digest in self._memory:
+            return False
+        if self._conn is not None and self._conn.execute(
+            "SELECT 1 FROM seen WHERE key = ?", (digest,)
+        ).fetchone():
+            return False
+        self._memory.add(digest)
+        if len(self._memory) >= self.max_memory_keys:
+            self._spill()
+        return True
+    
+    def close(self) -> None:
+        """Delete the spill file, if any."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._spill_path is not None:
+            try:
+                os.remove(self._spill_path)
+            except OSError as e:
+                logger.warning(f"Could not remove {self._spill_path}: {e}")
+            self._spill_path = None
+        self._memory = set()
+        self._spilled = 0
+    
+    def _spill(self) -> None:
+        """Move the in-memory keys to the spill file."""
+        if self._conn is None:
+            fd, self._spill_path = tempfile.mkstemp(
+                prefix="urls-seen-", suffix=".sqlite", dir=self.spill_dir
+            )
+            os.close(fd)
+            self._conn = sqlite3.connect(self._spill_path)
+            # The file is thrown away at the end, so durability buys nothing
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("CREATE TABLE seen (key BLOB PRIMARY KEY) WITHOUT ROWID")
+            logger.debug(f"Spilling seen URLs to {self._spill_path}")
+        keys = list(self._memory)
+        with self._conn:
+            for i in range(0, len(keys), _SPILL_BATCH):
+                self._conn.executemany(
+                    "INSERT INTO seen VALUES (?)", ((key,) for key in keys[i:i + _SPILL_BATCH])
+                )
+        self._spilled += len(keys)
+        self._memory = set()
+
+
+class UrlIngest:
+    """
+    Lazily reads URLs from files, globs of files and stdin, one video once.
+    
+    Lines are read one at a time, so a list of millions of URLs is never
+    held in memory. Blank lines and ``#`` comments are skipped. URLs are
+    keyed by their canonical video ID (see ``utils.extract_video_id``), so
+    ``/@user/video/ID`` links, mobile and embed URLs and copies with
+    tracking query strings all count as one video; only the first URL seen
+    for a video is yielded. Short links (vm.tiktok.com) can't be resolved
+    offline and are keyed by their own code.
+    
+    Iterating again reads the sources again from the start.
+    """
+    
+    def __init__(
+        self,
+        sources: Sequence[str],
+        dedupe: bool = True,
+        max_memory_keys: int = DEFAULT_DEDUPE_MEMORY_KEYS,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the ingestion.
+        
+        Args:
+            sources: Files, glob patterns, or "-" for stdin
+            dedupe: Drop URLs of videos already yielded
+            max_memory_keys: Distinct videos remembered in memory before
+                spilling to disk
+            spill_dir: Directory for the dedupe spill file
+            
+        Raises:
+            FileNotFoundError: If a source does not exist or a glob matches nothing
+        """
+        self.paths = resolve_sources(sources)
+        self.dedupe = dedupe
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self.read = 0
+        self.duplicates = 0
+    
+    def __iter__(self) -> Iterator[str]:
+        """Yield the URLs of all sources in order, skipping duplicates."""
+        self.read = 0
+        self.duplicates = 0
+        seen = SeenKeys(self.max_memory_keys, self.spill_dir) if self.dedupe else None
+        try:
+            for url in iter_urls(self.paths):
+                self.read += 1
+                if seen is not None and not seen.add(video_key(url)):
+                    self.duplicates += 1
+                    continue
+                yield url
+        finally:
+            if seen is not None:
+                seen.close()
+            logger.info(
+                f"Read {self.read} URLs from {len(self.paths)} sources "
+                f"({self.duplicates} duplicates dropped)"
+            )
+
+
+def resolve_sources(sources: Sequence[str]) -> List[str]:
+    """
+    Expand glob patterns into the files they match.
+    
+    Args:
+        sources: Files, glob patterns, or "-" for stdin
+        
+    Returns:
+        Paths (and "-") in the given order; each glob's matches are sorted
+        
+    Raises:
+        FileNotFoundError: If a source does not exist or a glob matches nothing
+    """
+    paths = []
+    for source in sources:
+        if source == STDIN_SOURCE or os.path.exists(source):
+            paths.append(source)
+            continue
+        is_pattern = any(char in source for char in "*?[")
+        matches = sorted(glob.glob(source, recursive=True)) if is_pattern else []
+        if not matches:
+            raise FileNotFoundError(f"{source} not found")
+        paths.extend(matches)
+    return paths
+
+
+def iter_urls(paths: Sequence[str]) -> Iterator[str]:
+    """
+    Yield the URLs in files (or stdin, as "-"), skipping blank lines and comments.
+    
+    Args:
+        paths: Files to read, in order
+        
+    Yields:
+        One stripped URL per line
+    """
+    for path in paths:
+        if path == STDIN_SOURCE:
+            yield from _iter_lines(sys.stdin)
+            continue
+        logger.debug(f"Reading URLs from {path}")
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            yield from _iter_lines(f)
+
+
+def _iter_lines(lines: Iterator[str]) -> Iterator[str]:
+    """Yield the non-blank, non-comment lines, stripped."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
@@ -0,0 +1,264 @@
+"""Parallel transcription of long audio, split into chunks at pauses."""
+
+import contextvars
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Sequence
+
+from .audio import SAMPLE_RATE
+from .engines import TranscriptionResult, to_result
+from .exceptions import TranscriptionError
+from .transcriber import AudioTranscriber
+from .vad import EnergyVAD
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# How far either side of the target chunk length to look for a pause
+SEARCH_SECONDS = 5.0
+# Energy is averaged over this long when looking for the quietest point, so
+# a cut lands in a pause rather than in a short dip between two syllables
+PAUSE_SECONDS = 0.3
+# Pauses within this many dB of the quietest one count as equally good cuts
+QUIET_TOLERANCE_DB = 3.0
+# Audio each chunk shares with its neighbours, so a word cut at a boundary
+# is heard whole by at least one of them
+DEFAULT_OVERLAP_SECONDS = 1.0
+
+
+@dataclass
+class AudioChunk:
+    """A piece of long audio, in samples of the original clip."""
+    
+    # Audio sent to the model, including the overlap with its neighbours
+    start: int
+    end: int
+    # Segments whose midpoint falls in [keep_start, keep_end) are kept
+    keep_start: int
+    keep_end: int
+
+
+def find_split_points(
+    samples: "np.ndarray",
+    chunk_seconds: float,
+    search_seconds: float = SEARCH_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+) -> List[int]:
+    """
+    Choose where to cut audio into chunks of roughly equal length.
+    
+    Each cut is placed at the quietest point within ``search_seconds`` of
+    the target chunk length, measured from the previous cut, preferring
+    the pause nearest the target among similarly quiet ones. Audio no
+    longer than one chunk plus the search window is not cut.
+    
+    Args:
+        samples: 16 kHz mono samples
+        chunk_seconds: Target chunk length
+        search_seconds: How far from the target to look for a pause
+        sample_rate: Sample rate of the audio
+        
+    Returns:
+        Cut positions in samples, in increasing order
+    """
+    import numpy as np
+    
+    vad = EnergyVAD(frame_ms=20, sample_rate=sample_rate)
+    frame_len = sample_rate * vad.frame_ms // 1000
+    energy = vad.frame_energy(samples)
+    window = max(1, int(PAUSE_SECONDS * sample_rate / frame_len))
+    smoothed = np.convolve(energy, np.ones(window) / window, mode="same")
+    
+    target = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    cuts: List[int] = []
+    position = 0
+    while len(samples) - position > target + search:
+        # Look no earlier than the frame after the previous cut, so every cut
+        # moves forward even when the target is shorter than the search window
+        low = max(position // frame_len + 1, (position + target - search) // frame_len)
+        high = min((position + target + search) // frame_len, len(smoothed))
+        window_energy = smoothed[low:high]
+        # Of the pauses about as quiet as the quietest, take the one nearest the target
+        quiet = np.flatnonzero(window_energy <= window_energy.min() + QUIET_TOLERANCE_DB) + low
+        target_frame = (position + target) // frame_len
+        quietest = int(quiet[np.argmin(np.abs(quiet - target_frame))])
+        position = quietest * frame_len + frame_len // 2
+        cuts.append(position)
+    return cuts
+
+
+def plan_chunks(length: int, cuts: Sequence[int], overlap: int) -> List[AudioChunk]:
+    """
+    Turn cut positions into overlapping chunks.
+    
+    Args:
+        length: Length of the audio in samples
+        cuts: Cut positions from ``find_split_points``
+        overlap: Samples each chunk extends past its cuts
+        
+    Returns:
+        Chunks covering the whole audio, in order
+    """
+    bounds = [0, *cuts, length]
+    return [
+        AudioChunk(
+            start=max(0, keep_start - overlap),
+            end=min(length, keep_end + overlap),
+            keep_start=keep_start,
+            keep_end=keep_end,
+        )
+        for keep_start, keep_end in zip(bounds, bounds[1:])
+    ]
+
+
+def stitch_results(
+    chunks: Sequence[AudioChunk],
+    results: Sequence[TranscriptionResult],
+    sample_rate: int = SAMPLE_RATE,
+) -> TranscriptionResult:
+    """
+    Join chunk transcripts into one, on the original clip's timeline.
+    
+    Segment (and word) times are shifted by their chunk's start. Where
+    chunks overlap, each segment is kept only by the chunk its midpoint
+    belongs to, so speech in the overlap is not transcribed twice.
+    
+    Args:
+        chunks: The chunks, in order
+        results: One transcription result per chunk
+        sample_rate: Sample rate of the audio
+        
+    Returns:
+        The combined result
+    """
+    segments = []
+    texts = []
+    languages: Counter = Counter()
+    for i, (chunk, result) in enumerate(zip(chunks, results)):
+        if result.get("language"):
+            languages[result["language"]] += 1
+        if not result["segments"]:
+            # No timing to deduplicate the overlap with; keep the text as is
+            texts.append(" " + result["text"].strip())
+            continue
+        offset = chunk.start / sample_rate
+        keep_start = chunk.keep_start / sample_rate if i > 0 else float("-inf")
+        keep_end = chunk.keep_end / sample_rate if i < len(chunks) - 1 else float("inf")
+        for segment in result["segments"]:
+            start = segment["start"] + offset
+            end = segment["end"] + offset
+            if not keep_start <= (start + end) / 2 < keep_end:
+                continue
+            segment = {**segment, "start": start, "end": end}
+            if segment.get("words"):
+                segment["words"] = [
+                    {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                    for word in segment["words"]
+                ]
+            segments.append(segment)
+            texts.append(segment["text"])
+    
+    return to_result({
+        "text": "".join(texts).strip(),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else None,
+    })
+
+
+class LongAudioTranscriber:
+    """
+    Transcribes long clips as overlapping chunks, several at a time.
+    
+    ``model.transcribe`` walks a clip's 30-second windows strictly in
+    order, so one long video keeps a single model busy for as long as it
+    plays. Splitting it at pauses lets the chunks run on several models at
+    once, e.g. the workers of a TranscriptionPool. With a single in-process
+    model the chunks still run one at a time.
+    """
+    
+    def __init__(
+        self,
+        transcriber: AudioTranscriber,
+        chunk_seconds: float,
+        workers: int = 1,
+        overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    ):
+        """
+        Initialize the long-audio transcriber.
+        
+        Args:
+            transcriber: Transcriber each chunk is sent to
+            chunk_seconds: Target chunk length
+            workers: Chunks transcribed at the same time
+            overlap_seconds: Audio shared between neighbouring chunks
+        """
+        self.transcriber = transcriber
+        self.chunk_seconds = chunk_seconds
+        self.workers = max(1, workers)
+        self.overlap_seconds = overlap_seconds
+    
+    def should_split(self, seconds: float) -> bool:
+        """Return True if a clip of this length would be cut into several chunks."""
+        return seconds > self.chunk_seconds + SEARCH_SECONDS
+    
+    def transcribe(self, samples: "np.ndarray") -> str:
+        """
+        Transcribe long audio in parallel chunks.
+        
+        Args:
+            samples: 16 kHz mono float32 samples
+            
+        Returns:
+            Transcribed text
+            
+        Raises:
+            TranscriptionError: If a chunk fails, or no chunk contained speech
+        """
+        return self.transcribe_result(samples)["text"]
+    
+    def transcribe_result(self, samples: "np.ndarray") -> TranscriptionResult:
+        """
+        Transcribe long audio in parallel chunks and return the stitched result.
+        
+        Args:
+            samples: 16 kHz mono float32 samples
+            
+        Returns:
+            The combined result, with times on the original audio
+            
+        Raises:
+            TranscriptionError: If a chunk fails, or no chunk contained speech
+        """
+        cuts = find_split_points(samples, self.chunk_seconds)
+        chunks = plan_chunks(len(samples), cuts, int(self.overlap_seconds * SAMPLE_RATE))
+        logger.info(
+            f"Transcribing {len(samples) / SAMPLE_RATE:.0f}s of audio as {len(chunks)} chunks "
+            f"on {min(self.workers, len(chunks))} workers"
+        )
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chunk") as executor:
+            # Each chunk runs in a copy of this thread's context, so its stage
+            # timings are still attributed to the job being processed
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._transcribe_chunk,
+                    samples[chunk.start:chunk.end],
+                )
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+        
+        result = stitch_results(chunks, results)
+        if not result["text"]:
+            raise TranscriptionError("Transcription returned empty text")
+        return result
+    
+    def _transcribe_chunk(self, samples: "np.ndarray") -> TranscriptionResult:
+        """Transcribe one chunk; a chunk without speech gives an empty result."""
+        return self.transcriber.transcribe_result(samples, allow_empty=True)
@@ -0,0 +1,168 @@
+"""Persistent record of job state so reruns can skip finished URLs offline."""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_STARTED = "started"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    video_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    base_name TEXT,
+    video_path TEXT,
+    audio_path TEXT,
+    transcript_path TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+)
+"""
+
+
+class JobManifest:
+    """
+    SQLite-backed manifest of processed jobs.
+    
+    Jobs are keyed by the canonical video ID parsed from the URL (see
+    ``utils.extract_video_id``), so whether a URL is already finished can be
+    answered with an index lookup instead of a metadata fetch. The manifest
+    is safe to share between pipeline worker threads.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) a manifest database.
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+        logger.debug(f"Opened job manifest at {path}")
+    
+    def get(self, video_key: str) -> Optional[Dict]:
+        """
+        Look up the recorded state for a job.
+        
+        Args:
+            video_key: Canonical video key
+            
+        Returns:
+            Dictionary of the job's columns, or None if it was never seen
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE video_key = ?", (video_key,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def is_done(self, video_key: str) -> bool:
+        """Return True if the job finished successfully on an earlier run."""
+        record = self.get(video_key)
+        return record is not None and record["state"] == STATE_DONE
+    
+    def mark_started(self, video_key: str, url: str) -> None:
+        """Record that processing of a job has begun."""
+        self._upsert(video_key, url, STATE_STARTED, attempt=True)
+    
+    def mark_done(
+        self,
+        video_key: str,
+        url: str,
+        base_name: Optional[str] = None,
+        video_path: Optional[str] = None,
+        audio_path: Optional[str] = None,
+        transcript_path: Optional[str] = None,
+    ) -> None:
+        """Record that a job finished, along with the artifacts it produced."""
+        self._upsert(
+            video_key,
+            url,
+            STATE_DONE,
+            base_name=base_name,
+            video_path=video_path,
+            audio_path=audio_path,
+            transcript_path=transcript_path,
+        )
+    
+    def mark_failed(self, video_key: str, url: str, reason: str) -> None:
+        """Record that a job failed and why."""
+        self._upsert(video_key, url, STATE_FAILED, error=reason)
+    
+    def done_jobs(self) -> List[Dict]:
+        """Return the records of all finished jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE state = ? ORDER BY updated_at", (STATE_DONE,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        return {state: count for state, count in rows}
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _upsert(
+        self,
+        video_key: str,
+        url: str,
+        state: str,
+        attempt: bool = False,
+        error: Optional[str] = None,
+        **paths: Optional[str],
+    ) -> None:
+        """Insert or update a job row, keeping artifact paths that are not given."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (
+                    video_key, url, state, base_name, video_path, audio_path,
+                    transcript_path, error, attempts, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(video_key) DO UPDATE SET
+                    url = excluded.url,
+                    state = excluded.state,
+                    base_name = COALESCE(excluded.base_name, base_name),
+                    video_path = COALESCE(excluded.video_path, video_path),
+                    audio_path = COALESCE(excluded.audio_path, audio_path),
+                    transcript_path = COALESCE(excluded.transcript_path, transcript_path),
+                    error = excluded.error,
+                    attempts = attempts + excluded.attempts,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    video_key,
+                    url,
+                    state,
+                    paths.get("base_name"),
+                    paths.get("video_path"),
+                    paths.get("audio_path"),
+                    paths.get("transcript_path"),
+                    error,
+                    1 if attempt else 0,
+                    datetime.now().isoformat(),
+                ),
+            )
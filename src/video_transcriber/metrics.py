@@ -0,0 +1,454 @@
+"""Per-stage timing and job metrics, exported as JSONL events and Prometheus text."""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds
+STAGE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = tuple(n * 1024 * 1024 for n in (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 500))
+AUDIO_BUCKETS = (5, 10, 15, 30, 60, 120, 300, 600, 1800, 3600)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5)
+
+# Whisper's default temperature schedule, used to count fallbacks per window
+DEFAULT_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+PROMETHEUS_PREFIX = "video_transcriber"
+
+
+@dataclass
+class JobMetrics:
+    """Measurements for one job, filled in as it moves through the stages."""
+    
+    url: str
+    video_key: str
+    started_at: float = field(default_factory=time.time)
+    # Seconds spent per stage, summed over repeated calls (e.g. decoder steps)
+    stages: Dict[str, float] = field(default_factory=dict)
+    bytes_downloaded: Optional[int] = None
+    audio_seconds: Optional[float] = None
+    temperature_fallbacks: int = 0
+    retries: int = 0
+    cached: bool = False
+    # Clips re-transcribed with the larger model of a cascade
+    escalations: int = 0
+    
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Add time spent in a stage."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def merge(self, other: "JobMetrics") -> None:
+        """Add the stages, fallbacks and escalations measured in another record."""
+        for stage, seconds in other.stages.items():
+            self.add_stage(stage, seconds)
+        self.temperature_fallbacks += other.temperature_fallbacks
+        self.escalations += other.escalations
+        if self.audio_seconds is None:
+            self.audio_seconds = other.audio_seconds
+    
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Transcription time divided by audio length; below 1 is faster than real time."""
+        transcribe = self.stages.get("transcribe")
+        if transcribe is None or not self.audio_seconds or self.cached:
+            return None
+        return transcribe / self.audio_seconds
+
+
+# Job that stage timings on the current thread are attributed to
+_current: ContextVar[Optional[JobMetrics]] = ContextVar("video_transcriber_job", default=None)
+
+
+def current_job() -> Optional[JobMetrics]:
+    """Return the metrics of the job being processed on this thread, if any."""
+    return _current.get()
+
+
+@contextmanager
+def bound_job(job: JobMetrics) -> Iterator[None]:
+    """Attribute stages timed on this thread to ``job`` while the block runs."""
+    token = _current.set(job)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def note_audio(samples: Any) -> None:
+    """Record the length of the current job's decoded 16 kHz audio, if not known yet."""
+    job = _current.get()
+    if job is not None and job.audio_seconds is None:
+        job.audio_seconds = len(samples) / SAMPLE_RATE
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a stage of the current job.
+    
+    Does nothing when no job is bound, i.e. when metrics are disabled.
+    
+    Args:
+        name: Stage name, e.g. "load_audio"
+    """
+    job = _current.get()
+    if job is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        job.add_stage(name, time.perf_counter() - start)
+
+
+def count_temperature_fallbacks(
+    result: Mapping[str, Any],
+    temperatures: Optional[Sequence[float]] = None,
+) -> int:
+    """
+    Count how many times Whisper retried a window at a higher temperature.
+    
+    Every segment records the temperature its 30-second window was finally
+    decoded at, so a window decoded at the third temperature was retried twice.
+    
+    Args:
+        result: Result of ``model.transcribe``
+        temperatures: The temperature schedule the model was called with
+        
+    Returns:
+        Total number of fallbacks over all windows
+    """
+    if temperatures is None or isinstance(temperatures, (int, float)):
+        temperatures = DEFAULT_TEMPERATURES if temperatures is None else (temperatures,)
+    schedule = list(temperatures)
+    window_temperatures = {
+        segment.get("seek"): segment.get("temperature", 0.0)
+        for segment in result.get("segments", [])
+    }
+    fallbacks = 0
+    for temperature in window_temperatures.values():
+        if temperature in schedule:
+            fallbacks += schedule.index(temperature)
+    return fallbacks
+
+
+def instrument_model(model: Any) -> bool:
+    """
+    Time a Whisper model's encoder and decoder forward passes as stages.
+    
+    Adds forward hooks that attribute each pass to the current job as
+    "encode" or "decode". On a GPU the hooks see when work is queued, not
+    when it finishes, so the split between the two is approximate there.
+    
+    Args:
+        model: Whisper model, or an inference engine that runs one
+        
+    Returns:
+        True if the hooks were installed, False if the model has no
+        torch encoder/decoder (e.g. a stand-in model)
+    """
+    whisper_model = getattr(model, "whisper_model", None)
+    if whisper_model is not None:
+        # An inference engine; hook the model it runs
+        model = whisper_model
+    local = threading.local()
+    installed = False
+    for name, module in (("encode", getattr(model, "encoder", None)),
+                         ("decode", getattr(model, "decoder", None))):
+        if module is None or not hasattr(module, "register_forward_hook"):
+            continue
+        
+        def pre_hook(module: Any, inputs: Any, name: str = name) -> None:
+            setattr(local, name, time.perf_counter())
+        
+        def post_hook(module: Any, inputs: Any, output: Any, name: str = name) -> None:
+            job = _current.get()
+            start = getattr(local, name, None)
+            if job is not None and start is not None:
+                job.add_stage(name, time.perf_counter() - start)
+        
+        module.register_forward_pre_hook(pre_hook)
+        module.register_forward_hook(post_hook)
+        installed = True
+    return installed
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus style."""
+    
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            buckets: Increasing bucket upper bounds; +Inf is implied
+        """
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+    
+    def prometheus_lines(self, name: str, labels: str = "") -> List[str]:
+        """Return the histogram's bucket, sum and count sample lines."""
+        lines = []
+        separator = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class MetricsRecorder:
+    """
+    Collects job metrics and exports them.
+    
+    Each finished job is written as one line to a JSONL event file and
+    folded into histograms, which are written as a Prometheus textfile
+    (e.g. for node_exporter's textfile collector) every ``interval``
+    seconds and when the recorder is closed. Safe to share between
+    pipeline worker threads.
+    """
+    
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        prometheus_path: Optional[str] = None,
+        interval: float = 30.0,
+    ):
+        """
+        Open the exports.
+        
+        Args:
+            jsonl_path: File that job events are appended to
+            prometheus_path: Textfile the histograms are written to
+            interval: Seconds between periodic exports
+        """
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self.started_at = time.time()
+        
+        self._lock = threading.Lock()
+        self._stage_seconds: Dict[str, Histogram] = {}
+        self._job_seconds = Histogram(STAGE_BUCKETS)
+        self._bytes = Histogram(BYTES_BUCKETS)
+        self._audio_seconds = Histogram(AUDIO_BUCKETS)
+        self._real_time_factor = Histogram(RTF_BUCKETS)
+        self._jobs: Dict[str, int] = {"succeeded": 0, "failed": 0, "skipped": 0}
+        self._fallbacks = 0
+        self._retries = 0
+        self._escalations = 0
+        
+        self._events = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self._stopping = threading.Event()
+        self._exporter: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start exporting periodically in a background thread."""
+        if self._exporter is not None or self.interval <= 0:
+            return
+        self._exporter = threading.Thread(target=self._export_loop, name="metrics", daemon=True)
+        self._exporter.start()
+    
+    def new_job(self, url: str, video_key: str) -> JobMetrics:
+        """Create the metrics record for a job that is about to start."""
+        return JobMetrics(url=url, video_key=video_key)
+    
+    @contextmanager
+    def measure(self, job: JobMetrics, name: str) -> Iterator[None]:
+        """
+        Time a block as a stage of ``job`` and bind the job to this thread.
+        
+        Stages timed further down (``stage()``, model hooks) while the
+        block runs are attributed to the same job.
+        """
+        token = _current.set(job)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            job.add_stage(name, time.perf_counter() - start)
+            _current.reset(token)
+    
+    def finish_job(self, job: JobMetrics, success: bool, error: Optional[str] = None) -> None:
+        """
+        Record a finished job in the histograms and the event stream.
+        
+        Args:
+            job: The job's metrics
+            success: Whether the job succeeded
+            error: Failure message, if it failed
+        """
+        elapsed = time.time() - job.started_at
+        rtf = job.real_time_factor
+        with self._lock:
+            self._jobs["succeeded" if success else "failed"] += 1
+            self._fallbacks += job.temperature_fallbacks
+            self._retries += job.retries
+            self._escalations += job.escalations
+            self._job_seconds.observe(elapsed)
+            for name, seconds in job.stages.items():
+                self._stage_histogram(name).observe(seconds)
+            if job.bytes_downloaded is not None:
+                self._bytes.observe(job.bytes_downloaded)
+            if job.audio_seconds is not None:
+                self._audio_seconds.observe(job.audio_seconds)
+            if rtf is not None:
+                self._real_time_factor.observe(rtf)
+            event = {
+                "event": "job",
+                "time": time.time(),
+                **asdict(job),
+                "seconds": elapsed,
+                "real_time_factor": rtf,
+                "success": success,
+                "error": error,
+            }
+            self._write_event(event)
+    
+    def skip_job(self, url: str) -> None:
+        """Record a URL that was skipped because it was already done."""
+        with self._lock:
+            self._jobs["skipped"] += 1
+            self._write_event({"event": "skip", "time": time.time(), "url": url})
+    
+    def add_unattributed(self, fallbacks: int = 0, escalations: int = 0) -> None:
+        """Count fallbacks and escalations that cannot be tied to one job (batched calls)."""
+        with self._lock:
+            self._fallbacks += fallbacks
+            self._escalations += escalations
+    
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        p = PROMETHEUS_PREFIX
+        with self._lock:
+            lines = [
+                f"# HELP {p}_jobs_total Jobs by outcome.",
+                f"# TYPE {p}_jobs_total counter",
+            ]
+            for outcome, count in self._jobs.items():
+                lines.append(f'{p}_jobs_total{{outcome="{outcome}"}} {count}')
+            lines += [
+                f"# HELP {p}_temperature_fallbacks_total Whisper windows re-decoded "
+                "at a higher temperature.",
+                f"# TYPE {p}_temperature_fallbacks_total counter",
+                f"{p}_temperature_fallbacks_total {self._fallbacks}",
+                f"# HELP {p}_retries_total Download attempts that were retried.",
+                f"# TYPE {p}_retries_total counter",
+                f"{p}_retries_total {self._retries}",
+                f"# HELP {p}_escalations_total Jobs re-transcribed with the cascade model.",
+                f"# TYPE {p}_escalations_total counter",
+                f"{p}_escalations_total {self._escalations}",
+                f"# HELP {p}_stage_seconds Time spent per job in each stage.",
+                f"# TYPE {p}_stage_seconds histogram",
+            ]
+            for name in sorted(self._stage_seconds):
+                lines += self._stage_seconds[name].prometheus_lines(
+                    f"{p}_stage_seconds", f'stage="{name}"'
+                )
+            for metric, histogram, help_text in (
+                ("job_seconds", self._job_seconds, "End-to-end time per job."),
+                ("download_bytes", self._bytes, "Bytes downloaded per job."),
+                ("audio_seconds", self._audio_seconds, "Audio length per job."),
+                ("real_time_factor", self._real_time_factor,
+                 "Transcription time divided by audio length."),
+            ):
+                lines += [
+                    f"# HELP {p}_{metric} {help_text}",
+                    f"# TYPE {p}_{metric} histogram",
+                ]
+                lines += histogram.prometheus_lines(f"{p}_{metric}")
+        return "\n".join(lines) + "\n"
+    
+    def export(self) -> None:
+        """Write the Prometheus textfile and flush the event stream."""
+        if self.prometheus_path:
+            # Write then rename, so a scraper never reads a half-written file
+            tmp_path = f"{self.prometheus_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self.prometheus_path)
+        with self._lock:
+            if self._events is not None:
+                self._events.flush()
+    
+    def close(self) -> None:
+        """Stop the periodic export, write a run summary event and export once more."""
+        self._stopping.set()
+        if self._exporter is not None:
+            self._exporter.join()
+        with self._lock:
+            self._write_event({
+                "event": "run",
+                "time": time.time(),
+                "seconds": time.time() - self.started_at,
+                "jobs": dict(self._jobs),
+                "temperature_fallbacks": self._fallbacks,
+                "retries": self._retries,
+                "escalations": self._escalations,
+            })
+        self.export()
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+    
+    def summary(self) -> Tuple[Dict[str, float], Optional[float]]:
+        """
+        Return mean seconds per stage and the mean real-time factor so far.
+        
+        Returns:
+            Tuple of ({stage: mean seconds}, mean real-time factor or None)
+        """
+        with self._lock:
+            means = {
+                name: histogram.sum / histogram.count
+                for name, histogram in self._stage_seconds.items()
+                if histogram.count
+            }
+            rtf = self._real_time_factor
+            return means, (rtf.sum / rtf.count if rtf.count else None)
+    
+    def _stage_histogram(self, name: str) -> Histogram:
+        """Return the histogram for a stage, creating it on first use."""
+        if name not in self._stage_seconds:
+            self._stage_seconds[name] = Histogram(STAGE_BUCKETS)
+        return self._stage_seconds[name]
+    
+    def _write_event(self, event: Dict[str, Any]) -> None:
+        """Append one event to the JSONL stream; caller holds the lock."""
+        if self._events is not None:
+            self._events.write(json.dumps(event, default=str) + "\n")
+    
+    def _export_loop(self) -> None:
+        """Background thread: export every ``interval`` seconds until closed."""
+        while not self._stopping.wait(self.interval):
+            try:
+                self.export()
+            except OSError as e:
+                logger.warning(f"Could not export metrics: {e}")
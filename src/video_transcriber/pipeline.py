@@ -0,0 +1,524 @@
+"""Staged, overlapping pipeline for processing many URLs."""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from .processor import VideoJob, VideoProcessor
+
+logger = logging.getLogger(__name__)
+
+# Marker pushed onto a stage queue to tell one worker to exit
+_STOP = object()
+
+# Called with (index, success, message) as each URL finishes
+ResultCallback = Callable[[int, bool, str], None]
+
+# URLs the async feeder takes from its iterable per trip to a thread
+_FEED_BLOCK = 256
+
+
+def progress(index: int, total: Optional[int]) -> str:
+    """Format a job's position as [n/total], or [n] when the total is not known."""
+    return f"[{index+1}/{total}]" if total is not None else f"[{index+1}]"
+
+
+def _read_block(iterator: Iterator[str], size: int) -> Tuple[List[str], Optional[Exception]]:
+    """Take up to ``size`` URLs, stopping early (with the error) if reading fails."""
+    block: List[str] = []
+    try:
+        block.extend(islice(iterator, size))
+    except Exception as e:
+        return block, e
+    return block, None
+
+
+class StagedPipeline:
+    """
+    Runs URLs through download, extraction and transcription stages concurrently.
+    
+    Each stage has its own pool of worker threads, and stages are connected by
+    bounded queues so URL N+1 can be downloading while URL N is being
+    transcribed. The bounded queues keep a fast stage from racing ahead and
+    filling the disk with videos the slower stages have not caught up with.
+    """
+    
+    def __init__(
+        self,
+        processor: "VideoProcessor",
+        download_workers: int = 2,
+        extract_workers: int = 1,
+        transcribe_workers: int = 1,
+        queue_size: int = 4,
+        batch_size: int = 1,
+        batch_max_wait: float = 0.5,
+        on_result: Optional[ResultCallback] = None,
+    ):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            processor: Video processor whose stage methods do the actual work
+            download_workers: Threads fetching metadata and downloading videos
+            extract_workers: Threads running ffmpeg audio extraction
+            transcribe_workers: Threads running transcription
+            queue_size: Maximum number of jobs waiting between two stages
+            batch_size: Jobs handed to the transcriber in one batched call
+            batch_max_wait: Seconds a transcribe worker waits to fill a batch
+                before running with what it has
+            on_result: Optional callback told about each URL's outcome
+        """
+        self.processor = processor
+        self.download_workers = max(1, download_workers)
+        self.extract_workers = max(1, extract_workers)
+        self.transcribe_workers = max(1, transcribe_workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_max_wait = batch_max_wait
+        self.on_result = on_result
+        
+        self._lock = threading.Lock()
+        self._successful = 0
+        self._failed = 0
+        self._total: Optional[int] = None
+        self._feed_error: Optional[Exception] = None
+    
+    def run(self, urls: Iterable[str]) -> Tuple[int, int]:
+        """
+        Process all URLs through the staged pipeline.
+        
+        Args:
+            urls: URLs to process; an iterator is consumed as the pipeline
+                has room
+                
+        Returns:
+            Tuple of (successful_count, failed_count)
+            
+        Raises:
+            Exception: Whatever reading the URLs raised, once the jobs
+                already fed in have finished
+        """
+        self._successful = 0
+        self._failed = 0
+        self._feed_error = None
+        self._total = len(urls) if isinstance(urls, Sequence) else None
+        
+        url_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        extract_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Leave room for a full batch to gather behind the transcribe workers
+        transcribe_queue: queue.Queue = queue.Queue(
+            maxsize=max(self.queue_size, self.batch_size * self.transcribe_workers)
+        )
+        
+        logger.info(
+            f"Starting pipeline with {self.download_workers} download, "
+            f"{self.extract_workers} extract and {self.transcribe_workers} transcribe workers"
+        )
+        
+        feeder = threading.Thread(
+            target=self._feed, args=(urls, url_queue), name="pipeline-feed", daemon=True
+        )
+        feeder.start()
+        
+        stages = [
+            ("download", self._download_stage, url_queue, extract_queue, self.download_workers),
+            ("extract", self._extract_stage, extract_queue, transcribe_queue, self.extract_workers),
+            ("transcribe", self._transcribe_stage, transcribe_queue, None, self.transcribe_workers),
+        ]
+        running = []
+        for name, handler, inbox, outbox, workers in stages:
+            target: Callable[..., None]
+            args: Tuple[Any, ...]
+            if name == "transcribe" and self.batch_size > 1:
+                target, args = self._batch_worker, (inbox,)
+            else:
+                target, args = self._worker, (handler, inbox, outbox)
+            threads = [
+                threading.Thread(
+                    target=target,
+                    args=args,
+                    name=f"pipeline-{name}-{n}",
+                    daemon=True,
+                )
+                for n in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            running.append((threads, outbox))
+        
+        # Shut the stages down in order: once every worker of one stage has
+        # exited, nothing more can arrive downstream, so stop the next stage.
+        feeder.join()
+        for (threads, outbox), next_stage in zip(running, stages[1:] + [None]):
+            for thread in threads:
+                thread.join()
+            if outbox is not None and next_stage is not None:
+                for _ in range(next_stage[4]):
+                    outbox.put(_STOP)
+        
+        if self._feed_error is not None:
+            raise self._feed_error
+        return self._successful, self._failed
+    
+    def _feed(self, urls: Iterable[str], url_queue: queue.Queue) -> None:
+        """
+        Push URLs into the first stage, then one stop marker per download worker.
+        
+        The markers are sent even if reading the URLs fails, so the stages
+        still drain; the error is kept for ``run`` to raise.
+        """
+        try:
+            for index, url in enumerate(urls):
+                self.processor.transcriber.check_model()
+                url_queue.put((index, url))
+        except Exception as e:
+            logger.error(f"Stopped feeding URLs: {e}")
+            self._feed_error = e
+        finally:
+            for _ in range(self.download_workers):
+                url_queue.put(_STOP)
+    
+    def _worker(
+        self,
+        handler: Callable,
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+    ) -> None:
+        """Pull items from a stage queue until told to stop, forwarding results."""
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            result = handler(item)
+            if result is not None and outbox is not None:
+                outbox.put(result)
+    
+    def _batch_worker(self, inbox: queue.Queue) -> None:
+        """
+        Pull jobs into batches for the transcriber until told to stop.
+        
+        A batch is run as soon as it is full or ``batch_max_wait`` seconds
+        after its first job arrived, whichever comes first.
+        """
+        stopping = False
+        while not stopping:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = inbox.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._transcribe_batch_stage(batch)
+    
+    def _download_stage(self, item: Tuple[int, str]) -> Optional["VideoJob"]:
+        """Fetch metadata and download the video; returns the job for extraction."""
+        index, url = item
+        logger.info(f"{progress(index, self._total)} Processing: {url}")
+        try:
+            job, skip_message = self.processor.start_job(url, index)
+        except Exception as e:
+            self._record(index, False, self.processor.describe_failure(e))
+            return None
+        if job is None:
+            self._record(index, True, skip_message)
+            return None
+        
+        try:
+            self.processor.download(job)
+            return job
+        except Exception as e:
+            self._record(job.index, False, self.processor.fail_job(job, e))
+            return None
+    
+    def _extract_stage(self, job: "VideoJob") -> Optional["VideoJob"]:
+        """Extract audio from a downloaded video; returns the job for transcription."""
+        try:
+            self.processor.extract(job)
+            return job
+        except Exception as e:
+            self._record(job.index, False, self.processor.fail_job(job, e))
+            return None
+    
+    def _transcribe_stage(self, job: "VideoJob") -> None:
+        """Transcribe a job's audio and save the transcript."""
+        try:
+            self._record(job.index, True, self.processor.transcribe(job))
+        except Exception as e:
+            self._record(job.index, False, self.processor.fail_job(job, e))
+    
+    def _transcribe_batch_stage(self, jobs: List["VideoJob"]) -> None:
+        """Transcribe a batch of jobs and save their transcripts."""
+        try:
+            outcomes = self.processor.transcribe_batch(jobs)
+        except Exception as e:
+            outcomes = [(False, self.processor.fail_job(job, e)) for job in jobs]
+        for job, (success, message) in zip(jobs, outcomes):
+            self._record(job.index, success, message)
+    
+    def _record(self, index: int, success: bool, message: str) -> None:
+        """Count a finished job, log its outcome and report it to ``on_result``."""
+        with self._lock:
+            if success:
+                self._successful += 1
+                logger.info(f"  ✓ {message}")
+            else:
+                self._failed += 1
+                logger.error(f"  ✗ {message}")
+            if self.on_result is not None:
+                self.on_result(index, success, message)
+
+
+class AsyncPipeline(StagedPipeline):
+    """
+    The staged pipeline driven by an asyncio event loop.
+    
+    Metadata fetches and downloads are coroutines on an
+    AsyncVideoDownloader, so up to ``network_concurrency`` URLs can wait on
+    the network at once without a thread each; the downloader's global and
+    per-host limits decide how many of them actually run. Extraction and
+    transcription are blocking and run on thread pools of their usual
+    sizes, as do streaming downloads.
+    """
+    
+    def __init__(
+        self,
+        processor: "VideoProcessor",
+        network_concurrency: int = 16,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            processor: Video processor whose stage methods do the actual work
+            network_concurrency: URLs whose metadata is fetched at the same time
+            **kwargs: StagedPipeline options
+        """
+        super().__init__(processor, **kwargs)
+        self.network_concurrency = max(1, network_concurrency)
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+    
+    def run(self, urls: Iterable[str]) -> Tuple[int, int]:
+        """
+        Process all URLs in a new event loop.
+        
+        Args:
+            urls: URLs to process
+            
+        Returns:
+            Tuple of (successful_count, failed_count)
+        """
+        return asyncio.run(self.run_async(urls))
+    
+    async def run_async(self, urls: Iterable[str]) -> Tuple[int, int]:
+        """
+        Process all URLs in the running event loop.
+        
+        Args:
+            urls: URLs to process; an iterator is consumed as the pipeline
+                has room
+                
+        Returns:
+            Tuple of (successful_count, failed_count)
+            
+        Raises:
+            Exception: Whatever reading the URLs raised, once the jobs
+                already fed in have finished
+        """
+        self._successful = 0
+        self._failed = 0
+        self._total = len(urls) if isinstance(urls, Sequence) else None
+        
+        url_queue: asyncio.Queue = asyncio.Queue(maxsize=self.network_concurrency)
+        # Jobs are small before download, so metadata may run a little ahead
+        download_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(self.queue_size, self.network_concurrency)
+        )
+        extract_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        transcribe_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=max(self.queue_size, self.batch_size * self.transcribe_workers)
+        )
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"pipeline-{name}")
+            for name, workers in (
+                ("download", self.download_workers),
+                ("extract", self.extract_workers),
+                ("transcribe", self.transcribe_workers),
+            )
+        }
+        
+        logger.info(
+            f"Starting async pipeline with {self.network_concurrency} metadata, "
+            f"{self.download_workers} download, {self.extract_workers} extract and "
+            f"{self.transcribe_workers} transcribe workers"
+        )
+        
+        stages: List[Tuple[Callable[..., Any], asyncio.Queue, Optional[asyncio.Queue], int]] = [
+            (self._metadata_stage_async, url_queue, download_queue, self.network_concurrency),
+            (self._download_stage_async, download_queue, extract_queue, self.download_workers),
+            (self._extract_stage_async, extract_queue, transcribe_queue, self.extract_workers),
+            (self._transcribe_stage_async, transcribe_queue, None, self.transcribe_workers),
+        ]
+        try:
+            feeder = asyncio.create_task(self._feed_async(urls, url_queue))
+            running = []
+            for handler, inbox, outbox, workers in stages:
+                if handler == self._transcribe_stage_async and self.batch_size > 1:
+                    coroutines = [self._batch_worker_async(inbox) for _ in range(workers)]
+                else:
+                    coroutines = [
+                        self._worker_async(handler, inbox, outbox) for _ in range(workers)
+                    ]
+                running.append(([asyncio.create_task(worker) for worker in coroutines], outbox))
+            
+            # Shut the stages down in order, as the threaded pipeline does;
+            # a failure to read the URLs is raised once the stages drain
+            await asyncio.wait([feeder])
+            for (tasks, outbox), next_stage in zip(running, stages[1:] + [None]):
+                await asyncio.gather(*tasks)
+                if outbox is not None and next_stage is not None:
+                    for _ in range(next_stage[3]):
+                        await outbox.put(_STOP)
+            feeder.result()
+        finally:
+            for pool in self._pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+        
+        return self._successful, self._failed
+    
+    async def _feed_async(self, urls: Iterable[str], url_queue: asyncio.Queue) -> None:
+        """
+        Push URLs into the first stage, then one stop marker per metadata worker.
+        
+        The markers are sent even if reading the URLs fails, so the stages
+        still drain before the error is raised.
+        """
+        # Reading the next URLs may block (a file, stdin, a metadata
+        # prefetch), so it is done off the event loop, a block at a time
+        loop = asyncio.get_running_loop()
+        iterator = iter(urls)
+        index = 0
+        try:
+            while True:
+                block, error = await loop.run_in_executor(
+                    None, _read_block, iterator, _FEED_BLOCK
+                )
+                for url in block:
+                    self.processor.transcriber.check_model()
+                    await url_queue.put((index, url))
+                    index += 1
+                if error is not None:
+                    logger.error(f"Stopped feeding URLs: {error}")
+                    raise error
+                if not block:
+                    break
+        finally:
+            for _ in range(self.network_concurrency):
+                await url_queue.put(_STOP)
+    
+    async def _worker_async(
+        self,
+        handler: Callable,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+    ) -> None:
+        """Pull items from a stage queue until told to stop, forwarding results."""
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            result = await handler(item)
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+    
+    async def _batch_worker_async(self, inbox: asyncio.Queue) -> None:
+        """Pull jobs into batches for the transcriber, as ``_batch_worker`` does."""
+        stopping = False
+        while not stopping:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(inbox.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._in_thread("transcribe", self._transcribe_batch_stage, batch)
+    
+    async def _metadata_stage_async(self, item: Tuple[int, str]) -> Optional["VideoJob"]:
+        """Fetch metadata for a URL; returns the job for download."""
+        index, url = item
+        logger.info(f"{progress(index, self._total)} Processing: {url}")
+        try:
+            job, skip_message = await self.processor.start_job_async(url, index)
+        except Exception as e:
+            self._record(index, False, self.processor.describe_failure(e))
+            return None
+        if job is None:
+            self._record(index, True, skip_message)
+        return job
+    
+    async def _download_stage_async(self, job: "VideoJob") -> Optional["VideoJob"]:
+        """Download the video; returns the job for extraction."""
+        try:
+            if self.processor.config.streaming:
+                await self._in_thread("download", self.processor.download, job)
+            else:
+                await self.processor.download_async(job)
+            return job
+        except Exception as e:
+            self._record(job.index, False, self.processor.fail_job(job, e))
+            return None
+    
+    async def _extract_stage_async(self, job: "VideoJob") -> Optional["VideoJob"]:
+        """Extract audio on the extract threads; returns the job for transcription."""
+        return await self._in_thread("extract", self._extract_stage, job)
+    
+    async def _transcribe_stage_async(self, job: "VideoJob") -> None:
+        """Transcribe on the transcribe threads and save the transcript."""
+        await self._in_thread("transcribe", self._transcribe_stage, job)
+    
+    async def _in_thread(self, pool: str, function: Callable, *args: Any) -> Any:
+        """Run a blocking call on one of the stage thread pools, keeping this task's context."""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._pools[pool], context.run, function, *args
+        )
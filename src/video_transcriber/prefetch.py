@@ -0,0 +1,203 @@
+"""Bulk metadata prefetch, so jobs can be sized and filtered before any download."""
+
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import DEFAULT_PREFETCH_CHUNK_SIZE
+from .downloader import VideoDownloader
+
+logger = logging.getLogger(__name__)
+
+# The metadata fields that are kept. A full yt-dlp info dict lists every
+# format and runs to tens of kilobytes, most of which is never looked at.
+PREFETCH_FIELDS = (
+    "id",
+    "title",
+    "uploader",
+    "uploader_id",
+    "channel",
+    "duration",
+    "view_count",
+    "like_count",
+    "comment_count",
+    "upload_date",
+    "timestamp",
+    "description",
+    "webpage_url",
+    "extractor_key",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    url TEXT PRIMARY KEY,
+    info TEXT,
+    error TEXT,
+    duration REAL,
+    fetched_at TEXT NOT NULL
+)
+"""
+
+
+class MetadataStore:
+    """
+    URL-to-metadata map filled by a prefetch, in memory or in a SQLite file.
+    
+    Failed lookups are stored too, so a URL yt-dlp could not resolve is
+    not fetched again one by one during processing. With a file, a rerun
+    only prefetches URLs it has not seen. The store is safe to share
+    between pipeline worker threads.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) a metadata store.
+        
+        Args:
+            path: SQLite database file, or None to keep the map in memory
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        with self._conn:
+            if path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+        logger.debug(f"Opened metadata store at {path or 'memory'}")
+    
+    def __contains__(self, url: object) -> bool:
+        """Return True if the URL was prefetched, whether or not it resolved."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM metadata WHERE url = ?", (url,)
+            ).fetchone()
+        return row is not None
+    
+    def __len__(self) -> int:
+        """Return the number of prefetched URLs."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up a URL's prefetched metadata.
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            The metadata, an empty dict if the prefetch failed for the URL
+            (as ``get_video_info`` returns on failure), or None if the URL
+            was never prefetched
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM metadata WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]) if row[0] else {}
+    
+    def duration(self, url: str) -> Optional[float]:
+        """Return a URL's prefetched duration in seconds, if known."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duration FROM metadata WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def put_many(self, results: Sequence[Tuple[str, Optional[Dict], Optional[str]]]) -> None:
+        """
+        Store prefetch results in one transaction.
+        
+        Args:
+            results: (url, metadata or None, error message or None) tuples
+        """
+        now = datetime.now().isoformat()
+        rows = []
+        for url, info, error in results:
+            if info is not None:
+                info = {key: info[key] for key in PREFETCH_FIELDS if info.get(key) is not None}
+            duration = info.get("duration") if info else None
+            rows.append((url, json.dumps(info) if info is not None else None, error,
+                         float(duration) if duration else None, now))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata (url, info, error, duration, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def prefetch_metadata(
+    downloader: VideoDownloader,
+    urls: Sequence[str],
+    store: MetadataStore,
+    chunk_size: int = DEFAULT_PREFETCH_CHUNK_SIZE,
+    workers: int = 1,
+) -> Tuple[int, int]:
+    """
+    Fetch metadata for every URL not yet in the store, in chunks.
+    
+    Each chunk is one ``downloader.iter_video_info`` call, i.e. one yt-dlp
+    process, and up to ``workers`` chunks run at the same time. Results are
+    stored as each chunk streams them, so an interrupted prefetch keeps what
+    it got.
+    
+    Args:
+        downloader: Downloader whose yt-dlp does the fetching
+        urls: Video URLs
+        store: Store the results are written to
+        chunk_size: URLs per yt-dlp process
+        workers: yt-dlp processes running at the same time
+        
+    Returns:
+        Tuple of (URLs resolved, URLs that failed)
+    """
+    todo = [url for url in dict.fromkeys(urls) if url not in store]
+    if not todo:
+        return 0, 0
+    chunk_size = max(1, chunk_size)
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    logger.info(
+        f"Prefetching metadata for {len(todo)} URLs in {len(chunks)} yt-dlp calls "
+        f"({min(workers, len(chunks))} at a time)"
+    )
+    
+    counts = {"resolved": 0, "failed": 0}
+    counts_lock = threading.Lock()
+    
+    def fetch(chunk: List[str]) -> None:
+        batch = []
+        for result in downloader.iter_video_info(chunk):
+            batch.append(result)
+            if len(batch) >= 50:
+                save(batch)
+                batch = []
+        save(batch)
+    
+    def save(batch: List[Tuple[str, Optional[Dict], Optional[str]]]) -> None:
+        if not batch:
+            return
+        store.put_many(batch)
+        with counts_lock:
+            for _, info, _ in batch:
+                counts["resolved" if info is not None else "failed"] += 1
+            done = counts["resolved"] + counts["failed"]
+        logger.info(f"Prefetched {done}/{len(todo)} URLs")
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch") as pool:
+        for future in [pool.submit(fetch, chunk) for chunk in chunks]:
+            future.result()
+    
+    logger.info(f"Prefetch complete: {counts['resolved']} resolved, {counts['failed']} failed")
+    return counts["resolved"], counts["failed"]
@@ -1,19 +1,68 @@
 """Main video processing orchestration."""
 
+import asyncio
 import logging
 import os
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .audio import AudioExtractor
+from .artifacts import KIND_VIDEO, ArtifactCache, audio_kind
+from .async_downloader import AsyncVideoDownloader
+from .audio import SAMPLE_RATE, AudioExtractor
+from .cache import TranscriptCache, audio_fingerprint
 from .config import TranscriberConfig
 from .downloader import VideoDownloader
-from .exceptions import AudioExtractionError, DownloadError, TranscriptionError
+from .engines import TranscriptionResult, to_result
+from .exceptions import (
+    AudioExtractionError,
+    DownloadError,
+    ModelLoadError,
+    TranscriptionError,
+    UnseekableStreamError,
+)
+from .longform import LongAudioTranscriber
+from .manifest import STATE_DONE, JobManifest
+from .metrics import JobMetrics, MetricsRecorder
+from .pipeline import AsyncPipeline, ResultCallback, StagedPipeline, progress
+from .prefetch import MetadataStore, prefetch_metadata
+from .scheduler import JobScheduler, scaled_timeout, work_seconds
+from .sinks import TextSink, TranscriptSink
 from .transcriber import AudioTranscriber
-from .utils import sanitize_filename
+from .utils import sanitize_filename, video_key
 
 logger = logging.getLogger(__name__)
 
+# Seconds before the first download retry; doubled for each further retry
+RETRY_DELAY = 2.0
+
+
+@dataclass
+class VideoJob:
+    """State for a single URL as it moves through the processing stages."""
+    
+    url: str
+    video_key: str
+    index: int
+    base_name: str
+    video_path: str
+    audio_path: str
+    transcript_path: str
+    info: Dict = field(default_factory=dict)
+    # Decoded samples when streaming; otherwise audio is read from audio_path
+    audio: Any = None
+    retries: int = 0
+    # Set when the paths point at files reused from the artifact cache
+    video_cached: bool = False
+    audio_cached: bool = False
+    # Set when streaming failed and the video was downloaded to a file instead
+    stream_fallback: bool = False
+    metrics: Optional[JobMetrics] = None
+    started_at: float = field(default_factory=time.monotonic)
+
 
 class VideoProcessor:
     """Orchestrates the video downloading, audio extraction, and transcription process."""
@@ -24,6 +73,14 @@ class VideoProcessor:
         downloader: VideoDownloader,
         audio_extractor: AudioExtractor,
         transcriber: AudioTranscriber,
+        manifest: Optional[JobManifest] = None,
+        transcript_cache: Optional[TranscriptCache] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        long_audio: Optional[LongAudioTranscriber] = None,
+        metadata: Optional[MetadataStore] = None,
+        sink: Optional[TranscriptSink] = None,
+        scheduler: Optional[JobScheduler] = None,
+        artifacts: Optional[ArtifactCache] = None,
     ):
         """
         Initialize the video processor.
@@ -33,11 +90,32 @@ class VideoProcessor:
             downloader: Video downloader instance
             audio_extractor: Audio extractor instance
             transcriber: Audio transcriber instance
+            manifest: Optional job manifest used to skip finished URLs offline
+            transcript_cache: Optional cache that reuses transcripts of identical audio
+            metrics: Optional recorder for per-stage timings and job measurements
+            long_audio: Optional transcriber that splits long clips into
+                chunks transcribed in parallel
+            metadata: Optional store of prefetched metadata, consulted
+                before fetching a URL's metadata on its own
+            sink: Where transcripts are written; defaults to one text
+                file per video in ``config.transcript_dir``
+            scheduler: Optional scheduler that runs prefetched URLs
+                longest first; needs a metadata store
+            artifacts: Optional cache of downloaded videos and extracted
+                audio, reused instead of downloading again
         """
         self.config = config
         self.downloader = downloader
         self.audio_extractor = audio_extractor
         self.transcriber = transcriber
+        self.manifest = manifest
+        self.transcript_cache = transcript_cache
+        self.metrics = metrics
+        self.long_audio = long_audio
+        self.metadata = metadata
+        self.sink = sink if sink is not None else TextSink()
+        self.scheduler = scheduler
+        self.artifacts = artifacts
     
     def process_url(self, url: str, index: int) -> Tuple[bool, str]:
         """
@@ -52,8 +130,215 @@ class VideoProcessor:
         """
         logger.info(f"Processing URL: {url}")
         
+        job, skip_message = self.start_job(url, index)
+        if job is None:
+            return True, skip_message
+        
+        try:
+            self.download(job)
+            self.extract(job)
+            return True, self.transcribe(job)
+        except Exception as e:
+            return False, self.fail_job(job, e)
+    
+    def start_job(self, url: str, index: int) -> Tuple[Optional[VideoJob], str]:
+        """
+        Decide whether a URL needs processing and, if so, set up its job.
+        
+        The manifest is consulted first so finished URLs are skipped without
+        any network call; only unknown or unfinished URLs have their
+        metadata fetched.
+        
+        Args:
+            url: Video URL to process
+            index: Index of the URL in the list
+            
+        Returns:
+            Tuple of (job, message); job is None when the URL should be skipped
+            
+        Raises:
+            ModelLoadError: If the model has failed to load, so there is no
+                point downloading
+        """
+        skip_message = self._skip_early(url)
+        if skip_message:
+            return None, skip_message
+        self.transcriber.check_model()
+        
+        job_metrics = self.metrics.new_job(url, self.job_key(url)) if self.metrics else None
+        with self._measure(job_metrics, "metadata"):
+            job = self.prepare_job(url, index)
+        return self._admit_job(job, job_metrics)
+    
+    async def start_job_async(self, url: str, index: int) -> Tuple[Optional[VideoJob], str]:
+        """
+        Like ``start_job``, but fetching metadata without blocking the event loop.
+        
+        Requires an AsyncVideoDownloader.
+        
+        Args:
+            url: Video URL to process
+            index: Index of the URL in the list
+            
+        Returns:
+            Tuple of (job, message); job is None when the URL should be skipped
+        """
+        skip_message = self._skip_early(url)
+        if skip_message:
+            return None, skip_message
+        self.transcriber.check_model()
+        
+        downloader = self.downloader
+        assert isinstance(downloader, AsyncVideoDownloader)
+        job_metrics = self.metrics.new_job(url, self.job_key(url)) if self.metrics else None
+        info = self._known_info(url)
+        if info is None:
+            with self._measure(job_metrics, "metadata"):
+                info = await downloader.get_video_info_async(url)
+            self._remember_info(url, info)
+        return self._admit_job(self.prepare_job(url, index, info), job_metrics)
+    
+    def _skip_early(self, url: str) -> Optional[str]:
+        """
+        Return a skip message if the URL needs no processing, else None.
+        
+        Only checks that need no metadata fetch: the manifest, and the
+        duration limits against prefetched metadata.
+        """
+        message = None
+        if self._finished_in_manifest(self.job_key(url)):
+            logger.info("Already completed according to manifest, skipping")
+            message = "Skipped - already completed"
+        elif self.metadata is not None:
+            duration = self.metadata.duration(url)
+            min_duration = self.config.min_duration
+            max_duration = self.config.max_duration
+            if duration is not None and (
+                (min_duration is not None and duration < min_duration)
+                or (max_duration is not None and duration > max_duration)
+            ):
+                logger.info(f"Duration {duration:.0f}s is outside the limits, skipping")
+                message = f"Skipped - duration {duration:.0f}s outside limits"
+        if message is not None and self.metrics is not None:
+            self.metrics.skip_job(url)
+        return message
+    
+    def prefetch(self, urls: Sequence[str]) -> None:
+        """
+        Fetch metadata for all unfinished URLs in bulk before processing.
+        
+        Does nothing without a metadata store. URLs the manifest has as
+        finished are left out, so reruns only prefetch what is left to do.
+        
+        Args:
+            urls: List of URLs about to be processed
+        """
+        if self.metadata is None:
+            return
+        todo = [url for url in urls if not self._finished_in_manifest(self.job_key(url))]
+        prefetch_metadata(
+            self.downloader,
+            todo,
+            self.metadata,
+            chunk_size=self.config.prefetch_chunk_size,
+            workers=self.config.prefetch_workers,
+        )
+    
+    def _admit_job(
+        self, job: VideoJob, job_metrics: Optional[JobMetrics]
+    ) -> Tuple[Optional[VideoJob], str]:
+        """Skip a job whose transcript exists, otherwise mark it started."""
+        job.metrics = job_metrics
+        
+        # Skip if transcript already exists
+        if self.is_complete(job):
+            logger.info("Transcript already exists, skipping")
+            if self.metrics is not None:
+                self.metrics.skip_job(job.url)
+            if self.manifest is not None:
+                self.manifest.mark_done(
+                    job.video_key, job.url, job.base_name, transcript_path=job.transcript_path
+                )
+            return None, "Skipped - transcript already exists"
+        
+        if self.manifest is not None:
+            self.manifest.mark_started(job.video_key, job.url)
+        if self.artifacts is not None:
+            self._reuse_artifacts(job, self.artifacts)
+        return job, ""
+    
+    def _reuse_artifacts(self, job: VideoJob, artifacts: ArtifactCache) -> None:
+        """Point a job at cached audio, or failing that a cached video, and pin them."""
+        artifacts.pin(job.video_key)
+        audio_path = artifacts.get(job.video_key, audio_kind(self.config.audio_format))
+        if audio_path is not None:
+            logger.info(f"Reusing cached audio: {audio_path}")
+            job.audio_path = audio_path
+            job.audio_cached = True
+            return
+        if self.config.streaming:
+            return
+        video_path = artifacts.get(job.video_key, KIND_VIDEO)
+        if video_path is not None:
+            logger.info(f"Reusing cached video: {video_path}")
+            job.video_path = video_path
+            job.video_cached = True
+    
+    def fail_job(self, job: VideoJob, error: Exception) -> str:
+        """
+        Log and record a job that failed in one of its stages.
+        
+        Args:
+            job: The job that failed
+            error: Exception raised by the failing stage
+            
+        Returns:
+            Human-readable failure message
+        """
+        message = self.describe_failure(error)
+        logger.error(message)
+        # A model that failed to load is not the URL's fault, so leave no record
+        if self.manifest is not None and not isinstance(error, ModelLoadError):
+            self.manifest.mark_failed(job.video_key, job.url, message)
+        if self.artifacts is not None:
+            self.artifacts.unpin(job.video_key)
+        self._finish_metrics(job, False, message)
+        return message
+    
+    @staticmethod
+    def job_key(url: str) -> str:
+        """Return the manifest key for a URL, falling back to the URL itself."""
+        return video_key(url)
+    
+    def _finished_in_manifest(self, video_key: str) -> bool:
+        """Return True if the manifest has a finished job whose transcript still exists."""
+        if self.manifest is None:
+            return False
+        record = self.manifest.get(video_key)
+        if record is None or record["state"] != STATE_DONE:
+            return False
+        transcript_path = record["transcript_path"]
+        return transcript_path is None or self.sink.has(video_key, transcript_path)
+    
+    def prepare_job(self, url: str, index: int, info: Optional[Dict] = None) -> VideoJob:
+        """
+        Fetch metadata for a URL and work out where its files will live.
+        
+        Args:
+            url: Video URL to process
+            index: Index of the URL in the list
+            info: Metadata fetched already; taken from the prefetched
+                metadata or fetched here if None
+                
+        Returns:
+            VideoJob describing the URL and its output paths
+        """
         # Get video metadata for filename
-        info = self.downloader.get_video_info(url)
+        if info is None:
+            info = self._known_info(url)
+        if info is None:
+            info = self.downloader.get_video_info(url)
+            self._remember_info(url, info)
         
         if info:
             creator = info.get("uploader", "unknown")
@@ -66,92 +351,510 @@ class VideoProcessor:
         else:
             base_name = f"video_{index}"
         
-        video_path = os.path.join(self.config.video_dir, f"{base_name}.mp4")
-        audio_path = os.path.join(self.config.audio_dir, f"{base_name}.mp3")
-        transcript_path = os.path.join(self.config.transcript_dir, f"{base_name}.txt")
+        audio_name = f"{base_name}.{self.config.audio_format}"
+        return VideoJob(
+            url=url,
+            video_key=self.job_key(url),
+            index=index,
+            base_name=base_name,
+            video_path=os.path.join(self.config.video_dir, f"{base_name}.mp4"),
+            audio_path=os.path.join(self.config.audio_dir, audio_name),
+            transcript_path=os.path.join(self.config.transcript_dir, f"{base_name}.txt"),
+            info=info,
+        )
+    
+    def _known_info(self, url: str) -> Optional[Dict]:
+        """Return a URL's metadata from the prefetched store or the artifact cache, if any."""
+        info = self.metadata.get(url) if self.metadata is not None else None
+        if info is None and self.artifacts is not None:
+            info = self.artifacts.get_info(self.job_key(url))
+        return info
+    
+    def _remember_info(self, url: str, info: Optional[Dict]) -> None:
+        """Keep freshly fetched metadata in the artifact cache for later runs."""
+        if info and self.artifacts is not None:
+            self.artifacts.put_info(self.job_key(url), info)
+    
+    def is_complete(self, job: VideoJob) -> bool:
+        """Return True if the job's transcript has already been written."""
+        return self.sink.has(job.video_key, job.transcript_path)
+    
+    def download(self, job: VideoJob) -> None:
+        """
+        Download stage: fetch the job's video file.
         
-        # Skip if transcript already exists
-        if os.path.exists(transcript_path):
-            logger.info("Transcript already exists, skipping")
-            return True, "Skipped - transcript already exists"
+        In streaming mode the video is piped through ffmpeg as it downloads
+        and only the decoded samples are kept, in ``job.audio``. Failed
+        downloads are retried up to ``config.download_retries`` times.
+        Nothing is downloaded when the job reuses cached files.
+        """
+        if job.audio_cached or job.video_cached:
+            return
+        with self._measure(job.metrics, "download"):
+            while True:
+                try:
+                    self._download_once(job)
+                    return
+                except DownloadError as e:
+                    if job.retries >= self.config.download_retries:
+                        raise
+                    delay = RETRY_DELAY * 2 ** job.retries
+                    job.retries += 1
+                    logger.warning(f"{e}; retrying in {delay:.0f}s")
+                    time.sleep(delay)
+    
+    async def download_async(self, job: VideoJob) -> None:
+        """
+        Download stage without blocking the event loop; see ``download``.
         
-        try:
-            # Download video
-            logger.info("Downloading video...")
-            self.downloader.download_video(url, video_path)
-            
-            # Extract audio
-            logger.info("Extracting audio...")
-            self.audio_extractor.extract_audio(video_path, audio_path)
-            
-            # Transcribe
-            logger.info("Transcribing audio...")
-            transcript = self.transcriber.transcribe(audio_path)
-            
-            # Save transcript with metadata
-            self._save_transcript(transcript_path, url, info, transcript)
-            
-            logger.info(f"Successfully processed: {base_name}")
-            return True, f"Saved to {transcript_path}"
+        Requires an AsyncVideoDownloader. Streaming mode pipes through a
+        blocking ffmpeg decode, so streaming jobs go through ``download``
+        on a thread instead.
+        """
+        if job.audio_cached or job.video_cached:
+            return
+        downloader = self.downloader
+        assert isinstance(downloader, AsyncVideoDownloader)
+        with self._measure(job.metrics, "download"):
+            while True:
+                try:
+                    logger.info("Downloading video...")
+                    await downloader.download_video_async(
+                        job.url, job.video_path, self._download_timeout(job)
+                    )
+                    if job.metrics is not None:
+                        job.metrics.bytes_downloaded = os.path.getsize(job.video_path)
+                    self._cache_artifact(job, KIND_VIDEO, job.video_path)
+                    return
+                except DownloadError as e:
+                    if job.retries >= self.config.download_retries:
+                        raise
+                    delay = RETRY_DELAY * 2 ** job.retries
+                    job.retries += 1
+                    logger.warning(f"{e}; retrying in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+    
+    def _download_once(self, job: VideoJob) -> None:
+        """Make one download attempt for a job."""
+        if self.config.streaming and not job.stream_fallback:
+            logger.info("Streaming video into audio decoder...")
+            stream = self.downloader.open_stream(job.url, self._download_timeout(job))
+            try:
+                job.audio = self.audio_extractor.decode_stream(
+                    stream, timeout=self._download_timeout(job) + self._audio_timeout(job)
+                )
+            except UnseekableStreamError as e:
+                logger.warning(f"{e}; downloading the video to a file instead")
+                job.stream_fallback = True
+                os.makedirs(self.config.video_dir, exist_ok=True)
+                os.makedirs(self.config.audio_dir, exist_ok=True)
+            else:
+                if job.metrics is not None and stream.os_pipe is None:
+                    # Bytes that go straight from yt-dlp to ffmpeg are not seen here
+                    job.metrics.bytes_downloaded = stream.bytes_read
+                return
+        
+        logger.info("Downloading video...")
+        self.downloader.download_video(job.url, job.video_path, self._download_timeout(job))
+        if job.metrics is not None:
+            job.metrics.bytes_downloaded = os.path.getsize(job.video_path)
+        self._cache_artifact(job, KIND_VIDEO, job.video_path)
+    
+    def extract(self, job: VideoJob) -> None:
+        """Extraction stage: pull the audio track out of the job's video."""
+        if job.audio is not None or job.audio_cached:
+            # Already decoded while streaming, or extracted on an earlier run
+            return
+        
+        logger.info("Extracting audio...")
+        with self._measure(job.metrics, "extract"):
+            self.audio_extractor.extract_audio(
+                job.video_path, job.audio_path, self._audio_timeout(job)
+            )
+        self._cache_artifact(job, audio_kind(self.config.audio_format), job.audio_path)
+    
+    def _cache_artifact(self, job: VideoJob, kind: str, path: str) -> None:
+        """Record a file the job produced in the artifact cache, if there is one."""
+        if self.artifacts is not None:
+            self.artifacts.put(job.video_key, kind, path)
+    
+    def _download_timeout(self, job: VideoJob) -> float:
+        """Return the job's download timeout, scaled with its video's duration."""
+        return scaled_timeout(
+            self.config.download_timeout,
+            self.config.download_timeout_per_minute,
+            job.info.get("duration"),
+        )
+    
+    def _audio_timeout(self, job: VideoJob) -> float:
+        """Return the job's audio extraction timeout, scaled with its video's duration."""
+        return scaled_timeout(
+            self.config.audio_timeout,
+            self.config.audio_timeout_per_minute,
+            job.info.get("duration"),
+        )
+    
+    def transcribe(self, job: VideoJob) -> str:
+        """
+        Transcription stage: transcribe the job's audio and save the result.
+        
+        Returns:
+            Success message naming the saved transcript
+        """
+        logger.info("Transcribing audio...")
+        transcript_cache, long_audio = self.transcript_cache, self.long_audio
+        cached: Optional[TranscriptionResult] = None
+        with self._measure(job.metrics, "transcribe"):
+            audio = self._take_audio(job)
+            fingerprint = None
+            if transcript_cache is not None:
+                audio, fingerprint = self._fingerprint(audio)
+                cached = transcript_cache.get(fingerprint)
+            if cached is None:
+                audio, split = self._check_long_audio(job, audio)
+                if split and long_audio is not None:
+                    result = long_audio.transcribe_result(audio)
+                else:
+                    result = self.transcriber.transcribe_result(audio)
+                if transcript_cache is not None and fingerprint is not None:
+                    transcript_cache.put(fingerprint, result)
+        
+        if cached is not None:
+            logger.info("Identical audio was transcribed before, reusing transcript")
+            if job.metrics is not None:
+                job.metrics.cached = True
+            return self.save_job(job, cached) + " (cached)"
+        return self.save_job(job, result)
+    
+    def transcribe_batch(self, jobs: List[VideoJob]) -> List[Tuple[bool, str]]:
+        """
+        Transcription stage for several jobs at once, using one batched model call.
+        
+        Jobs whose audio is already in the transcript cache are saved
+        straight away and left out of the batch, as are long clips that are
+        transcribed in chunks. The batch's model time is
+        split evenly between its jobs in their metrics.
+        
+        Args:
+            jobs: Jobs whose audio is ready for transcription
             
-        except DownloadError as e:
-            logger.error(f"Download failed: {e}")
-            return False, f"Download failed: {e}"
-        except AudioExtractionError as e:
-            logger.error(f"Audio extraction failed: {e}")
-            return False, f"Audio extraction failed: {e}"
-        except TranscriptionError as e:
-            logger.error(f"Transcription failed: {e}")
-            return False, f"Transcription failed: {e}"
+        Returns:
+            One (success, message) tuple per job, in order
+        """
+        logger.info(f"Transcribing batch of {len(jobs)} jobs...")
+        transcript_cache, long_audio = self.transcript_cache, self.long_audio
+        outcomes: Dict[int, Tuple[bool, str]] = {}
+        pending = []
+        for i, job in enumerate(jobs):
+            try:
+                with self._measure(job.metrics, "transcribe"):
+                    audio = self._take_audio(job)
+                    fingerprint = None
+                    cached = None
+                    result = None
+                    if transcript_cache is not None:
+                        audio, fingerprint = self._fingerprint(audio)
+                        cached = transcript_cache.get(fingerprint)
+                    if cached is None:
+                        audio, split = self._check_long_audio(job, audio)
+                        if split and long_audio is not None:
+                            # Long clips go in parallel chunks instead of in the batch
+                            result = long_audio.transcribe_result(audio)
+                            if transcript_cache is not None and fingerprint is not None:
+                                transcript_cache.put(fingerprint, result)
+                if result is not None:
+                    outcomes[i] = (True, self.save_job(job, result))
+                    continue
+                if cached is not None:
+                    if job.metrics is not None:
+                        job.metrics.cached = True
+                    saved = self.save_job(job, cached)
+                    outcomes[i] = (True, saved + " (cached)")
+                    continue
+                pending.append((i, job, audio, fingerprint))
+            except Exception as e:
+                outcomes[i] = (False, self.fail_job(job, e))
+        
+        metrics = self.metrics
+        batch_metrics = metrics.new_job("", "batch") if metrics else None
+        with self._measure(batch_metrics, "transcribe"):
+            transcripts = self.transcriber.transcribe_many([audio for _, _, audio, _ in pending])
+        if metrics is not None and batch_metrics is not None and pending:
+            for _, job, _, _ in pending:
+                if job.metrics is None:
+                    continue
+                for name, seconds in batch_metrics.stages.items():
+                    job.metrics.add_stage(name, seconds / len(pending))
+            metrics.add_unattributed(
+                batch_metrics.temperature_fallbacks, batch_metrics.escalations
+            )
+        
+        for (i, job, _, fingerprint), transcript in zip(pending, transcripts):
+            try:
+                if isinstance(transcript, Exception):
+                    raise transcript
+                result = to_result({"text": transcript})
+                if transcript_cache is not None and fingerprint is not None:
+                    transcript_cache.put(fingerprint, result)
+                outcomes[i] = (True, self.save_job(job, result))
+            except Exception as e:
+                outcomes[i] = (False, self.fail_job(job, e))
+        return [outcomes[i] for i in range(len(jobs))]
+    
+    def _check_long_audio(self, job: VideoJob, audio: Any) -> Tuple[Any, bool]:
+        """
+        Decide whether a job's audio should be transcribed in chunks.
+        
+        The metadata's duration settles it for clearly short videos; other
+        audio is decoded to measure it.
+        
+        Returns:
+            Tuple of (audio, is long); long audio is returned decoded
+        """
+        if self.long_audio is None:
+            return audio, False
+        duration = job.info.get("duration")
+        if duration and not self.long_audio.should_split(duration):
+            return audio, False
+        try:
+            samples = self.transcriber.decode_audio(audio)
         except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return False, f"Unexpected error: {e}"
+            raise TranscriptionError(f"Could not load audio: {e}")
+        return samples, self.long_audio.should_split(len(samples) / SAMPLE_RATE)
     
-    def _save_transcript(
-        self,
-        filepath: str,
-        url: str,
-        metadata: Dict,
-        transcript: str
-    ) -> None:
+    def _fingerprint(self, audio: Any) -> Tuple[Any, str]:
+        """
+        Decode a job's audio and compute its transcript cache key.
+        
+        Returns:
+            Tuple of (decoded samples, fingerprint); the samples are handed
+            to the transcriber so the audio is only decoded once
         """
-        Save transcript with metadata to file.
+        try:
+            samples = self.transcriber.decode_audio(audio)
+        except Exception as e:
+            raise TranscriptionError(f"Could not load audio: {e}")
+        fingerprint = audio_fingerprint(
+            samples, self.config.whisper_model, self.transcriber.fingerprint_options
+        )
+        return samples, fingerprint
+    
+    def save_job(self, job: VideoJob, result: TranscriptionResult) -> str:
+        """
+        Write a job's transcript to the sink and record it as done.
+        
+        Batched transcripts come without segments.
+        
+        Returns:
+            Success message naming where the transcript went
+        """
+        details = {
+            "model": self.config.whisper_model,
+            "engine": getattr(self.transcriber, "engine_name", None),
+            "processing_seconds": time.monotonic() - job.started_at,
+            "stage_seconds": dict(job.metrics.stages) if job.metrics is not None else None,
+            "transcribed_at": datetime.now().isoformat(),
+        }
+        location = self.sink.write(job, result, details)
+        self._finish_metrics(job, True)
+        if self.artifacts is not None:
+            self.artifacts.unpin(job.video_key)
+        if self.manifest is not None:
+            kept_files = not self.config.streaming or job.stream_fallback
+            self.manifest.mark_done(
+                job.video_key,
+                job.url,
+                job.base_name,
+                video_path=job.video_path if kept_files else None,
+                audio_path=job.audio_path if kept_files else None,
+                transcript_path=location,
+            )
+        
+        logger.info(f"Successfully processed: {job.base_name}")
+        return f"Saved to {location}"
+    
+    def _measure(self, job_metrics: Optional[JobMetrics], stage: str) -> ContextManager:
+        """Time a block as one of the job's stages, if metrics are enabled."""
+        if self.metrics is None or job_metrics is None:
+            return nullcontext()
+        return self.metrics.measure(job_metrics, stage)
+    
+    def _finish_metrics(self, job: VideoJob, success: bool, error: Optional[str] = None) -> None:
+        """Complete and record a job's metrics."""
+        if self.metrics is None or job.metrics is None:
+            return
+        job.metrics.retries = job.retries
+        if success and job.metrics.audio_seconds is None and job.info.get("duration"):
+            # The audio was decoded by Whisper itself, so fall back to the metadata
+            job.metrics.audio_seconds = float(job.info["duration"])
+        if (
+            success
+            and self.scheduler is not None
+            and job.metrics.audio_seconds
+            and not job.metrics.cached
+        ):
+            self.scheduler.cost_model.observe(
+                job.metrics.audio_seconds, work_seconds(job.metrics.stages)
+            )
+        self.metrics.finish_job(job.metrics, success, error)
+    
+    @staticmethod
+    def _take_audio(job: VideoJob) -> Any:
+        """Return the job's in-memory samples (releasing them) or its audio file path."""
+        if job.audio is None:
+            return job.audio_path
+        # Let the samples be freed while the job object lives on
+        audio, job.audio = job.audio, None
+        return audio
+    
+    @staticmethod
+    def describe_failure(error: Exception) -> str:
+        """
+        Turn a stage exception into a result message.
         
         Args:
-            filepath: Path where transcript should be saved
-            url: Original video URL
-            metadata: Video metadata dictionary
-            transcript: Transcribed text
-        """
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"URL: {url}\n")
-            if metadata:
-                f.write(f"Creator: {metadata.get('uploader', 'Unknown')}\n")
-                f.write(f"Title: {metadata.get('title', 'Unknown')}\n")
-                f.write(f"Views: {metadata.get('view_count', 'Unknown')}\n")
-                f.write(f"Likes: {metadata.get('like_count', 'Unknown')}\n")
-                f.write(f"Duration: {metadata.get('duration', 'Unknown')}s\n")
-            f.write(f"Transcribed: {datetime.now().isoformat()}\n")
-            f.write(f"\n{'='*50}\n\n")
-            f.write(transcript)
-        
-        logger.info(f"Transcript saved to {filepath}")
-    
-    def process_urls(self, urls: List[str]) -> Tuple[int, int]:
+            error: Exception raised by one of the stages
+            
+        Returns:
+            Human-readable failure message
+        """
+        if isinstance(error, DownloadError):
+            return f"Download failed: {error}"
+        if isinstance(error, AudioExtractionError):
+            return f"Audio extraction failed: {error}"
+        if isinstance(error, TranscriptionError):
+            return f"Transcription failed: {error}"
+        return f"Unexpected error: {error}"
+    
+    def process_urls(
+        self,
+        urls: Iterable[str],
+        on_result: Optional[ResultCallback] = None
+    ) -> Tuple[int, int]:
         """
         Process multiple URLs.
         
+        Runs the URLs one after another, or through the staged pipeline
+        when ``config.pipeline`` is enabled. With an AsyncVideoDownloader
+        they always go through the asyncio pipeline, which fetches many
+        URLs' metadata at once. With a metadata store, all metadata is
+        prefetched in bulk first.
+        
+        ``urls`` may be any iterable, e.g. a UrlIngest streaming a huge
+        list; it is consumed as the processor gets to each URL. Metadata for
+        such an iterable is prefetched a window at a time instead.
+        
+        With a scheduler, prefetched URLs run longest first: a whole list at
+        once, an iterable one window at a time. ``on_result`` is still told
+        a list's original indices; for an iterable the index is the
+        position in the order the URLs ran.
+        
+        If the model fails to load in the background, no further URLs are
+        started: the jobs already under way finish (failing at their
+        transcription stage) and ModelLoadError is raised.
+        
         Args:
-            urls: List of URLs to process
-            
+            urls: URLs to process
+            on_result: Optional callback called with (index, success, message)
+                as each URL finishes
+                
         Returns:
             Tuple of (successful_count, failed_count)
+            
+        Raises:
+            ModelLoadError: If the model could not be loaded
+        """
+        if self.metadata is not None:
+            if isinstance(urls, Sequence):
+                self.prefetch(urls)
+                urls, on_result = self._schedule(urls, on_result)
+            else:
+                urls = self._prefetch_ahead(urls)
+        try:
+            counts = self._process_urls(urls, on_result)
+        finally:
+            # A batching sink holds the last transcripts until flushed
+            self.sink.flush()
+        # The model may have failed after the last URL was fed in
+        self.transcriber.check_model()
+        return counts
+    
+    def _prefetch_ahead(self, urls: Iterable[str]) -> Iterator[str]:
+        """Pass URLs through, prefetching each window's metadata before it is yielded."""
+        window = max(1, self.config.prefetch_chunk_size * self.config.prefetch_workers)
+        iterator = iter(urls)
+        while True:
+            chunk = list(islice(iterator, window))
+            if not chunk:
+                return
+            self.prefetch(chunk)
+            if self.scheduler is not None:
+                chunk = [chunk[i] for i in self.scheduler.order(chunk)]
+            yield from chunk
+    
+    def _schedule(
+        self,
+        urls: Sequence[str],
+        on_result: Optional[ResultCallback],
+    ) -> Tuple[Sequence[str], Optional[ResultCallback]]:
         """
+        Reorder prefetched URLs with the scheduler, if there is one.
+        
+        Returns:
+            The URLs in running order, and a callback that reports results
+            under their original indices
+        """
+        if self.scheduler is None:
+            return urls, on_result
+        order = self.scheduler.order(urls)
+        if on_result is None:
+            return [urls[i] for i in order], None
+        
+        def report(index: int, success: bool, message: str) -> None:
+            on_result(order[index], success, message)
+        
+        return [urls[i] for i in order], report
+    
+    def _process_urls(
+        self,
+        urls: Iterable[str],
+        on_result: Optional[ResultCallback]
+    ) -> Tuple[int, int]:
+        """Run the URLs through the configured driver; see ``process_urls``."""
+        if isinstance(self.downloader, AsyncVideoDownloader):
+            pipeline: StagedPipeline = AsyncPipeline(
+                self,
+                network_concurrency=self.config.network_concurrency,
+                download_workers=self.config.download_workers,
+                extract_workers=self.config.extract_workers,
+                transcribe_workers=self.config.transcribe_workers,
+                queue_size=self.config.pipeline_queue_size,
+                batch_size=self.config.batch_size,
+                batch_max_wait=self.config.batch_max_wait,
+                on_result=on_result,
+            )
+            return pipeline.run(urls)
+        
+        if self.config.pipeline:
+            pipeline = StagedPipeline(
+                self,
+                download_workers=self.config.download_workers,
+                extract_workers=self.config.extract_workers,
+                transcribe_workers=self.config.transcribe_workers,
+                queue_size=self.config.pipeline_queue_size,
+                batch_size=self.config.batch_size,
+                batch_max_wait=self.config.batch_max_wait,
+                on_result=on_result,
+            )
+            return pipeline.run(urls)
+        
         successful = 0
         failed = 0
         
+        total = len(urls) if isinstance(urls, Sequence) else None
         for i, url in enumerate(urls):
-            logger.info(f"[{i+1}/{len(urls)}] Processing: {url}")
+            self.transcriber.check_model()
+            logger.info(f"{progress(i, total)} Processing: {url}")
             success, message = self.process_url(url, i)
             
             if success:
@@ -160,5 +863,7 @@ class VideoProcessor:
             else:
                 failed += 1
                 logger.error(f"  ✗ {message}")
+            if on_result is not None:
+                on_result(i, success, message)
         
         return successful, failed
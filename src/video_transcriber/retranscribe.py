@@ -0,0 +1,232 @@
+"""Re-transcription of already extracted audio, e.g. to compare models."""
+
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .audio import AUDIO_FORMATS
+from .processor import VideoJob
+from .search import parse_transcript_file
+from .sinks import TextSink
+from .transcriber import AudioTranscriber
+
+logger = logging.getLogger(__name__)
+
+# File name stems that video keys are used as directly, e.g. "tiktok_123"
+_SAFE_KEY = re.compile(r"^[\w.-]+$")
+
+# Transcript header fields and the metadata keys TextSink writes them from
+_HEADER_FIELDS = (
+    ("creator", "uploader"),
+    ("title", "title"),
+    ("views", "view_count"),
+    ("likes", "like_count"),
+    ("duration", "duration"),
+)
+
+
+class DecodedAudioStore:
+    """
+    Directory of decoded clips as float32 ``.npy`` files, keyed by video.
+    
+    Each clip is decoded (by ffmpeg, for compressed formats) the first
+    time it is needed and saved at 16 kHz mono; every later run maps the
+    file into memory instead of decoding it again. Clips extracted as
+    ``.npy`` in the first place are mapped where they are. The arrays are
+    mapped copy-on-write, so the transcriber may modify them without
+    touching the files.
+    """
+    
+    def __init__(self, directory: str, decode: Callable[[str], Any]):
+        """
+        Initialize the store.
+        
+        Args:
+            directory: Directory for the decoded ``.npy`` files
+            decode: Decodes an audio file to an array of 16 kHz mono samples
+        """
+        self.directory = directory
+        self.decode = decode
+        self.decoded = 0
+        self.reused = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def path(self, video_key: str) -> str:
+        """Return where a video's decoded audio is kept."""
+        stem = video_key.replace(":", "_")
+        if not _SAFE_KEY.match(stem):
+            stem = hashlib.blake2b(video_key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{stem}.npy")
+    
+    def load(self, video_key: str, source: str) -> Any:
+        """
+        Return a video's samples, memory-mapped, decoding them on first use.
+        
+        Args:
+            video_key: Canonical video key
+            source: The extracted audio file to decode if not stored yet
+            
+        Returns:
+            float32 NumPy array of 16 kHz mono samples
+        """
+        import numpy as np
+        
+        if source.endswith(".npy"):
+            samples = np.load(source, mmap_mode="c")
+            if samples.dtype == np.float32:
+                self.reused += 1
+                return samples
+        
+        path = self.path(video_key)
+        if os.path.exists(path):
+            self.reused += 1
+        else:
+            samples = np.asarray(self.decode(source), dtype=np.float32)
+            partial = f"{path}.partial"
+            with open(partial, "wb") as f:
+                np.save(f, samples)
+            os.replace(partial, path)
+            self.decoded += 1
+        return np.load(path, mmap_mode="c")
+
+
+def find_audio(record: Dict, audio_dir: str) -> Optional[str]:
+    """
+    Find the extracted audio of a finished job.
+    
+    Args:
+        record: The job's manifest record
+        audio_dir: Directory the audio was extracted to
+        
+    Returns:
+        Path of the audio file, or None if it is gone (or was only ever streamed)
+    """
+    candidates = [record["audio_path"]] if record["audio_path"] else []
+    if record["base_name"]:
+        candidates.extend(
+            os.path.join(audio_dir, f"{record['base_name']}.{audio_format}")
+            for audio_format in AUDIO_FORMATS
+        )
+    return next((path for path in candidates if os.path.exists(path)), None)
+
+
+def header_info(transcript_path: Optional[str]) -> Dict:
+    """Recover a video's metadata from the header of its original text transcript."""
+    if not transcript_path or not transcript_path.endswith(".txt"):
+        return {}
+    if not os.path.exists(transcript_path):
+        return {}
+    fields = parse_transcript_file(transcript_path) or {}
+    info: Dict[str, Any] = {}
+    for name, key in _HEADER_FIELDS:
+        value = fields.get(name)
+        if value and value != "Unknown":
+            info[key] = value
+    if "duration" in info:
+        try:
+            info["duration"] = float(info["duration"].rstrip("s"))
+        except ValueError:
+            del info["duration"]
+    return info
+
+
+def retranscribe(
+    transcriber: AudioTranscriber,
+    records: Iterable[Dict],
+    store: DecodedAudioStore,
+    output_dir: str,
+    audio_dir: str,
+    model_name: str,
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    Transcribe finished jobs again from their audio, without the network.
+    
+    Each transcript is written under ``output_dir`` with the same file name
+    as the original, so the two can be compared side by side. Clips whose
+    new transcript exists already are skipped unless ``force`` is set, so
+    an interrupted run picks up where it stopped.
+    
+    Args:
+        transcriber: Transcriber with the model and options to compare
+        records: Manifest records of finished jobs
+        store: Store the decoded audio is read from
+        output_dir: Directory for the new transcripts
+        audio_dir: Directory the audio was originally extracted to
+        model_name: Model name recorded with each transcript
+        force: Transcribe clips again even if their new transcript exists
+        
+    Returns:
+        Number of clips "transcribed", "skipped", "missing" (no audio
+        left) and "failed"
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sink = TextSink()
+    counts: Counter = Counter()
+    for index, record in enumerate(records):
+        base_name = record["base_name"] or record["video_key"]
+        transcript_path = os.path.join(output_dir, f"{base_name}.txt")
+        if not force and os.path.exists(transcript_path):
+            counts["skipped"] += 1
+            continue
+        source = find_audio(record, audio_dir)
+        if source is None:
+            logger.warning(f"No audio left for {record['url']}, skipping")
+            counts["missing"] += 1
+            continue
+        
+        job = VideoJob(
+            url=record["url"],
+            video_key=record["video_key"],
+            index=index,
+            base_name=base_name,
+            video_path=record["video_path"] or "",
+            audio_path=source,
+            transcript_path=transcript_path,
+            info=header_info(record["transcript_path"]),
+        )
+        try:
+            samples = store.load(job.video_key, source)
+            result = transcriber.transcribe_result(samples)
+        except Exception as e:
+            logger.error(f"Failed to re-transcribe {base_name}: {e}")
+            counts["failed"] += 1
+            continue
+        sink.write(job, result, {
+            "model": model_name,
+            "engine": transcriber.engine_name,
+            "processing_seconds": time.monotonic() - job.started_at,
+            "stage_seconds": None,
+            "transcribed_at": datetime.now().isoformat(),
+        })
+        counts["transcribed"] += 1
+    return {name: counts[name] for name in ("transcribed", "skipped", "missing", "failed")}
+
+
+def output_label(model: str, engine: str, default_engine: str, options: Dict[str, Any]) -> str:
+    """
+    Name the directory for a model and option set's transcripts.
+    
+    Args:
+        model: Whisper model name
+        engine: Inference engine name
+        default_engine: Engine left out of the name
+        options: Settings besides the model that change the transcript
+            (see ``AudioTranscriber.fingerprint_options``); hashed into the
+            name so different option sets do not skip each other's clips
+            
+    Returns:
+        E.g. "small", "small-whisper-int8" or "small-3f2a9c1e"
+    """
+    parts: List[str] = [model]
+    if engine != default_engine:
+        parts.append(engine)
+    if options:
+        encoded = repr(sorted(options.items())).encode("utf-8")
+        parts.append(hashlib.blake2b(encoded, digest_size=4).hexdigest())
+    return "-".join(parts)
@@ -0,0 +1,207 @@
+"""Duration-aware job ordering and stage timeouts."""
+
+import json
+import logging
+import math
+import os
+import statistics
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+from .config import DEFAULT_JOB_SECONDS_PER_AUDIO_SECOND
+from .longform import LongAudioTranscriber
+from .prefetch import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+# Weight of each new measurement in the running rate estimate
+RATE_SMOOTHING = 0.2
+# Job events read from a previous run's metrics file to seed the rate
+HISTORY_EVENTS = 500
+# The processor's top-level stages; other recorded stages (audio loading,
+# VAD, model hooks) are timed inside these
+JOB_STAGES = ("metadata", "download", "extract", "transcribe")
+
+
+class CostModel:
+    """
+    Estimates how long a job will take from its video's duration.
+    
+    A job's cost is its duration times the measured rate, in seconds of
+    work per second of audio over all its stages. Long clips that are
+    transcribed in parallel chunks cost proportionally less. The rate
+    starts from an earlier run's metrics, if there are any, and follows
+    the jobs of this run as they finish. Safe to share between threads.
+    """
+    
+    def __init__(
+        self,
+        rate: float = DEFAULT_JOB_SECONDS_PER_AUDIO_SECOND,
+        long_audio: Optional[LongAudioTranscriber] = None,
+    ):
+        """
+        Initialize the model.
+        
+        Args:
+            rate: Initial seconds of work per second of audio
+            long_audio: Long-audio transcriber, whose chunking makes long
+                clips cheaper than their duration suggests
+        """
+        self.rate = rate
+        self.long_audio = long_audio
+        self.observed = 0
+        self._lock = threading.Lock()
+    
+    def estimate(self, duration: Optional[float]) -> Optional[float]:
+        """
+        Estimate a job's seconds of work.
+        
+        Args:
+            duration: Video duration in seconds, if known
+            
+        Returns:
+            Estimated seconds, or None if the duration is unknown
+        """
+        if duration is None:
+            return None
+        parallel = 1
+        if self.long_audio is not None and self.long_audio.should_split(duration):
+            chunks = math.ceil(duration / self.long_audio.chunk_seconds)
+            parallel = max(1, min(self.long_audio.workers, chunks))
+        return duration * self.rate / parallel
+    
+    def observe(self, audio_seconds: float, seconds: float) -> None:
+        """
+        Fold a finished job's measurement into the rate.
+        
+        Args:
+            audio_seconds: Length of the job's audio
+            seconds: Seconds spent in the job's stages
+        """
+        if audio_seconds <= 0:
+            return
+        with self._lock:
+            self.rate += RATE_SMOOTHING * (seconds / audio_seconds - self.rate)
+            self.observed += 1
+    
+    def load_history(self, jsonl_path: str) -> bool:
+        """
+        Seed the rate from the job events of an earlier run's metrics file.
+        
+        Uses the median over the most recent jobs, so a few outliers (a
+        stalled download) do not skew it.
+        
+        Args:
+            jsonl_path: Metrics JSONL event file
+            
+        Returns:
+            True if the file had usable job events
+        """
+        if not os.path.exists(jsonl_path):
+            return False
+        recent: deque = deque(maxlen=HISTORY_EVENTS)
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                rate = _event_rate(event)
+                if rate is not None:
+                    recent.append(rate)
+        if not recent:
+            return False
+        with self._lock:
+            self.rate = statistics.median(recent)
+        logger.info(
+            f"Estimating {self.rate:.3f}s of work per second of audio "
+            f"from {len(recent)} earlier jobs"
+        )
+        return True
+
+
+class JobScheduler:
+    """
+    Orders jobs longest-processing-time first, so long videos do not finish last.
+    
+    Pipeline workers take the next job from a shared queue whenever they
+    are free, which is greedy list scheduling; fed longest first, that is
+    LPT, which keeps the makespan within 4/3 of the optimum. In file
+    order, one long video near the end of a list leaves every other
+    worker idle while it finishes. Jobs are costed with a CostModel from
+    their prefetched durations.
+    """
+    
+    def __init__(self, metadata: MetadataStore, cost_model: CostModel):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            metadata: Prefetched metadata, for the durations
+            cost_model: Turns durations into estimated seconds of work
+        """
+        self.metadata = metadata
+        self.cost_model = cost_model
+    
+    def order(self, urls: Sequence[str]) -> List[int]:
+        """
+        Return the positions of the URLs in the order they should run.
+        
+        Jobs with an unknown duration are costed as the average known job.
+        Jobs of equal cost keep their input order.
+        
+        Args:
+            urls: URLs whose metadata has been prefetched
+            
+        Returns:
+            Indices into ``urls``, most expensive job first
+        """
+        estimates: Dict[int, float] = {}
+        for i, url in enumerate(urls):
+            estimate = self.cost_model.estimate(self.metadata.duration(url))
+            if estimate is not None:
+                estimates[i] = estimate
+        if not estimates:
+            return list(range(len(urls)))
+        average = sum(estimates.values()) / len(estimates)
+        order = sorted(range(len(urls)), key=lambda i: -estimates.get(i, average))
+        logger.info(
+            f"Scheduled {len(urls)} jobs longest first: about "
+            f"{sum(estimates.values()) / 60:.0f} minutes of work in {len(estimates)} "
+            f"jobs of known duration, the longest {max(estimates.values()) / 60:.1f} minutes"
+        )
+        return order
+
+
+def scaled_timeout(base: float, per_minute: float, duration: Optional[float]) -> float:
+    """
+    Scale a stage timeout with the length of the video.
+    
+    Args:
+        base: Timeout for a video of unknown or zero length
+        per_minute: Seconds added per minute of video
+        duration: Video duration in seconds, if known
+        
+    Returns:
+        Timeout in seconds
+    """
+    if not duration or per_minute <= 0:
+        return base
+    return base + per_minute * duration / 60
+
+
+def work_seconds(stages: Dict[str, float]) -> float:
+    """Sum a job's time in the top-level stages, leaving out nested ones."""
+    return sum(stages.get(name, 0.0) for name in JOB_STAGES)
+
+
+def _event_rate(event: Dict) -> Optional[float]:
+    """Return a metrics job event's seconds of work per second of audio, if it has one."""
+    if event.get("event") != "job" or not event.get("success") or event.get("cached"):
+        return None
+    audio_seconds = event.get("audio_seconds")
+    stages = event.get("stages")
+    if not audio_seconds or not stages:
+        return None
+    return work_seconds(stages) / float(audio_seconds)
@@ -0,0 +1,287 @@
+"""Incremental full-text search over transcripts with SQLite FTS5."""
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .engines import TranscriptionResult
+from .sinks import BatchedSQLiteSink
+from .utils import video_key
+
+if TYPE_CHECKING:
+    from .processor import VideoJob
+
+logger = logging.getLogger(__name__)
+
+# The rule TextSink writes between a transcript's header and its text
+HEADER_RULE = "=" * 50
+
+# Passages are the unit of search: one per segment, so every hit comes
+# with the time it was said. Transcripts without segments are one passage.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    video_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    creator TEXT,
+    published TEXT,
+    transcribed_at TEXT,
+    location TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_creator ON documents (creator);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    video_key TEXT NOT NULL,
+    start REAL,
+    end REAL
+);
+CREATE INDEX IF NOT EXISTS passages_video_key ON passages (video_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS passage_text USING fts5(
+    text, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# (start, end, text); start and end are None for untimed text
+Passage = Tuple[Optional[float], Optional[float], str]
+
+
+class SearchIndex(BatchedSQLiteSink):
+    """
+    Full-text index of transcripts, kept up to date as transcripts are saved.
+    
+    As a secondary sink next to the text or SQLite sink, every saved
+    transcript is indexed, batched like the SQLite sink. Each segment is
+    indexed separately so hits can be shown with their timestamps; a phrase
+    is only found within one segment. Indexing a video again replaces it.
+    """
+    
+    secondary = True
+    schema = _SCHEMA
+    
+    def write(
+        self,
+        job: "VideoJob",
+        result: TranscriptionResult,
+        details: Dict[str, Any],
+    ) -> str:
+        """Index a saved transcript."""
+        info = job.info or {}
+        passages: List[Passage] = [
+            (segment["start"], segment["end"], segment["text"])
+            for segment in result.get("segments") or []
+        ] or [(None, None, result["text"])]
+        self.add(
+            job.video_key,
+            job.url,
+            passages,
+            title=info.get("title"),
+            creator=info.get("uploader"),
+            published=_iso_date(info.get("upload_date")),
+            transcribed_at=details.get("transcribed_at"),
+            location=job.transcript_path,
+        )
+        return self.path
+    
+    def has(self, video_key: str, location: Optional[str]) -> bool:
+        """Return True if the video is indexed."""
+        return self._exists("SELECT 1 FROM documents WHERE video_key = ?", (video_key,))
+    
+    def add(
+        self,
+        video_key: str,
+        url: str,
+        passages: Sequence[Passage],
+        title: Optional[str] = None,
+        creator: Optional[str] = None,
+        published: Optional[str] = None,
+        transcribed_at: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> None:
+        """
+        Index one transcript.
+        
+        Args:
+            video_key: Canonical video key
+            url: Video URL
+            passages: (start, end, text) tuples; times may be None
+            title: Video title
+            creator: Uploader name
+            published: Upload date as YYYY-MM-DD
+            transcribed_at: ISO timestamp of the transcription
+            location: Where the transcript itself is stored
+        """
+        document = (video_key, url, title, creator, published, transcribed_at, location)
+        self._add((document, [passage for passage in passages if passage[2].strip()]))
+    
+    def search(
+        self,
+        query: str,
+        creator: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the passages that best match a query.
+        
+        Args:
+            query: FTS5 query; words are ANDed, "quoted text" is a phrase,
+                and OR, NOT and prefix* work as usual
+            creator: Only videos by this creator
+            since: Only videos published (or, if unknown, transcribed) on or
+                after this YYYY-MM-DD date
+            until: Likewise, on or before this date
+            limit: Most passages to return
+            
+        Returns:
+            Hits ordered by relevance, each with the video's URL, title,
+            creator, date, location, and the passage's start, end and snippet
+        """
+        clauses = ["passage_text MATCH ?"]
+        params: List[Any] = [query]
+        date = "COALESCE(d.published, substr(d.transcribed_at, 1, 10))"
+        if creator is not None:
+            clauses.append("d.creator = ?")
+            params.append(creator)
+        if since is not None:
+            clauses.append(f"{date} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{date} <= ?")
+            params.append(until)
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.video_key, d.url, d.title, d.creator, d.location, "
+                f"{date} AS date, p.start, p.end, "
+                "snippet(passage_text, 0, '[', ']', '…', 16) AS snippet "
+                "FROM passage_text "
+                "JOIN passages p ON p.id = passage_text.rowid "
+                "JOIN documents d ON d.video_key = p.video_key "
+                f"WHERE {' AND '.join(clauses)} "
+                "ORDER BY bm25(passage_text) LIMIT ?",
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def _store(self, item: Any) -> None:
+        """Replace a video's document row and passages."""
+        document, passages = item
+        video_key = document[0]
+        self._conn.execute(
+            "DELETE FROM passage_text WHERE rowid IN "
+            "(SELECT id FROM passages WHERE video_key = ?)",
+            (video_key,),
+        )
+        self._conn.execute("DELETE FROM passages WHERE video_key = ?", (video_key,))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)", document
+        )
+        for start, end, text in passages:
+            passage_id = self._conn.execute(
+                "INSERT INTO passages (video_key, start, end) VALUES (?, ?, ?)",
+                (video_key, start, end),
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO passage_text (rowid, text) VALUES (?, ?)", (passage_id, text.strip())
+            )
+
+
+def parse_transcript_file(path: str) -> Optional[Dict[str, str]]:
+    """
+    Read a transcript file written by TextSink.
+    
+    Args:
+        path: Path to the ``.txt`` transcript
+        
+    Returns:
+        The header fields keyed by lowercase name ("url", "creator",
+        "title", "transcribed", ...) plus "text", or None if the file does
+        not have the expected header
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    header, rule, text = content.partition(f"\n{HEADER_RULE}\n")
+    if not rule:
+        return None
+    fields = {}
+    for line in header.splitlines():
+        name, separator, value = line.partition(": ")
+        if separator:
+            fields[name.strip().lower()] = value.strip()
+    if "url" not in fields:
+        return None
+    fields["text"] = text.strip()
+    return fields
+
+
+def iter_transcript_files(directory: str) -> Iterator[str]:
+    """Yield the paths of the ``.txt`` transcripts in a directory, sorted."""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            yield os.path.join(directory, name)
+
+
+def backfill(index: SearchIndex, directory: str) -> Tuple[int, int]:
+    """
+    Index existing text transcripts that are not in the index yet.
+    
+    Text files have no segment times, so each is indexed as one passage.
+    
+    Args:
+        index: Index to add the transcripts to
+        directory: Directory of ``.txt`` transcripts
+        
+    Returns:
+        Tuple of (transcripts indexed, files skipped as unreadable)
+    """
+    indexed = 0
+    skipped = 0
+    for path in iter_transcript_files(directory):
+        try:
+            fields = parse_transcript_file(path)
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+            fields = None
+        if fields is None:
+            skipped += 1
+            continue
+        url = fields["url"]
+        key = video_key(url)
+        if index.has(key, path):
+            continue
+        index.add(
+            key,
+            url,
+            [(None, None, fields["text"])],
+            title=_known(fields.get("title")),
+            creator=_known(fields.get("creator")),
+            transcribed_at=fields.get("transcribed"),
+            location=path,
+        )
+        indexed += 1
+    index.flush()
+    return indexed, skipped
+
+
+def format_timestamp(seconds: Optional[float]) -> str:
+    """Format a time in seconds as [m:ss] or [h:mm:ss]; empty if unknown."""
+    if seconds is None:
+        return ""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"[{hours}:{minutes:02d}:{secs:02d}]"
+    return f"[{minutes}:{secs:02d}]"
+
+
+def _iso_date(upload_date: Optional[str]) -> Optional[str]:
+    """Turn yt-dlp's YYYYMMDD upload date into YYYY-MM-DD."""
+    if not upload_date or len(upload_date) != 8 or not upload_date.isdigit():
+        return None
+    return f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
+
+
+def _known(value: Optional[str]) -> Optional[str]:
+    """Map the header's "Unknown" placeholder to None."""
+    return None if value in (None, "", "Unknown") else value
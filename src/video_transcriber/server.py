@@ -0,0 +1,358 @@
+"""Resident daemon that keeps the model loaded and serves a local job API."""
+
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import ServerError
+from .processor import VideoProcessor
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_QUEUED = "queued"
+SUBMISSION_RUNNING = "running"
+SUBMISSION_DONE = "done"
+
+# Finished submissions kept around for status queries
+MAX_FINISHED_SUBMISSIONS = 1000
+
+# Largest request body the server will read
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class Submission:
+    """A batch of URLs submitted to the server, and the outcome of each."""
+    
+    def __init__(self, urls: List[str]):
+        """
+        Create a queued submission.
+        
+        Args:
+            urls: URLs to process, in order
+        """
+        self.id = uuid.uuid4().hex
+        self.urls = urls
+        self.state = SUBMISSION_QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.results: List[Optional[Tuple[bool, str]]] = [None] * len(urls)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the submission's status as a JSON-serializable dictionary."""
+        finished = [result for result in self.results if result is not None]
+        return {
+            "id": self.id,
+            "state": self.state,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "total": len(self.urls),
+            "successful": sum(1 for success, _ in finished if success),
+            "failed": sum(1 for success, _ in finished if not success),
+            "results": [
+                {
+                    "url": url,
+                    "success": result[0] if result else None,
+                    "message": result[1] if result else None,
+                }
+                for url, result in zip(self.urls, self.results)
+            ],
+        }
+
+
+class TranscriptionServer:
+    """
+    Long-running job server around one warm VideoProcessor.
+    
+    The processor (and with it the loaded Whisper model, the downloader and
+    any worker pool) is created once and reused for every submission, so
+    small batches don't pay the model load time. Submissions are queued and
+    run one at a time by a single worker thread; a submission itself runs
+    through ``VideoProcessor.process_urls``, so pipeline mode still overlaps
+    the URLs within it.
+    
+    The HTTP API only listens on the given host (localhost by default):
+    
+    - ``POST /jobs`` with ``{"urls": [...]}`` queues a submission
+    - ``GET /jobs/<id>`` returns a submission's status and per-URL results
+    - ``GET /status`` returns the server's model, queue and totals
+    """
+    
+    def __init__(self, processor: VideoProcessor, host: str, port: int):
+        """
+        Bind the server.
+        
+        Args:
+            processor: Fully set up processor to run submissions with
+            host: Interface to listen on
+            port: TCP port to listen on (0 picks a free port)
+        """
+        self.processor = processor
+        self.started_at = time.time()
+        self.successful = 0
+        self.failed = 0
+        
+        self._lock = threading.Lock()
+        self._submissions: "OrderedDict[str, Submission]" = OrderedDict()
+        self._queue: queue.Queue = queue.Queue()
+        self._current: Optional[Submission] = None
+        self._stopping = threading.Event()
+        
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._worker = threading.Thread(
+            target=self._run_submissions, name="server-worker", daemon=True
+        )
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the server is listening on."""
+        host, port = self._httpd.server_address[:2]
+        return str(host), port
+    
+    def serve_forever(self) -> None:
+        """Start the worker thread and handle requests until shutdown() is called."""
+        self._worker.start()
+        host, port = self.address
+        logger.info(f"Listening on http://{host}:{port}")
+        self._httpd.serve_forever()
+    
+    def shutdown(self) -> None:
+        """
+        Stop accepting requests and wait for the running submission to finish.
+        
+        Submissions that have not started yet are dropped.
+        """
+        self._stopping.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._queue.put(None)
+        if self._worker.is_alive():
+            self._worker.join()
+    
+    def submit(self, urls: List[str]) -> Submission:
+        """
+        Queue URLs for processing.
+        
+        Args:
+            urls: URLs to process
+            
+        Returns:
+            The queued submission
+        """
+        submission = Submission(urls)
+        with self._lock:
+            self._submissions[submission.id] = submission
+        self._queue.put(submission)
+        logger.info(f"Queued submission {submission.id} with {len(urls)} URLs")
+        return submission
+    
+    def get(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Return a submission's status, or None if it is unknown."""
+        with self._lock:
+            submission = self._submissions.get(submission_id)
+            return submission.to_dict() if submission else None
+    
+    def status(self) -> Dict[str, Any]:
+        """Return the server's overall status."""
+        with self._lock:
+            queued = sum(
+                1 for s in self._submissions.values() if s.state == SUBMISSION_QUEUED
+            )
+            return {
+                "model": self.processor.config.whisper_model,
+                "uptime": time.time() - self.started_at,
+                "running": self._current.id if self._current else None,
+                "queued": queued,
+                "successful": self.successful,
+                "failed": self.failed,
+                "escalation_rate": self.processor.transcriber.escalation_rate,
+            }
+    
+    def _run_submissions(self) -> None:
+        """Worker thread: process queued submissions one at a time."""
+        while True:
+            submission = self._queue.get()
+            if submission is None or self._stopping.is_set():
+                return
+            with self._lock:
+                submission.state = SUBMISSION_RUNNING
+                submission.started_at = time.time()
+                self._current = submission
+            logger.info(f"Running submission {submission.id}")
+            
+            def on_result(index: int, success: bool, message: str) -> None:
+                with self._lock:
+                    submission.results[index] = (success, message)
+            
+            try:
+                self.processor.process_urls(submission.urls, on_result=on_result)
+            except Exception as e:
+                logger.error(f"Submission {submission.id} failed: {e}")
+            
+            with self._lock:
+                for index, result in enumerate(submission.results):
+                    if result is None:
+                        submission.results[index] = (False, "Not processed")
+                self.successful += sum(1 for success, _ in submission.results if success)
+                self.failed += sum(1 for success, _ in submission.results if not success)
+                submission.state = SUBMISSION_DONE
+                submission.finished_at = time.time()
+                self._current = None
+                self._forget_old_submissions()
+            logger.info(f"Finished submission {submission.id}")
+    
+    def _forget_old_submissions(self) -> None:
+        """Drop the oldest finished submissions beyond MAX_FINISHED_SUBMISSIONS."""
+        finished = [
+            submission_id for submission_id, s in self._submissions.items()
+            if s.state == SUBMISSION_DONE
+        ]
+        for submission_id in finished[:max(0, len(finished) - MAX_FINISHED_SUBMISSIONS)]:
+            del self._submissions[submission_id]
+    
+    def _handler_class(self) -> type:
+        """Build the request handler class bound to this server."""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path == "/status":
+                    self._reply(200, server.status())
+                elif self.path.startswith("/jobs/"):
+                    record = server.get(self.path[len("/jobs/"):])
+                    if record is None:
+                        self._reply(404, {"error": "Unknown job"})
+                    else:
+                        self._reply(200, record)
+                else:
+                    self._reply(404, {"error": "Not found"})
+            
+            def do_POST(self) -> None:
+                if self.path != "/jobs":
+                    self._reply(404, {"error": "Not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    if length > MAX_REQUEST_BYTES:
+                        raise ValueError("request body too large")
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    urls = body.get("urls")
+                    if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+                        raise ValueError("expected {\"urls\": [...]}")
+                except (ValueError, AttributeError) as e:
+                    self._reply(400, {"error": f"Bad request: {e}"})
+                    return
+                submission = server.submit(urls)
+                self._reply(202, {"id": submission.id, "state": submission.state})
+            
+            def _reply(self, code: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"{self.address_string()} {format % args}")
+        
+        return Handler
+
+
+class TranscriptionClient:
+    """Thin client for a running TranscriptionServer."""
+    
+    def __init__(self, server_url: str, timeout: int = 30):
+        """
+        Initialize the client.
+        
+        Args:
+            server_url: Base URL of the server, e.g. ``http://127.0.0.1:8765``
+            timeout: Timeout for each HTTP request in seconds
+        """
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+    
+    def submit(self, urls: List[str]) -> str:
+        """
+        Submit URLs for processing.
+        
+        Args:
+            urls: URLs to process
+            
+        Returns:
+            ID of the queued submission
+            
+        Raises:
+            ServerError: If the server cannot be reached or rejects the request
+        """
+        submission_id: str = self._request("POST", "/jobs", {"urls": urls})["id"]
+        return submission_id
+    
+    def get(self, submission_id: str) -> Dict[str, Any]:
+        """Return a submission's status (see ``Submission.to_dict``)."""
+        return self._request("GET", f"/jobs/{submission_id}")
+    
+    def status(self) -> Dict[str, Any]:
+        """Return the server's overall status."""
+        return self._request("GET", "/status")
+    
+    def wait(self, submission_id: str, poll_interval: float = 1.0) -> Dict[str, Any]:
+        """
+        Poll a submission until it is done, logging each URL as it finishes.
+        
+        Args:
+            submission_id: ID returned by submit()
+            poll_interval: Seconds between status requests
+            
+        Returns:
+            The finished submission's status
+        """
+        reported = set()
+        while True:
+            record = self.get(submission_id)
+            for index, result in enumerate(record["results"]):
+                if result["success"] is None or index in reported:
+                    continue
+                reported.add(index)
+                if result["success"]:
+                    logger.info(f"  ✓ {result['url']}: {result['message']}")
+                else:
+                    logger.error(f"  ✗ {result['url']}: {result['message']}")
+            if record["state"] == SUBMISSION_DONE:
+                return record
+            time.sleep(poll_interval)
+    
+    def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a JSON request and decode the JSON reply."""
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            self.server_url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                reply: Dict[str, Any] = json.loads(response.read())
+                return reply
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise ServerError(f"Server returned {e.code}: {detail}")
+        except (urllib.error.URLError, OSError) as e:
+            raise ServerError(f"Could not reach server at {self.server_url}: {e}")
@@ -0,0 +1,408 @@
+"""Output sinks that finished transcripts are written to."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence
+
+from .engines import TranscriptionResult
+
+if TYPE_CHECKING:
+    from .processor import VideoJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK_BATCH_SIZE = 100
+DEFAULT_SINK_MAX_DELAY = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    base_name TEXT,
+    video_id TEXT,
+    title TEXT,
+    uploader TEXT,
+    upload_date TEXT,
+    duration REAL,
+    view_count INTEGER,
+    like_count INTEGER,
+    metadata TEXT,
+    text TEXT NOT NULL,
+    language TEXT,
+    confidence REAL,
+    model TEXT,
+    engine TEXT,
+    processing_seconds REAL,
+    stage_seconds TEXT,
+    transcribed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_transcribed_at ON transcripts (transcribed_at);
+CREATE INDEX IF NOT EXISTS transcripts_uploader ON transcripts (uploader);
+CREATE TABLE IF NOT EXISTS segments (
+    video_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    avg_logprob REAL,
+    no_speech_prob REAL,
+    PRIMARY KEY (video_key, position)
+);
+"""
+
+
+class TranscriptSink(ABC):
+    """
+    Destination for finished transcripts.
+    
+    ``write`` returns the transcript's location, which the processor
+    records in the job manifest; ``has`` is given that location back to
+    decide whether a job's transcript still exists on a rerun. Secondary
+    sinks, such as a search index, are written to but never decide
+    whether a job is done.
+    """
+    
+    secondary = False
+    
+    @abstractmethod
+    def write(
+        self,
+        job: "VideoJob",
+        result: TranscriptionResult,
+        details: Dict[str, Any],
+    ) -> str:
+        """
+        Write one transcript.
+        
+        Args:
+            job: The finished job, with its URL, paths and metadata
+            result: The transcription result
+            details: Model name, engine and timings of the job
+            
+        Returns:
+            Where the transcript was written
+        """
+    
+    @abstractmethod
+    def has(self, video_key: str, location: Optional[str]) -> bool:
+        """
+        Return True if a transcript for the job has been written.
+        
+        Args:
+            video_key: The job's canonical video key
+            location: Where ``write`` said the transcript went, or the job's
+                transcript path if it was never written
+        """
+    
+    def flush(self) -> None:
+        """Make everything written so far durable."""
+    
+    def close(self) -> None:
+        """Flush and release resources."""
+        self.flush()
+
+
+class TextSink(TranscriptSink):
+    """One text file per video, with a metadata header above the transcript."""
+    
+    def write(
+        self,
+        job: "VideoJob",
+        result: TranscriptionResult,
+        details: Dict[str, Any],
+    ) -> str:
+        """Write the transcript to ``job.transcript_path``."""
+        metadata = job.info
+        with open(job.transcript_path, "w", encoding="utf-8") as f:
+            f.write(f"URL: {job.url}\n")
+            if metadata:
+                f.write(f"Creator: {metadata.get('uploader', 'Unknown')}\n")
+                f.write(f"Title: {metadata.get('title', 'Unknown')}\n")
+                f.write(f"Views: {metadata.get('view_count', 'Unknown')}\n")
+                f.write(f"Likes: {metadata.get('like_count', 'Unknown')}\n")
+                f.write(f"Duration: {metadata.get('duration', 'Unknown')}s\n")
+            f.write(f"Transcribed: {details['transcribed_at']}\n")
+            f.write(f"\n{'='*50}\n\n")
+            f.write(result["text"])
+        
+        logger.info(f"Transcript saved to {job.transcript_path}")
+        return job.transcript_path
+    
+    def has(self, video_key: str, location: Optional[str]) -> bool:
+        """Return True if the transcript file exists."""
+        return location is not None and os.path.exists(location)
+
+
+class BatchedSQLiteSink(TranscriptSink):
+    """
+    Base for sinks that buffer writes and commit them to SQLite in batches.
+    
+    Writes are committed in batches of ``batch_size``, or once the oldest
+    buffered one is ``max_delay`` seconds old, so the per-transaction cost
+    is paid once per batch instead of once per video. A crash loses at most
+    the buffered writes. Subclasses set ``schema`` and implement ``_store``.
+    
+    The sink is safe to share between pipeline worker threads.
+    """
+    
+    schema = ""
+    
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_SINK_BATCH_SIZE,
+        max_delay: float = DEFAULT_SINK_MAX_DELAY,
+    ):
+        """
+        Open (or create) the database.
+        
+        Args:
+            path: Path to the SQLite database file
+            batch_size: Transcripts committed per transaction
+            max_delay: Longest time in seconds a transcript waits for its batch
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._pending: List[Any] = []
+        self._oldest: Optional[float] = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.schema)
+        logger.debug(f"Opened {type(self).__name__} at {path}")
+    
+    def flush(self) -> None:
+        """Commit all buffered writes."""
+        with self._lock:
+            self._commit()
+    
+    def close(self) -> None:
+        """Commit buffered writes and close the database."""
+        with self._lock:
+            self._commit()
+            self._conn.close()
+    
+    def _add(self, item: Any) -> None:
+        """Buffer one write, committing the batch if it is due."""
+        with self._lock:
+            self._pending.append(item)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.max_delay
+            )
+            if due:
+                self._commit()
+    
+    def _exists(self, query: str, params: Sequence[Any]) -> bool:
+        """Return True if a query over committed rows returns anything."""
+        with self._lock:
+            return self._conn.execute(query, params).fetchone() is not None
+    
+    def _commit(self) -> None:
+        """Write the buffered items in one transaction; the caller holds the lock."""
+        if not self._pending:
+            return
+        with self._conn:
+            for item in self._pending:
+                self._store(item)
+        logger.debug(f"Committed {len(self._pending)} transcripts to {self.path}")
+        self._pending = []
+        self._oldest = None
+    
+    @abstractmethod
+    def _store(self, item: Any) -> None:
+        """Write one buffered item inside the open transaction."""
+
+
+class SQLiteSink(BatchedSQLiteSink):
+    """
+    All transcripts in one SQLite database, with their segments and metadata.
+    
+    ``has`` does not report buffered transcripts as written until they are
+    committed, so after a crash they are redone on the next run. Writing a
+    video again replaces its row.
+    """
+    
+    schema = _SCHEMA
+    
+    def write(
+        self,
+        job: "VideoJob",
+        result: TranscriptionResult,
+        details: Dict[str, Any],
+    ) -> str:
+        """Buffer the transcript, committing the batch if it is due."""
+        info = job.info or {}
+        row = (
+            job.video_key,
+            job.url,
+            job.base_name,
+            info.get("id"),
+            info.get("title"),
+            info.get("uploader"),
+            info.get("upload_date"),
+            info.get("duration"),
+            info.get("view_count"),
+            info.get("like_count"),
+            json.dumps(info) if info else None,
+            result["text"],
+            result.get("language"),
+            result.get("confidence"),
+            details.get("model"),
+            details.get("engine"),
+            details.get("processing_seconds"),
+            json.dumps(details["stage_seconds"]) if details.get("stage_seconds") else None,
+            details["transcribed_at"],
+        )
+        segments = [
+            (
+                job.video_key,
+                position,
+                segment["start"],
+                segment["end"],
+                segment["text"],
+                segment.get("avg_logprob"),
+                segment.get("no_speech_prob"),
+            )
+            for position, segment in enumerate(result.get("segments") or [])
+        ]
+        self._add((row, segments))
+        logger.info(f"Transcript stored in {self.path}")
+        return f"{self.path}#{job.video_key}"
+    
+    def has(self, video_key: str, location: Optional[str]) -> bool:
+        """Return True if the video's transcript is committed to the database."""
+        return self._exists("SELECT 1 FROM transcripts WHERE video_key = ?", (video_key,))
+    
+    def get(self, video_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one stored transcript.
+        
+        Args:
+            video_key: Canonical video key
+            
+        Returns:
+            The transcript's columns plus its "segments", or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM transcripts WHERE video_key = ?", (video_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            segments = self._conn.execute(
+                "SELECT start, end, text, avg_logprob, no_speech_prob FROM segments "
+                "WHERE video_key = ? ORDER BY position",
+                (video_key,),
+            ).fetchall()
+        return {**dict(row), "segments": [dict(segment) for segment in segments]}
+    
+    def iter_transcripts(
+        self,
+        since: Optional[str] = None,
+        uploader: Optional[str] = None,
+        with_segments: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored transcripts in the order they were written.
+        
+        Reads through a separate connection, so rows are streamed without
+        holding up writers.
+        
+        Args:
+            since: Only transcripts written at or after this ISO timestamp
+            uploader: Only transcripts by this uploader
+            with_segments: Include each transcript's "segments"
+            
+        Yields:
+            One dictionary of columns per transcript
+        """
+        clauses = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("transcribed_at >= ?")
+            params.append(since)
+        if uploader is not None:
+            clauses.append("uploader = ?")
+            params.append(uploader)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        reader = sqlite3.connect(self.path)
+        reader.row_factory = sqlite3.Row
+        try:
+            rows = reader.execute(
+                f"SELECT * FROM transcripts{where} ORDER BY transcribed_at, video_key", params
+            )
+            for row in rows:
+                record = dict(row)
+                if with_segments:
+                    record["segments"] = [
+                        dict(segment) for segment in reader.execute(
+                            "SELECT start, end, text, avg_logprob, no_speech_prob "
+                            "FROM segments WHERE video_key = ? ORDER BY position",
+                            (record["video_key"],),
+                        )
+                    ]
+                yield record
+        finally:
+            reader.close()
+    
+    def _store(self, item: Any) -> None:
+        """Replace a video's transcript row and segments."""
+        row, segments = item
+        self._conn.execute("DELETE FROM segments WHERE video_key = ?", (row[0],))
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO transcripts VALUES ({', '.join('?' * len(row))})", row
+        )
+        self._conn.executemany("INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?, ?)", segments)
+
+
+class MultiSink(TranscriptSink):
+    """Writes every transcript to several sinks; the first primary one's location is reported."""
+    
+    def __init__(self, sinks: Sequence[TranscriptSink]):
+        """
+        Initialize the sink.
+        
+        Args:
+            sinks: Sinks to write to, in order
+        """
+        self.sinks = list(sinks)
+    
+    def write(
+        self,
+        job: "VideoJob",
+        result: TranscriptionResult,
+        details: Dict[str, Any],
+    ) -> str:
+        """Write the transcript to each sink."""
+        locations = [
+            (sink.secondary, sink.write(job, result, details)) for sink in self.sinks
+        ]
+        return min(locations, key=lambda pair: pair[0])[1]
+    
+    def has(self, video_key: str, location: Optional[str]) -> bool:
+        """Return True only if every primary sink has the transcript."""
+        return all(
+            sink.has(video_key, location) for sink in self.sinks if not sink.secondary
+        )
+    
+    def flush(self) -> None:
+        """Flush each sink."""
+        for sink in self.sinks:
+            sink.flush()
+    
+    def close(self) -> None:
+        """Close each sink."""
+        for sink in self.sinks:
+            sink.close()
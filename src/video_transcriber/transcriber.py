@@ -1,50 +1,512 @@
 """Audio transcription functionality."""
 
 import logging
-from typing import Any
+import threading
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+from . import metrics
+from .audio import is_pcm_audio, load_pcm_audio
+from .cache import audio_fingerprint
+from .engines import (
+    DEFAULT_ENGINE,
+    BackgroundEngine,
+    Segment,
+    TranscriptionResult,
+    load_engine,
+    to_result,
+)
 from .exceptions import TranscriptionError
 
+if TYPE_CHECKING:
+    from .checkpoint import SegmentCheckpointer
+    from .vad import EnergyVAD, TimestampMap
+
 logger = logging.getLogger(__name__)
 
+# Whisper's own thresholds for deciding a greedy decode needs a retry at a
+# higher temperature, or that a window contains no speech
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+@dataclass(frozen=True)
+class CascadeThresholds:
+    """Segment scores below which a clip is re-transcribed with the larger cascade model."""
+    
+    # Escalate when any segment's mean token log-probability is lower than this
+    logprob: float = LOGPROB_THRESHOLD
+    # ... or its text compresses better than this (a sign of repetition loops)
+    compression_ratio: float = COMPRESSION_RATIO_THRESHOLD
+    # ... or the model is less sure than this that it contains speech at all
+    no_speech: float = NO_SPEECH_THRESHOLD
+    
+    def is_low_confidence(
+        self,
+        avg_logprob: float,
+        compression_ratio: float,
+        no_speech_prob: float
+    ) -> bool:
+        """Return True if a segment with these scores should be re-transcribed."""
+        return (
+            avg_logprob < self.logprob
+            or compression_ratio > self.compression_ratio
+            or no_speech_prob > self.no_speech
+        )
+
 
 class AudioTranscriber:
     """Handles audio transcription using Whisper."""
     
-    def __init__(self, model: Any):
+    def __init__(
+        self,
+        model: Any,
+        decode_options: Optional[Dict] = None,
+        vad: Optional["EnergyVAD"] = None,
+        cascade_model: Optional[str] = None,
+        cascade_thresholds: Optional[CascadeThresholds] = None,
+        load_model: Callable[[str], Any] = load_engine,
+        checkpointer: Optional["SegmentCheckpointer"] = None,
+    ):
         """
         Initialize the audio transcriber.
         
         Args:
-            model: Whisper model instance
+            model: Inference engine (see ``engines``), or any Whisper-like
+                model with a ``transcribe`` method
+            decode_options: Extra keyword arguments for ``model.transcribe``
+            vad: Optional voice activity detector used to cut audio down to
+                its speech regions before it reaches the model
+            cascade_model: Size of a larger Whisper model that clips are
+                re-transcribed with when ``model`` is not confident about
+                them. It is loaded the first time a clip needs it.
+            cascade_thresholds: When a clip counts as low confidence
+            load_model: Loads the cascade model given its size name
+            checkpointer: Optional checkpointer that transcribes long clips
+                in spans saved to disk, so a crash does not lose them
         """
         self.model = model
+        self.engine_name = getattr(model, "name", DEFAULT_ENGINE)
+        self.decode_options = dict(decode_options or {})
+        self.vad = vad
+        self.cascade_model = cascade_model
+        self.cascade_thresholds = cascade_thresholds or CascadeThresholds()
+        self.load_model = load_model
+        self.checkpointer = checkpointer
+        # Clips the first model of the cascade transcribed, and how many of
+        # those were handed on to the cascade model
+        self.cascade_clips = 0
+        self.escalations = 0
+        # Whisper installs per-call hooks on the model, so concurrent
+        # transcribe() calls on one model must be serialized.
+        self._lock = threading.Lock()
+        self._cascade: Any = None
+        self._cascade_lock = threading.Lock()
+        self._cascade_load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
     
-    def transcribe(self, audio_path: str) -> str:
+    @property
+    def fingerprint_options(self) -> Dict[str, Any]:
+        """Settings besides the model that change the transcript, e.g. for cache keys."""
+        options: Dict[str, Any] = dict(self.decode_options)
+        if self.engine_name != DEFAULT_ENGINE:
+            options["engine"] = self.engine_name
+        if self.vad is not None:
+            options["vad"] = self.vad.settings
+        if self.cascade_model is not None:
+            options["cascade"] = {"model": self.cascade_model, **asdict(self.cascade_thresholds)}
+        return options
+    
+    @property
+    def whisper_model(self) -> Optional[Any]:
+        """The openai-whisper model behind the engine, if any, for batched decoding."""
+        model = getattr(self.model, "whisper_model", None)
+        if model is None and hasattr(self.model, "dims"):
+            # A bare openai-whisper model
+            model = self.model
+        return model
+    
+    def check_model(self, wait: bool = False) -> None:
         """
-        Transcribe audio file using Whisper.
+        Raise if the model, loading in the background, could not be loaded.
         
         Args:
-            audio_path: Path to audio file
+            wait: Wait for the model to finish loading first, rather than
+                only reporting a failure that has already happened
+                
+        Raises:
+            ModelLoadError: If the model could not be loaded
+        """
+        if isinstance(self.model, BackgroundEngine):
+            if wait:
+                self.model.wait()
+            else:
+                self.model.check()
+    
+    @property
+    def escalation_rate(self) -> Optional[float]:
+        """Fraction of clips re-transcribed with the cascade model, or None before any."""
+        if not self.cascade_clips:
+            return None
+        return self.escalations / self.cascade_clips
+    
+    def needs_escalation(self, segments: Sequence[Segment]) -> bool:
+        """
+        Decide whether a transcript should be redone with the cascade model.
+        
+        Args:
+            segments: Segments of the first model's result
             
         Returns:
-            Transcribed text
+            True if a cascade model is configured and any segment scores
+            below the cascade thresholds
+        """
+        if self.cascade_model is None:
+            return False
+        return any(
+            self.cascade_thresholds.is_low_confidence(
+                segment.get("avg_logprob", 0.0),
+                segment.get("compression_ratio", 0.0),
+                segment.get("no_speech_prob", 0.0),
+            )
+            for segment in segments
+        )
+    
+    def load_audio(self, audio: Union[str, Any]) -> Union[str, Any]:
+        """
+        Load audio into the form that will be handed to the model.
+        
+        PCM files written by AudioExtractor (``.wav``/``.npy``) are read
+        directly into a float32 array, so Whisper does not have to spawn
+        ffmpeg to decode them again. Other formats are passed through as a
+        path for Whisper to decode itself, and arrays are returned as-is.
+        
+        Args:
+            audio: Path to audio file, or an array of 16 kHz mono samples
+            
+        Returns:
+            NumPy array of 16 kHz mono samples, or the original path
+        """
+        if isinstance(audio, str) and is_pcm_audio(audio):
+            logger.debug(f"Loading PCM audio from {audio}")
+            return load_pcm_audio(audio)
+        return audio
+    
+    def decode_audio(self, audio: Union[str, Any]) -> Any:
+        """
+        Load audio as an array of samples, decoding compressed files if needed.
+        
+        Args:
+            audio: Path to audio file, or an array of 16 kHz mono samples
+            
+        Returns:
+            float32 NumPy array of 16 kHz mono samples
+        """
+        with metrics.stage("load_audio"):
+            samples = self.load_audio(audio)
+            if isinstance(samples, str):
+                import whisper
+                
+                samples = whisper.load_audio(samples)
+        metrics.note_audio(samples)
+        return samples
+    
+    def transcribe(self, audio: Union[str, Any]) -> str:
+        """
+        Transcribe audio using Whisper.
+        
+        Args:
+            audio: Path to audio file, or an in-memory float32 array of
+                16 kHz mono samples
+                
+        Returns:
+            Transcribed text; empty if the VAD found no speech
             
         Raises:
             TranscriptionError: If transcription fails
         """
-        logger.info(f"Transcribing audio from {audio_path}")
-        try:
-            result = self.model.transcribe(audio_path)
-            text = result.get("text", "")
+        return self.transcribe_result(audio)["text"]
+    
+    def transcribe_result(
+        self,
+        audio: Union[str, Any],
+        allow_empty: bool = False
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio and return Whisper's full result.
+        
+        With a VAD configured, only the speech regions are sent to the model
+        and segment timestamps are mapped back onto the original audio. A
+        clip with no speech returns an empty result without running the model.
+        
+        Args:
+            audio: Path to audio file, or an in-memory float32 array of
+                16 kHz mono samples
+            allow_empty: Return an empty result instead of raising when the
+                model transcribes no text, e.g. for one chunk of a long clip
+                
+        Returns:
+            The model's result, with "text", "segments", "language" and "confidence"
             
-            if not text:
-                raise TranscriptionError("Transcription returned empty text")
+        Raises:
+            TranscriptionError: If transcription fails
+        """
+        if isinstance(audio, str):
+            logger.info(f"Transcribing audio from {audio}")
+        else:
+            logger.info("Transcribing in-memory audio")
+        try:
+            with metrics.stage("load_audio"):
+                audio = self.load_audio(audio)
+            if not isinstance(audio, str):
+                metrics.note_audio(audio)
+            timestamp_map = None
+            if self.vad is not None:
+                samples = self.decode_audio(audio)
+                with metrics.stage("vad"):
+                    audio, timestamp_map = self.vad.trim(samples)
+                if len(audio) == 0:
+                    logger.info("No speech detected, skipping transcription")
+                    return {"text": "", "segments": [], "language": None, "confidence": None}
             
-            logger.info("Transcription completed successfully")
-            return text
+            return self._run_model(audio, timestamp_map, allow_empty=allow_empty)
             
         except Exception as e:
             if isinstance(e, TranscriptionError):
                 raise
             raise TranscriptionError(f"Unexpected error during transcription: {e}")
+    
+    def _run_model(
+        self,
+        audio: Any,
+        timestamp_map: Optional["TimestampMap"] = None,
+        escalate: bool = False,
+        allow_empty: bool = False
+    ) -> TranscriptionResult:
+        """
+        Run the model on prepared audio and map segment times back if it was trimmed.
+        
+        Low-confidence results are redone with the cascade model, if there
+        is one. ``escalate`` goes straight to the cascade model, for clips
+        the first model already scored (e.g. in a batch). ``allow_empty``
+        returns a result without text instead of raising.
+        """
+        if not escalate:
+            checkpointer = self.checkpointer
+            audio, checkpoint_key = self._checkpoint_key(audio)
+            with self._lock:
+                if checkpointer is not None and checkpoint_key is not None:
+                    raw = checkpointer.transcribe(audio, checkpoint_key, self._transcribe_span)
+                else:
+                    raw = self.model.transcribe(audio, **self.decode_options)
+                result = to_result(raw)
+            self._count_fallbacks(result)
+            if self.cascade_model is not None:
+                escalate = self.needs_escalation(result.get("segments", []))
+                self._count_cascade(escalate)
+        if escalate:
+            result = self._run_cascade_model(audio)
+        text = result.get("text", "")
+        
+        if not text and not allow_empty:
+            raise TranscriptionError("Transcription returned empty text")
+        
+        if timestamp_map is not None:
+            timestamp_map.remap_segments(result.get("segments", []))
+        
+        logger.info("Transcription completed successfully")
+        return result
+    
+    def _checkpoint_key(self, audio: Any) -> Tuple[Any, Optional[str]]:
+        """
+        Decide whether a clip is transcribed in checkpointed spans.
+        
+        Returns:
+            Tuple of (audio, sidecar key); the key is None when the clip is
+            transcribed in one call. Checkpointed audio is returned decoded.
+        """
+        if self.checkpointer is None:
+            return audio, None
+        samples = self.decode_audio(audio)
+        if not self.checkpointer.applies(samples):
+            return samples, None
+        model_name = getattr(self.model, "model_name", None) or type(self.model).__name__
+        return samples, audio_fingerprint(samples, model_name, self.fingerprint_options)
+    
+    def _transcribe_span(self, samples: Any, prompt: Optional[str]) -> Dict[str, Any]:
+        """Transcribe one span of a checkpointed clip, prompted with the text before it."""
+        options = dict(self.decode_options)
+        if prompt:
+            options["initial_prompt"] = prompt
+        return self.model.transcribe(samples, **options)
+    
+    def _run_cascade_model(self, audio: Any) -> TranscriptionResult:
+        """Transcribe a low-confidence clip again with the cascade model."""
+        model = self._get_cascade_model()
+        logger.info(f"Low confidence, transcribing again with the {self.cascade_model} model")
+        with self._cascade_lock:
+            result = to_result(model.transcribe(audio, **self.decode_options))
+        self._count_fallbacks(result)
+        job = metrics.current_job()
+        if job is not None:
+            job.escalations += 1
+        return result
+    
+    def _get_cascade_model(self) -> Any:
+        """Return the cascade model, loading it on first use."""
+        assert self.cascade_model is not None
+        if self._cascade is None:
+            with self._cascade_load_lock:
+                if self._cascade is None:
+                    logger.info(f"Loading cascade Whisper model ({self.cascade_model})...")
+                    try:
+                        self._cascade = self.load_model(self.cascade_model)
+                    except Exception as e:
+                        raise TranscriptionError(
+                            f"Could not load cascade model {self.cascade_model}: {e}"
+                        )
+        return self._cascade
+    
+    def _count_cascade(self, escalated: bool) -> None:
+        """Count one clip scored by the first model of the cascade."""
+        with self._stats_lock:
+            self.cascade_clips += 1
+            if escalated:
+                self.escalations += 1
+    
+    def _count_fallbacks(self, result: TranscriptionResult) -> None:
+        """Add a result's temperature fallbacks to the current job's metrics."""
+        job = metrics.current_job()
+        if job is not None:
+            job.temperature_fallbacks += metrics.count_temperature_fallbacks(
+                result, self.decode_options.get("temperature")
+            )
+    
+    def transcribe_many(
+        self,
+        audios: Sequence[Union[str, Any]]
+    ) -> List[Union[str, TranscriptionError]]:
+        """
+        Transcribe several clips, running the model once for all that fit in one window.
+        
+        Clips of up to 30 seconds (one Whisper window) have their log-mel
+        spectrograms stacked into a single batch, so the encoder and decoder
+        run once for the whole batch instead of once per clip. Longer clips,
+        and batch results that Whisper would retry at a higher temperature,
+        go through ``transcribe`` one at a time.
+        
+        Args:
+            audios: Paths to audio files and/or float32 arrays of 16 kHz mono samples
+            
+        Returns:
+            One entry per input: the transcribed text, or the
+            TranscriptionError that clip failed with
+        """
+        results: List[Union[str, TranscriptionError]] = [
+            TranscriptionError("Not transcribed") for _ in audios
+        ]
+        model = self.whisper_model
+        if model is None:
+            # Not an openai-whisper model; nothing to batch with
+            return [self._transcribe_or_error(audio) for audio in audios]
+        
+        import torch
+        import whisper
+        
+        logger.info(f"Transcribing batch of {len(audios)} clips")
+        batch_indices = []
+        arrays = []
+        sequential = []
+        for i, audio in enumerate(audios):
+            try:
+                samples = self.decode_audio(audio)
+            except Exception as e:
+                results[i] = TranscriptionError(f"Could not load audio: {e}")
+                continue
+            if self.vad is not None:
+                samples, _ = self.vad.trim(samples)
+                if len(samples) == 0:
+                    logger.info("No speech detected, skipping transcription")
+                    results[i] = ""
+                    continue
+            if len(samples) > whisper.audio.N_SAMPLES:
+                sequential.append((i, samples))
+            else:
+                batch_indices.append(i)
+                arrays.append(samples)
+        
+        if arrays:
+            try:
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(torch.from_numpy(samples)),
+                        n_mels=model.dims.n_mels,
+                    )
+                    for samples in arrays
+                ]).to(model.device)
+                fields = whisper.DecodingOptions.__dataclass_fields__
+                options = whisper.DecodingOptions(**{
+                    "fp16": model.device.type != "cpu",
+                    **{k: v for k, v in self.decode_options.items() if k in fields},
+                })
+                with self._lock:
+                    decoded = whisper.decode(model, mels, options)
+            except Exception as e:
+                logger.warning(f"Batched decode failed, transcribing clips one at a time: {e}")
+                decoded = [None] * len(arrays)
+            
+            for i, samples, result in zip(batch_indices, arrays, decoded):
+                silent = result is not None and result.no_speech_prob > NO_SPEECH_THRESHOLD
+                # Whisper drops a window it thinks is silence and decoded poorly
+                skipped = silent and result.avg_logprob < LOGPROB_THRESHOLD
+                low_confidence = (
+                    self.cascade_model is not None
+                    and result is not None
+                    and not skipped
+                    and bool(result.text.strip())
+                    and self.cascade_thresholds.is_low_confidence(
+                        result.avg_logprob, result.compression_ratio, result.no_speech_prob
+                    )
+                )
+                if low_confidence:
+                    self._count_cascade(True)
+                    results[i] = self._transcribe_or_error(samples, trimmed=True, escalate=True)
+                elif result is None or (not silent and self._needs_fallback(result)):
+                    # The samples are already trimmed, so skip the VAD this time
+                    results[i] = self._transcribe_or_error(samples, trimmed=True)
+                elif skipped or not result.text.strip():
+                    results[i] = TranscriptionError("Transcription returned empty text")
+                else:
+                    if self.cascade_model is not None:
+                        self._count_cascade(False)
+                    results[i] = result.text
+        
+        for i, samples in sequential:
+            results[i] = self._transcribe_or_error(samples, trimmed=self.vad is not None)
+        
+        return results
+    
+    @staticmethod
+    def _needs_fallback(result: Any) -> bool:
+        """Return True if Whisper would have retried this greedy decode."""
+        return (
+            result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD
+        )
+    
+    def _transcribe_or_error(
+        self,
+        audio: Union[str, Any],
+        trimmed: bool = False,
+        escalate: bool = False
+    ) -> Union[str, TranscriptionError]:
+        """Transcribe one clip, returning the error instead of raising it."""
+        try:
+            if trimmed:
+                return self._run_model(audio, escalate=escalate)["text"]
+            return self.transcribe(audio)
+        except TranscriptionError as e:
+            return e
+        except Exception as e:
+            return TranscriptionError(f"Unexpected error during transcription: {e}")
@@ -2,7 +2,7 @@
 
 import re
 import logging
-from typing import List
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -59,3 +59,46 @@ def setup_logging(level: int = logging.INFO) -> None:
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+
+
+# Offline patterns for pulling a platform video ID out of a URL
+_VIDEO_ID_PATTERNS = [
+    ("tiktok", re.compile(r"tiktok\.com/@[^/?#]*/(?:video|photo)/(\d+)")),
+    ("tiktok", re.compile(r"tiktok\.com/(?:embed/(?:v2/)?|v/|share/video/)(\d+)")),
+    ("tiktok", re.compile(r"tiktok\.com/.*[?&](?:item_id|share_item_id)=(\d+)")),
+    ("tiktok-short", re.compile(r"(?:vm|vt)\.tiktok\.com/([A-Za-z0-9]+)")),
+    ("tiktok-short", re.compile(r"tiktok\.com/t/([A-Za-z0-9]+)")),
+    ("youtube", re.compile(r"youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)([\w-]{11})")),
+    ("youtube", re.compile(r"youtu\.be/([\w-]{11})")),
+]
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Parse a canonical video ID out of a URL without touching the network.
+    
+    IDs are prefixed with the platform, e.g. ``tiktok:7234567890123456789``.
+    Short links (vm.tiktok.com and friends) can only be resolved by following
+    the redirect, so they get their own ``tiktok-short:`` namespace.
+    
+    Args:
+        url: Video URL
+        
+    Returns:
+        Canonical video ID, or None if the URL form is not recognized
+    """
+    for platform, pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return f"{platform}:{match.group(1)}"
+    return None
+
+
+def video_key(url: str) -> str:
+    """
+    Return the key a URL's job is tracked under.
+    
+    This is the canonical video ID, or the URL itself, prefixed with
+    ``url:``, for URL forms ``extract_video_id`` does not recognize.
+    """
+    return extract_video_id(url) or f"url:{url}"
@@ -0,0 +1,251 @@
+"""Energy-based voice activity detection for trimming silence and music."""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .audio import SAMPLE_RATE
+
+if TYPE_CHECKING:
+    import numpy as np
+    
+    from .engines import Segment
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap (dB) kept between the activity threshold and a clip's loud frames
+HEADROOM_DB = 25.0
+
+
+class TimestampMap:
+    """Maps times in trimmed audio back to times in the original clip."""
+    
+    def __init__(self, regions: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE):
+        """
+        Build the map from the regions that were kept.
+        
+        Args:
+            regions: (start, end) sample ranges of the original audio, in order
+            sample_rate: Sample rate of the audio
+        """
+        self.sample_rate = sample_rate
+        # (start in trimmed audio, start in original audio, length), in seconds
+        self.spans: List[Tuple[float, float, float]] = []
+        offset = 0
+        for start, end in regions:
+            self.spans.append(
+                (offset / sample_rate, start / sample_rate, (end - start) / sample_rate)
+            )
+            offset += end - start
+    
+    def to_original(self, t: float, end: bool = False) -> float:
+        """
+        Convert a time in the trimmed audio to a time in the original audio.
+        
+        A time on the seam between two kept regions is both the end of one
+        and the start of the next; ``end`` picks the former, so a segment
+        ending there is not stretched across the silence that was cut.
+        
+        Args:
+            t: Seconds from the start of the trimmed audio
+            end: Whether ``t`` is the end of a segment or word
+            
+        Returns:
+            Seconds from the start of the original audio
+        """
+        for trimmed_start, original_start, length in self.spans:
+            if t < trimmed_start + length or (end and t == trimmed_start + length):
+                return original_start + max(0.0, t - trimmed_start)
+        if not self.spans:
+            return t
+        trimmed_start, original_start, length = self.spans[-1]
+        return original_start + (t - trimmed_start)
+    
+    def remap_segments(self, segments: List["Segment"]) -> List["Segment"]:
+        """
+        Shift Whisper segment (and word) timestamps back onto the original audio.
+        
+        Args:
+            segments: Segments from a Whisper result, modified in place
+            
+        Returns:
+            The same segments
+        """
+        for segment in segments:
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"], end=True)
+            for word in segment.get("words") or []:
+                word["start"] = self.to_original(word["start"])
+                word["end"] = self.to_original(word["end"], end=True)
+        return segments
+
+
+class EnergyVAD:
+    """
+    Finds speech regions from short-time frame energy.
+    
+    Frames louder than an adaptive threshold (the clip's noise floor plus a
+    margin, but never below an absolute floor) count as active. Short blips
+    are dropped, short pauses are bridged, and each region is padded so word
+    edges are not clipped.
+    
+    Sustained music is loud too, so energy alone keeps it. When
+    ``music_modulation_db`` is set, regions whose frame energy barely
+    fluctuates are treated as music and dropped: speech rises and falls
+    with every syllable, a held chord or steady beat much less so.
+    """
+    
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        threshold_db: float = -45.0,
+        margin_db: float = 8.0,
+        min_speech_ms: int = 250,
+        min_silence_ms: int = 400,
+        padding_ms: int = 250,
+        music_modulation_db: float = 0.0,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        """
+        Initialize the detector.
+        
+        Args:
+            frame_ms: Analysis frame length in milliseconds
+            threshold_db: Absolute energy floor (dBFS) below which a frame is silent
+            margin_db: How far above the clip's noise floor a frame must be
+            min_speech_ms: Active runs shorter than this are discarded
+            min_silence_ms: Pauses shorter than this are bridged
+            padding_ms: Audio kept on each side of a speech region
+            music_modulation_db: Minimum standard deviation of frame energy
+                (dB) for a region to count as speech; 0 disables music trimming
+            sample_rate: Sample rate of the audio
+        """
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.min_speech_ms = min_speech_ms
+        self.min_silence_ms = min_silence_ms
+        self.padding_ms = padding_ms
+        self.music_modulation_db = music_modulation_db
+        self.sample_rate = sample_rate
+    
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Parameters that change the detector's output, e.g. for cache keys."""
+        return {
+            "frame_ms": self.frame_ms,
+            "threshold_db": self.threshold_db,
+            "margin_db": self.margin_db,
+            "min_speech_ms": self.min_speech_ms,
+            "min_silence_ms": self.min_silence_ms,
+            "padding_ms": self.padding_ms,
+            "music_modulation_db": self.music_modulation_db,
+        }
+    
+    def frame_energy(self, samples: "np.ndarray") -> "np.ndarray":
+        """Return the energy of each non-overlapping frame in dBFS."""
+        import numpy as np
+        
+        frame_len = self.sample_rate * self.frame_ms // 1000
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+        power = np.mean(frames.astype(np.float32) ** 2, axis=1)
+        return 10.0 * np.log10(power + 1e-10)
+    
+    def detect(self, samples: "np.ndarray") -> List[Tuple[int, int]]:
+        """
+        Find speech regions.
+        
+        Args:
+            samples: float32 array of mono samples
+            
+        Returns:
+            Sorted, non-overlapping (start, end) sample ranges
+        """
+        import numpy as np
+        
+        energy = self.frame_energy(samples)
+        if energy.size == 0:
+            return []
+        
+        noise_floor = float(np.percentile(energy, 10))
+        # A clip with speech throughout has no quiet frames to set a floor
+        # from, so never put the threshold within HEADROOM_DB of its loud parts
+        loud_level = float(np.percentile(energy, 95))
+        threshold = max(
+            self.threshold_db,
+            min(noise_floor + self.margin_db, loud_level - HEADROOM_DB),
+        )
+        active = energy > threshold
+        
+        runs = self._runs(active)
+        runs = self._bridge(runs, self._frames(self.min_silence_ms))
+        min_speech = self._frames(self.min_speech_ms)
+        runs = [(start, end) for start, end in runs if end - start >= min_speech]
+        if self.music_modulation_db > 0:
+            runs = [
+                (start, end) for start, end in runs
+                if float(np.std(energy[start:end])) >= self.music_modulation_db
+            ]
+        
+        frame_len = self.sample_rate * self.frame_ms // 1000
+        padding = self.sample_rate * self.padding_ms // 1000
+        regions: List[Tuple[int, int]] = []
+        for start, end in runs:
+            region = (
+                max(0, start * frame_len - padding),
+                min(len(samples), end * frame_len + padding),
+            )
+            if regions and region[0] <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], region[1]))
+            else:
+                regions.append(region)
+        return regions
+    
+    def trim(self, samples: "np.ndarray") -> Tuple["np.ndarray", TimestampMap]:
+        """
+        Cut audio down to its speech regions.
+        
+        Args:
+            samples: float32 array of mono samples
+            
+        Returns:
+            Tuple of (trimmed samples, map from trimmed to original times);
+            the trimmed array is empty when no speech was found
+        """
+        import numpy as np
+        
+        regions = self.detect(samples)
+        if regions:
+            trimmed = np.concatenate([samples[start:end] for start, end in regions])
+        else:
+            trimmed = samples[:0]
+        kept = len(trimmed) / max(1, len(samples))
+        logger.debug(f"VAD kept {len(regions)} regions, {kept:.0%} of the audio")
+        return trimmed, TimestampMap(regions, self.sample_rate)
+    
+    def _frames(self, ms: int) -> int:
+        """Convert a duration in milliseconds to a number of frames."""
+        return max(1, ms // self.frame_ms)
+    
+    @staticmethod
+    def _runs(active: "np.ndarray") -> List[Tuple[int, int]]:
+        """Return (start, end) frame ranges where ``active`` is True."""
+        import numpy as np
+        
+        edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return list(zip(starts.tolist(), ends.tolist()))
+    
+    @staticmethod
+    def _bridge(runs: List[Tuple[int, int]], max_gap: int) -> List[Tuple[int, int]]:
+        """Merge runs separated by fewer than ``max_gap`` frames."""
+        merged: List[Tuple[int, int]] = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < max_gap:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
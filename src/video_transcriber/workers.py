@@ -0,0 +1,351 @@
+"""Multi-process transcription backend with one Whisper model per worker."""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .engines import DEFAULT_ENGINE, TranscriptionResult, load_engine
+from .exceptions import ModelLoadError, TranscriptionError
+from .metrics import JobMetrics, bound_job, current_job, instrument_model
+from .transcriber import AudioTranscriber, CascadeThresholds
+from .utils import setup_logging
+
+if TYPE_CHECKING:
+    from .checkpoint import SegmentCheckpointer
+    from .vad import EnergyVAD
+
+logger = logging.getLogger(__name__)
+
+# The transcriber owned by this worker process, set up by _init_worker
+_worker_transcriber: Optional[AudioTranscriber] = None
+# Why _init_worker could not set the transcriber up, raised by every call
+_worker_error: Optional[ModelLoadError] = None
+
+T = TypeVar("T")
+
+
+def _init_worker(
+    model_name: str,
+    threads: int,
+    decode_options: Optional[Dict],
+    vad: Optional["EnergyVAD"],
+    cascade_model: Optional[str],
+    cascade_thresholds: Optional[CascadeThresholds],
+    engine: str,
+    checkpointer: Optional["SegmentCheckpointer"],
+    instrument: bool,
+    log_level: int,
+) -> None:
+    """
+    Set up logging, pin the worker's thread count and load its Whisper model once.
+    
+    A failure to load is kept rather than raised: an exception here would
+    break the whole pool, and the parent would only see "worker died" for
+    every job. Instead each call raises it as a ModelLoadError.
+    """
+    global _worker_transcriber, _worker_error
+    
+    # Spawned processes start without the parent's logging configuration
+    setup_logging(log_level)
+    
+    # Must be set before torch is imported to cover OpenMP/MKL pools too
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    
+    def load(name: str) -> Any:
+        model = load_engine(name, engine)
+        if instrument:
+            instrument_model(model)
+        return model
+    
+    try:
+        import torch
+        
+        torch.set_num_threads(threads)
+        logger.info(
+            f"Worker {os.getpid()} loading Whisper model ({model_name}, {engine}) "
+            f"with {threads} threads"
+        )
+        model = load(model_name)
+    except Exception as e:
+        logger.error(f"Worker {os.getpid()} could not load the Whisper model: {e}")
+        _worker_error = ModelLoadError(f"Whisper model could not be loaded: {e}")
+        return
+    _worker_transcriber = AudioTranscriber(
+        model,
+        decode_options,
+        vad,
+        cascade_model=cascade_model,
+        cascade_thresholds=cascade_thresholds,
+        load_model=load,
+        checkpointer=checkpointer,
+    )
+
+
+def _get_transcriber() -> AudioTranscriber:
+    """Return this worker's transcriber, or raise the error that stopped it loading."""
+    if _worker_error is not None:
+        raise _worker_error
+    assert _worker_transcriber is not None
+    return _worker_transcriber
+
+
+def _with_worker_stats(
+    transcriber: AudioTranscriber,
+    call: Callable[[], T],
+) -> Tuple[T, int, int, JobMetrics]:
+    """
+    Run a call and return its result with the stats it added in this worker.
+    
+    These are the cascade clips and escalations it counted, and a metrics
+    record holding the stage timings and fallbacks it measured, for the
+    parent process to add to its job.
+    """
+    clips, escalations = transcriber.cascade_clips, transcriber.escalations
+    job = JobMetrics(url="", video_key="worker")
+    with bound_job(job):
+        result = call()
+    return (
+        result,
+        transcriber.cascade_clips - clips,
+        transcriber.escalations - escalations,
+        job,
+    )
+
+
+def _check_worker(_: Any) -> Tuple[None, int, int, JobMetrics]:
+    """Confirm that this worker's model loaded."""
+    return _with_worker_stats(_get_transcriber(), lambda: None)
+
+
+def _transcribe_in_worker(audio: Union[str, Any]) -> Tuple[str, int, int, JobMetrics]:
+    """Transcribe one clip with this worker's model."""
+    transcriber = _get_transcriber()
+    return _with_worker_stats(transcriber, lambda: transcriber.transcribe(audio))
+
+
+def _transcribe_result_in_worker(
+    payload: Tuple[Union[str, Any], bool]
+) -> Tuple[TranscriptionResult, int, int, JobMetrics]:
+    """Transcribe one clip with this worker's model and return the full result."""
+    transcriber = _get_transcriber()
+    audio, allow_empty = payload
+    return _with_worker_stats(
+        transcriber, lambda: transcriber.transcribe_result(audio, allow_empty=allow_empty)
+    )
+
+
+def _transcribe_many_in_worker(
+    audios: Sequence[Union[str, Any]]
+) -> Tuple[List[Union[str, TranscriptionError]], int, int, JobMetrics]:
+    """Transcribe a batch of clips with this worker's model."""
+    transcriber = _get_transcriber()
+    return _with_worker_stats(transcriber, lambda: transcriber.transcribe_many(audios))
+
+
+class TranscriptionPool(AudioTranscriber):
+    """
+    Transcriber that spreads work over a pool of worker processes.
+    
+    Each worker loads the Whisper model once at startup, pins its torch
+    intra-op thread count, and then takes audio jobs from the pool's queue.
+    Workers log at the level the parent's root logger had when the pool
+    started.
+    Calls block until their job's result comes back, so the pool is meant to
+    be driven from several threads at once, e.g. the pipeline's transcribe
+    workers. Audio is sent to workers as a file path where possible, and as
+    a pickled array otherwise.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        processes: int,
+        threads_per_process: int = 1,
+        decode_options: Optional[Dict] = None,
+        vad: Optional["EnergyVAD"] = None,
+        cascade_model: Optional[str] = None,
+        cascade_thresholds: Optional[CascadeThresholds] = None,
+        engine: str = DEFAULT_ENGINE,
+        checkpointer: Optional["SegmentCheckpointer"] = None,
+        instrument: bool = False,
+    ):
+        """
+        Start the worker pool.
+        
+        Args:
+            model_name: Whisper model size each worker loads
+            processes: Number of worker processes
+            threads_per_process: torch intra-op threads per worker
+            decode_options: Extra keyword arguments for ``model.transcribe``
+            vad: Optional voice activity detector each worker applies
+            cascade_model: Larger model size each worker loads on demand
+                for low-confidence clips
+            cascade_thresholds: When a clip counts as low confidence
+            engine: Inference engine each worker loads its models with
+            checkpointer: Optional checkpointer each worker transcribes
+                long clips with
+            instrument: Time each worker model's encoder and decoder passes
+                as stages of the calling job
+        """
+        super().__init__(
+            None, decode_options, vad, cascade_model, cascade_thresholds,
+            checkpointer=checkpointer,
+        )
+        self.model_name = model_name
+        self.engine_name = engine
+        self.processes = max(1, processes)
+        self.threads_per_process = max(1, threads_per_process)
+        # First ModelLoadError a worker reported; no later call can succeed
+        self._load_error: Optional[ModelLoadError] = None
+        
+        logger.info(
+            f"Starting {self.processes} transcription workers "
+            f"with {self.threads_per_process} threads each"
+        )
+        # Spawn rather than fork: torch and its thread pools do not survive fork
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                model_name,
+                self.threads_per_process,
+                self.decode_options,
+                vad,
+                cascade_model,
+                self.cascade_thresholds,
+                engine,
+                checkpointer,
+                instrument,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+        )
+    
+    def transcribe(self, audio: Union[str, Any]) -> str:
+        """
+        Transcribe audio in one of the worker processes.
+        
+        Args:
+            audio: Path to audio file, or an in-memory float32 array of
+                16 kHz mono samples
+                
+        Returns:
+            Transcribed text
+            
+        Raises:
+            TranscriptionError: If transcription fails
+        """
+        return self._run(_transcribe_in_worker, audio)
+    
+    def transcribe_result(
+        self,
+        audio: Union[str, Any],
+        allow_empty: bool = False
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio in one of the worker processes and return the full result.
+        
+        Args:
+            audio: Path to audio file, or an in-memory float32 array of
+                16 kHz mono samples
+            allow_empty: Return an empty result instead of raising when the
+                model transcribes no text
+                
+        Returns:
+            The model's result, with "text", "segments", "language" and "confidence"
+            
+        Raises:
+            TranscriptionError: If transcription fails
+        """
+        return self._run(_transcribe_result_in_worker, (audio, allow_empty))
+    
+    def transcribe_many(
+        self,
+        audios: Sequence[Union[str, Any]]
+    ) -> List[Union[str, TranscriptionError]]:
+        """
+        Transcribe a batch of clips in one worker process.
+        
+        Args:
+            audios: Paths to audio files and/or float32 arrays of 16 kHz mono samples
+            
+        Returns:
+            One entry per input: the transcribed text, or the
+            TranscriptionError that clip failed with
+        """
+        try:
+            return self._run(_transcribe_many_in_worker, list(audios))
+        except TranscriptionError as e:
+            return [e for _ in audios]
+    
+    def check_model(self, wait: bool = False) -> None:
+        """
+        Raise if the worker processes could not load the model.
+        
+        Args:
+            wait: Have a worker report whether its model loaded, rather than
+                only reporting a failure that has already happened
+                
+        Raises:
+            ModelLoadError: If the model could not be loaded
+        """
+        if self._load_error is not None:
+            raise self._load_error
+        if wait:
+            try:
+                self._run(_check_worker, None)
+            except ModelLoadError:
+                raise
+            except TranscriptionError as e:
+                raise ModelLoadError(f"Transcription workers could not start: {e}")
+    
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _run(
+        self,
+        function: Callable[[Any], Tuple[T, int, int, JobMetrics]],
+        payload: Any,
+    ) -> T:
+        """
+        Submit a call to the pool and wait for its result.
+        
+        The cascade counts the worker reports are added to the pool's, and
+        its stage timings and fallbacks to the metrics of the calling job.
+        """
+        try:
+            result, clips, escalations, worker_job = (
+                self._executor.submit(function, payload).result()
+            )
+        except ModelLoadError as e:
+            self._load_error = e
+            raise
+        except TranscriptionError:
+            raise
+        except BrokenProcessPool as e:
+            raise TranscriptionError(f"Transcription worker died: {e}")
+        except Exception as e:
+            raise TranscriptionError(f"Unexpected error during transcription: {e}")
+        with self._stats_lock:
+            self.cascade_clips += clips
+            self.escalations += escalations
+        job = current_job()
+        if job is not None:
+            job.merge(worker_job)
+        return result